@@ -0,0 +1,54 @@
+"""unique question text
+
+Revision ID: 0c96721b140a
+Revises: 7cae220a2809
+Create Date: 2026-10-17 10:12:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0c96721b140a'
+down_revision = '7cae220a2809'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Дубликаты, накопившиеся до появления индекса, сливаем в вопрос
+    # с наименьшим id. Ссылки переносим до удаления: иначе каскад сотрёт
+    # историю asked_questions, а у идущих игр обнулится question_id.
+    # Повторы (chat_id, question) после переноса убирает cb2d86f0804c
+    op.execute(
+        "CREATE TEMPORARY TABLE question_duplicates AS "
+        "SELECT id, keep_id FROM ("
+        "SELECT id, min(id) OVER (PARTITION BY md5(question)) AS keep_id "
+        "FROM questions) q "
+        "WHERE id <> keep_id"
+    )
+    op.execute(
+        "UPDATE asked_questions a SET question = d.keep_id "
+        "FROM question_duplicates d WHERE a.question = d.id"
+    )
+    op.execute(
+        "UPDATE game g SET question_id = d.keep_id "
+        "FROM question_duplicates d WHERE g.question_id = d.id"
+    )
+    op.execute(
+        "DELETE FROM questions q USING question_duplicates d "
+        "WHERE q.id = d.id"
+    )
+    op.execute("DROP TABLE question_duplicates")
+    # md5, а не сам текст: длинный вопрос не влезет в btree-индекс
+    op.create_index(
+        'ix_questions_question_md5',
+        'questions',
+        [sa.text('md5(question)')],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_questions_question_md5', table_name='questions')
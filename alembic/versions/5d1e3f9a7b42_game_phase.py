@@ -0,0 +1,39 @@
+"""game phase and deadline
+
+Revision ID: 5d1e3f9a7b42
+Revises: cb2d86f0804c
+Create Date: 2026-10-17 14:12:05.318420
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d1e3f9a7b42'
+down_revision = 'cb2d86f0804c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'game',
+        sa.Column(
+            'phase', sa.String(), nullable=True, comment='Текущая фаза игры'
+        ),
+    )
+    op.add_column(
+        'game',
+        sa.Column(
+            'phase_deadline',
+            sa.DateTime(timezone=True),
+            nullable=True,
+            comment='Когда фаза завершится по таймауту',
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('game', 'phase_deadline')
+    op.drop_column('game', 'phase')
@@ -0,0 +1,112 @@
+"""question answers with normalized forms
+
+Revision ID: 8e4a2c7f1b93
+Revises: 5d1e3f9a7b42
+Create Date: 2026-10-17 16:40:12.527031
+
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e4a2c7f1b93'
+down_revision = '5d1e3f9a7b42'
+branch_labels = None
+depends_on = None
+
+BACKFILL_BATCH = 1000
+
+# Копия app.store.bot.answers.normalize_answer на момент миграции.
+# Миграция не импортирует код приложения: поздние правки нормализации
+# не должны менять то, чем она заполняет таблицу
+ARTICLES = frozenset({'a', 'an', 'the'})
+NOT_WORD = re.compile(r'[\W_]+')
+
+
+def normalize_answer(text: str) -> str:
+    text = unicodedata.normalize('NFKC', text).casefold().replace('ё', 'е')
+    words = NOT_WORD.sub(' ', text).split()
+    meaningful = [word for word in words if word not in ARTICLES]
+    return ' '.join(meaningful or words)
+
+
+def upgrade() -> None:
+    question_answers = op.create_table(
+        'question_answers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column(
+            'question_id',
+            sa.Integer(),
+            nullable=False,
+            comment='Вопрос, к которому относится ответ',
+        ),
+        sa.Column(
+            'answer',
+            sa.String(),
+            nullable=False,
+            comment='Засчитываемый ответ как в источнике',
+        ),
+        sa.Column(
+            'normalized',
+            sa.String(),
+            nullable=False,
+            comment='Ответ после normalize_answer, с ним сравнивается ввод',
+        ),
+        sa.ForeignKeyConstraint(
+            ['question_id'], ['questions.id'], ondelete='CASCADE'
+        ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'question_id',
+            'normalized',
+            name='uq_question_answers_question_id_normalized',
+        ),
+    )
+    op.create_index(
+        op.f('ix_question_answers_normalized'),
+        'question_answers',
+        ['normalized'],
+        unique=False,
+    )
+
+    # Нормализация написана на Python, поэтому заполняем пачками отсюда
+    questions = sa.table(
+        'questions', sa.column('id', sa.Integer), sa.column('answer', sa.String)
+    )
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(questions.c.id, questions.c.answer)
+            .where(questions.c.id > last_id)
+            .order_by(questions.c.id)
+            .limit(BACKFILL_BATCH)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        values = []
+        for row in rows:
+            answer = row.answer.strip()
+            normalized = normalize_answer(answer)
+            if normalized:
+                values.append(
+                    {
+                        'question_id': row.id,
+                        'answer': answer,
+                        'normalized': normalized,
+                    }
+                )
+        if values:
+            op.bulk_insert(question_answers, values)
+
+
+def downgrade() -> None:
+    op.drop_index(
+        op.f('ix_question_answers_normalized'), table_name='question_answers'
+    )
+    op.drop_table('question_answers')
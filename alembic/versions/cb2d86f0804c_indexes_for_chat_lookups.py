@@ -0,0 +1,58 @@
+"""indexes for chat lookups
+
+Revision ID: cb2d86f0804c
+Revises: 0c96721b140a
+Create Date: 2026-10-17 11:03:27.904551
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'cb2d86f0804c'
+down_revision = '0c96721b140a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Перед созданием уникальных ограничений убираем накопившиеся дубли
+    op.execute(
+        "DELETE FROM asked_questions a USING asked_questions b "
+        "WHERE a.id > b.id AND a.chat_id = b.chat_id "
+        "AND a.question = b.question"
+    )
+    op.execute(
+        "DELETE FROM users a USING users b "
+        "WHERE a.id > b.id AND a.chat_id = b.chat_id "
+        "AND a.int_user_id = b.int_user_id"
+    )
+    op.create_unique_constraint(
+        'uq_asked_questions_chat_id_question',
+        'asked_questions',
+        ['chat_id', 'question'],
+    )
+    op.create_index(
+        op.f('ix_asked_questions_question'),
+        'asked_questions',
+        ['question'],
+        unique=False,
+    )
+    op.create_unique_constraint(
+        'uq_users_chat_id_int_user_id', 'users', ['chat_id', 'int_user_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint(
+        'uq_users_chat_id_int_user_id', 'users', type_='unique'
+    )
+    op.drop_index(
+        op.f('ix_asked_questions_question'), table_name='asked_questions'
+    )
+    op.drop_constraint(
+        'uq_asked_questions_chat_id_question',
+        'asked_questions',
+        type_='unique',
+    )
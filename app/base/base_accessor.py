@@ -1,11 +1,49 @@
+import functools
+import inspect
+import time
 import typing
 from logging import getLogger
 
+from app.base.metrics import REGISTRY
+
 if typing.TYPE_CHECKING:
     from app.web.app import Application
 
+DB_LATENCY = REGISTRY.histogram(
+    "db_call_duration_seconds",
+    "Время вызова метода аксессора, включая ожидание соединения",
+    labels=("accessor", "method"),
+)
+DB_ERRORS = REGISTRY.counter(
+    "db_call_errors_total",
+    "Вызовы аксессоров, завершившиеся исключением",
+    labels=("accessor", "method"),
+)
+
+
+def _timed(accessor: str, method: str, func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception:
+            DB_ERRORS.inc(accessor, method)
+            raise
+        finally:
+            DB_LATENCY.observe(time.perf_counter() - started, accessor, method)
+
+    return wrapper
+
 
 class BaseAccessor:
     def __init__(self, app: "Application", *args, **kwargs):
         self.app = app
         self.logger = getLogger("accessor")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Каждый публичный async-метод аксессора попадает в гистограмму
+        for name, attr in list(vars(cls).items()):
+            if not name.startswith("_") and inspect.iscoroutinefunction(attr):
+                setattr(cls, name, _timed(cls.__name__, name, attr))
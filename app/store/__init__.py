@@ -1,6 +1,7 @@
 import asyncio
 import typing
 
+from app.base.metrics import REGISTRY
 from app.store.database import Database
 
 if typing.TYPE_CHECKING:
@@ -26,14 +27,36 @@ class Store:
 def setup_store(app: "Application"):
     app.database = Database(app)
     app.on_startup.append(app.database.connect)
-    app.on_cleanup.append(app.database.disconnect)
+    REGISTRY.callback(
+        "db_pool",
+        "Состояние пула соединений с БД",
+        lambda: {
+            (stat,): value for stat, value in app.database.pool_stats().items()
+        },
+        labels=("stat",),
+    )
     app.store = Store(app)
+    REGISTRY.callback(
+        "question_cache",
+        "Кэш вопросов: попадания, промахи, вытеснения, размер",
+        lambda: {
+            (stat,): value
+            for stat, value in app.store.quiz.cache.stats().items()
+        },
+        labels=("stat",),
+    )
 
     async def on_startup(app: "Application"):
+        if app.config.database.write_behind:
+            await app.store.quiz.asked.start()
+            await app.store.users.joined.start()
         await app.store.bots_manager.start()
 
     async def on_cleanup(app: "Application"):
         await app.store.bots_manager.stop()
+        # Игры остановлены: дописываем накопленное, пока пул открыт
+        await app.store.quiz.asked.stop()
+        await app.store.users.joined.stop()
 
         pending_tasks = [
             task
@@ -45,3 +68,5 @@ def setup_store(app: "Application"):
 
     app.on_startup.append(on_startup)
     app.on_cleanup.append(on_cleanup)
+    # Пул закрываем последним, когда бот уже остановлен
+    app.on_cleanup.append(app.database.disconnect)
@@ -1,28 +1,305 @@
+import itertools
+import random
+import typing
+from collections.abc import AsyncIterator, Iterable
+
 from sqlalchemy import delete, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import selectinload
 from sqlalchemy.sql.expression import func
 
 from app.base.base_accessor import BaseAccessor
-from app.store.database.models import AskedQuestions, Game, Questions, Users
+from app.store.bot.answers import (
+    answer_variants,
+    matches_answer,
+    normalize_answer,
+)
+from app.store.bot.dataclasses import (
+    GamePhase,
+    GameState,
+    GameStatus,
+    Question,
+)
+from app.store.bot.question_cache import QuestionCache
+from app.store.database.models import (
+    AskedQuestions,
+    Game,
+    QuestionAnswers,
+    Questions,
+    Users,
+)
+from app.store.database.write_behind import (
+    MAX_STATEMENT_ROWS,
+    WriteBehindBuffer,
+)
+
+if typing.TYPE_CHECKING:
+    from app.web.app import Application
+
+# Вопросов за один запрос при прогреве кэша
+WARMUP_BATCH = 1000
+
+
+def _write_behind(
+    app: "Application", model: type, conflict_columns: tuple[str, ...]
+) -> WriteBehindBuffer:
+    config = app.config.database if app.config else None
+    options = (
+        {
+            "max_rows": config.write_behind_rows,
+            "max_delay": config.write_behind_delay,
+        }
+        if config
+        else {}
+    )
+    return WriteBehindBuffer(
+        app.database, model.__table__, conflict_columns, **options
+    )
 
 
 class QuizAccessor(BaseAccessor):
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+        # Вопросы с вариантами ответов: колода и проверка ответа без БД.
+        # Все изменения вопросов проходят через этот аксессор.
+        config = app.config.bot if app.config else None
+        self.cache = (
+            QuestionCache(config.question_cache_size, config.question_cache_ttl)
+            if config
+            else QuestionCache()
+        )
+        # Отметки заданных вопросов пишутся пачками, см. write_behind.py
+        self.asked = _write_behind(app, AskedQuestions, ("chat_id", "question"))
+
     async def create_question(
-        self, question_text: str, answer_text: str
+        self,
+        question_text: str,
+        answer_text: str,
+        alternatives: Iterable[str] = (),
     ) -> Questions:
         async with self.app.database.session() as session:
             try:
-                question = Questions(question=question_text, answer=answer_text)
+                question = Questions(
+                    question=question_text,
+                    answer=answer_text,
+                    answers=[
+                        QuestionAnswers(answer=answer, normalized=normalized)
+                        for answer, normalized in answer_variants(
+                            answer_text, alternatives
+                        )
+                    ],
+                )
                 session.add(question)
                 await session.commit()  # Фиксируем изменения
             except IntegrityError as e:
                 await session.rollback()  # Откатываем транзакцию при ошибке
-                self.app.logger.error("Ошибка при создании вопроса: %s", str(e))
+                self.logger.error("Ошибка при создании вопроса: %s", str(e))
                 raise
             else:
+                self.cache.invalidate_bounds()
                 return question
 
+    async def update_question(
+        self,
+        question_id: int,
+        question_text: str | None = None,
+        answer_text: str | None = None,
+        alternatives: Iterable[str] | None = None,
+    ) -> Question | None:
+        """Правка вопроса; None, если вопроса с таким id нет.
+
+        При смене ответа или alternatives варианты в question_answers
+        пересобираются; без alternatives сохраняются прежние
+        дополнительные варианты. Запись кэша сбрасывается.
+        """
+        async with self.app.database.session() as session:
+            question = await session.get(Questions, question_id)
+            if question is None:
+                return None
+            if question_text is not None:
+                question.question = question_text
+            if answer_text is not None or alternatives is not None:
+                if alternatives is None:
+                    current = await session.execute(
+                        select(QuestionAnswers.answer).where(
+                            QuestionAnswers.question_id == question_id,
+                            QuestionAnswers.normalized
+                            != normalize_answer(question.answer),
+                        )
+                    )
+                    alternatives = list(current.scalars())
+                if answer_text is not None:
+                    question.answer = answer_text
+                await session.execute(
+                    delete(QuestionAnswers).where(
+                        QuestionAnswers.question_id == question_id
+                    )
+                )
+                await session.execute(
+                    insert(QuestionAnswers).values(
+                        [
+                            {
+                                "question_id": question_id,
+                                "answer": answer,
+                                "normalized": normalized,
+                            }
+                            for answer, normalized in answer_variants(
+                                question.answer, alternatives
+                            )
+                        ]
+                    )
+                )
+            try:
+                await session.commit()
+            except IntegrityError as e:
+                await session.rollback()
+                self.logger.error("Ошибка при изменении вопроса: %s", str(e))
+                raise
+
+        self.cache.invalidate(question_id)
+        return (await self.get_questions([question_id])).get(question_id)
+
+    async def bulk_create_questions(self, rows: list[dict]) -> int:
+        """Многострочный INSERT, дубликаты по тексту вопроса пропускаются.
+
+        Строка — {"question", "answer"} и необязательный список
+        "alternatives"; варианты ответа добавленных вопросов пишутся
+        в question_answers в той же транзакции. Возвращает количество
+        реально добавленных вопросов.
+        """
+        if not rows:
+            return 0
+        async with self.app.database.session() as session:
+            query = (
+                insert(Questions)
+                .values(
+                    [
+                        {"question": row["question"], "answer": row["answer"]}
+                        for row in rows
+                    ]
+                )
+                .on_conflict_do_nothing(
+                    index_elements=[func.md5(Questions.question)]
+                )
+                .returning(Questions.id, Questions.question)
+            )
+            inserted = (await session.execute(query)).all()
+            by_question = {row["question"]: row for row in rows}
+            answers = [
+                {
+                    "question_id": question_id,
+                    "answer": answer,
+                    "normalized": normalized,
+                }
+                for question_id, question in inserted
+                for answer, normalized in answer_variants(
+                    by_question[question]["answer"],
+                    by_question[question].get("alternatives") or (),
+                )
+            ]
+            # Вариантов у вопроса сколько угодно: пишем частями, чтобы
+            # не упереться в лимит параметров запроса
+            for start in range(0, len(answers), MAX_STATEMENT_ROWS):
+                await session.execute(
+                    insert(QuestionAnswers)
+                    .values(answers[start : start + MAX_STATEMENT_ROWS])
+                    .on_conflict_do_nothing()
+                )
+            await session.commit()
+        if inserted:
+            self.cache.invalidate_bounds()
+        return len(inserted)
+
+    async def get_questions(
+        self, question_ids: Iterable[int]
+    ) -> dict[int, Question]:
+        """Вопросы с вариантами ответов; в базу только за промахами кэша."""
+        found, missing = self.cache.get_many(question_ids)
+        if missing:
+            async with self.app.database.session() as session:
+                found.update(await self._load_questions(session, missing))
+        return found
+
+    async def get_answer_variants(
+        self, question_ids: Iterable[int]
+    ) -> dict[int, tuple[str, ...]]:
+        questions = await self.get_questions(question_ids)
+        return {
+            question_id: question.variants
+            for question_id, question in questions.items()
+        }
+
+    async def warm_up(self, limit: int) -> int:
+        """Загружает в кэш до limit вопросов, возвращает их число.
+
+        Сначала текущие вопросы идущих игр, затем банк по порядку id:
+        если банк целиком помещается в кэш, колоды дальше вытягиваются
+        без таблицы questions.
+        """
+        limit = min(limit, self.cache.maxsize)
+        loaded = 0
+        async with self.app.database.session() as session:
+            current = await session.execute(
+                select(Game.question_id)
+                .where(Game.is_working == 1, Game.question_id.is_not(None))
+                .limit(limit)
+            )
+            question_ids = list(current.scalars())
+            if question_ids:
+                loaded += len(await self._load_questions(session, question_ids))
+
+            after_id = 0
+            while loaded < limit:
+                result = await session.execute(
+                    select(Questions)
+                    .options(selectinload(Questions.answers))
+                    .where(Questions.id > after_id)
+                    .order_by(Questions.id)
+                    .limit(min(WARMUP_BATCH, limit - loaded))
+                )
+                rows = result.scalars().all()
+                if not rows:
+                    break
+                after_id = rows[-1].id
+                loaded += len(self._remember(rows))
+                # Строки уже в кэше, в сессии их держать незачем
+                session.expunge_all()
+
+        self.logger.info("В кэш вопросов загружено %s вопросов.", loaded)
+        return loaded
+
+    async def _load_questions(
+        self, session: AsyncSession, question_ids: Iterable[int]
+    ) -> dict[int, Question]:
+        result = await session.execute(
+            select(Questions)
+            .options(selectinload(Questions.answers))
+            .where(Questions.id.in_(question_ids))
+        )
+        return self._remember(result.scalars())
+
+    def _remember(self, rows: Iterable[Questions]) -> dict[int, Question]:
+        """Кладёт строки в кэш, возвращает {id: Question}.
+
+        Вопрос без строк в question_answers (добавлен в обход аксессора)
+        получает единственный вариант из questions.answer.
+        """
+        questions = {}
+        for row in rows:
+            question = Question(
+                text=row.question,
+                answer=row.answer,
+                id=row.id,
+                variants=tuple(answer.normalized for answer in row.answers)
+                or (normalize_answer(row.answer),),
+            )
+            self.cache.put(question)
+            questions[row.id] = question
+        return questions
+
     async def get_random_unasked_question(
         self, chat_id: int
     ) -> Questions | None:
@@ -33,7 +310,10 @@ class QuizAccessor(BaseAccessor):
                 )
                 query = (
                     select(Questions)
-                    .where(Questions.id.not_in(subquery))
+                    .where(
+                        Questions.id.not_in(subquery),
+                        Questions.id.not_in(self._pending_asked(chat_id)),
+                    )
                     .order_by(func.random())
                     .limit(1)
                 )
@@ -60,103 +340,259 @@ class QuizAccessor(BaseAccessor):
                     )
                 return question
 
+    async def draw_question_deck(
+        self,
+        chat_id: int,
+        size: int,
+        attempts: int = 5,
+        exclude: Iterable[int] = (),
+    ) -> list[Question]:
+        """Колода из size незаданных вопросов без ORDER BY random().
+
+        Случайные id из диапазона [min(id), max(id)] берутся из кэша,
+        промахи догружаются по первичному ключу, уже заданные
+        пропускаются. Сортировка всей таблицы нужна только если выборка
+        не набрала колоду (маленький или почти исчерпанный банк).
+        exclude — вопросы, которые не должны выпасть, даже если
+        asked_questions о них ещё не знает.
+        """
+        async with self.app.database.session() as session:
+            bounds = self.cache.get_bounds()
+            if bounds is None:
+                result = await session.execute(
+                    select(func.min(Questions.id), func.max(Questions.id))
+                )
+                bounds = result.one()
+                if bounds[0] is None:
+                    return []
+                self.cache.set_bounds(*bounds)
+            low, high = bounds
+
+            asked = await session.execute(
+                select(AskedQuestions.question).where(
+                    AskedQuestions.chat_id == chat_id
+                )
+            )
+            pending = [*self._pending_asked(chat_id), *exclude]
+            excluded = set(asked.scalars().all()) | set(pending)
+
+            deck: dict[int, Question] = {}
+            for _ in range(attempts):
+                need = size - len(deck)
+                if need <= 0:
+                    break
+                candidates = {
+                    random.randint(low, high) for _ in range(need * 2)
+                } - excluded
+                excluded |= candidates
+                if not candidates:
+                    continue
+                found, missing = self.cache.get_many(candidates)
+                if missing:
+                    found.update(await self._load_questions(session, missing))
+                for question in itertools.islice(found.values(), need):
+                    deck[question.id] = question
+
+            if len(deck) < size:
+                result = await session.execute(
+                    select(Questions)
+                    .options(selectinload(Questions.answers))
+                    .where(
+                        Questions.id.not_in(
+                            select(AskedQuestions.question).where(
+                                AskedQuestions.chat_id == chat_id
+                            )
+                        ),
+                        Questions.id.not_in([*deck, *pending]),
+                    )
+                    .order_by(func.random())
+                    .limit(size - len(deck))
+                )
+                deck.update(self._remember(result.scalars()))
+
+        questions = list(deck.values())
+        random.shuffle(questions)
+        self.logger.info(
+            "Для chat_id=%s вытянута колода из %s вопросов.",
+            chat_id,
+            len(questions),
+        )
+        return questions
+
     async def mark_question_as_asked(
         self, chat_id: int, question_id: int
     ) -> None:
-        async with self.app.database.session() as session:
-            asked_question = AskedQuestions(
-                chat_id=chat_id, question=question_id
-            )
-            session.add(asked_question)
-            await session.commit()
+        await self.asked.add({"chat_id": chat_id, "question": question_id})
+        self.logger.info(
+            "Вопрос с id=%s отмечен как заданный для chat_id=%s.",
+            question_id,
+            chat_id,
+        )
 
-            self.logger.info(
-                "Вопрос с id=%s отмечен как заданный для chat_id=%s.",
-                question_id,
-                chat_id,
-            )
+    def _pending_asked(self, chat_id: int) -> list[int]:
+        # Заданные вопросы, которые буфер ещё не записал в базу
+        return [row["question"] for row in self.asked.pending(chat_id)]
 
     async def check_answer(self, question_id: int, user_answer: str) -> bool:
+        variants = (await self.get_answer_variants([question_id])).get(
+            question_id
+        )
+        if variants is None:
+            self.logger.error("Вопрос с id=%s не найден.", question_id)
+            return False
+
+        is_correct = matches_answer(user_answer, variants)
+        self.logger.info(
+            "Ответ %s для вопроса id=%s.",
+            "правильный" if is_correct else "неправильный",
+            question_id,
+        )
+        return is_correct
+
+    async def list_questions(
+        self, after_id: int = 0, limit: int = 100
+    ) -> list[Questions]:
+        # Keyset-пагинация: id > курсора идёт по индексу первичного ключа
         async with self.app.database.session() as session:
-            query = select(Questions.answer).where(Questions.id == question_id)
-            result = await session.execute(query)
-            correct_answer = result.scalar_one_or_none()
-
-            if correct_answer is None:
-                self.logger.error("Вопрос с id=%s не найден.", question_id)
-                return False
-
-            is_correct = (
-                correct_answer.strip().lower() == user_answer.strip().lower()
-            )
-            self.logger.info(
-                "Ответ %s для вопроса id=%s.",
-                "правильный" if is_correct else "неправильный",
-                question_id,
+            query = (
+                select(Questions)
+                .where(Questions.id > after_id)
+                .order_by(Questions.id)
+                .limit(limit)
             )
-
-            return is_correct
-
-    async def list_questions(self) -> list[Questions]:
-        async with self.app.database.session() as session:
-            query = select(Questions)
             result = await session.execute(query)
             questions = result.scalars().all()
             return list(questions)
 
-
-class UserAccessor(BaseAccessor):
-    async def join_user(
-        self, int_user_id: int, username: str, chat_id: int
-    ) -> Users:
+    async def stream_questions(
+        self, batch_size: int = 1000
+    ) -> AsyncIterator[Questions]:
+        # Серверный курсор: в памяти не больше batch_size строк
         async with self.app.database.session() as session:
-            user = Users(
-                int_user_id=int_user_id,  # Telegram ID пользователя
-                user_id=username,  # Имя пользователя
-                chat_id=chat_id,  # Идентификатор чата
+            result = await session.stream_scalars(
+                select(Questions)
+                .order_by(Questions.id)
+                .execution_options(yield_per=batch_size)
             )
+            async for question in result:
+                yield question
 
-            session.add(user)
-            await session.commit()
 
-            return user
+class UserAccessor(BaseAccessor):
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+        # Регистрации игроков пишутся пачками, см. write_behind.py
+        self.joined = _write_behind(app, Users, ("chat_id", "int_user_id"))
+
+    async def join_user(
+        self, int_user_id: int, username: str, chat_id: int
+    ) -> None:
+        await self.joined.add(
+            {
+                "int_user_id": int_user_id,  # Telegram ID пользователя
+                "user_id": username,  # Имя пользователя
+                "chat_id": chat_id,  # Идентификатор чата
+            }
+        )
 
     async def get_users_by_chat_id(self, chat_id: int) -> list[str]:
         async with self.app.database.session() as session:
             query = select(Users.user_id).where(Users.chat_id == chat_id)
             result = await session.execute(query)
-            return result.scalars().all()
+            users = list(result.scalars().all())
+        return users + [
+            username
+            for username in self.pending_usernames(chat_id)
+            if username not in users
+        ]
+
+    def pending_usernames(self, chat_id: int) -> list[str]:
+        """Игроки чата, которых буфер ещё не записал в базу."""
+        return [row["user_id"] for row in self.joined.pending(chat_id)]
 
 
 class GameAccessor(BaseAccessor):
+    def __init__(self, app: "Application", *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
+        # Чаты с идущей игрой: для них /start и /stat не ходят в БД.
+        # Все изменения is_working проходят через этот аксессор.
+        config = app.config.bot if app.config else None
+        self.active_chats: set[int] | None = (
+            set() if config and config.active_chats_cache else None
+        )
+
+    def _track_working(self, code_of_chat: int, is_working: int | None):
+        if self.active_chats is None:
+            return
+        if is_working == 1:
+            self.active_chats.add(code_of_chat)
+        else:
+            self.active_chats.discard(code_of_chat)
+
+    async def get_game_status(self, code_of_chat: int) -> GameStatus:
+        if self.active_chats is not None and code_of_chat in self.active_chats:
+            return GameStatus(exists=True, is_working=True)
+
+        async with self.app.database.session() as session:
+            query = select(Game.is_working, Game.points_awarded).where(
+                Game.code_of_chat == code_of_chat
+            )
+            row = (await session.execute(query)).one_or_none()
+
+        if row is None:
+            return GameStatus(exists=False)
+        is_working, points = row
+        self._track_working(code_of_chat, is_working)
+        return GameStatus(
+            exists=True, is_working=is_working == 1, points=points or 0
+        )
+
     async def create_or_update_game(self, **kwargs) -> Game:
+        code_of_chat = kwargs.pop("code_of_chat", None)
+        if code_of_chat is None:
+            raise ValueError(
+                "Поле code_of_chat обязательно для создания записи"
+            )
+        return await self.apply_game_changes(code_of_chat, **kwargs)
+
+    async def apply_game_changes(
+        self,
+        code_of_chat: int,
+        increments: dict[str, int] | None = None,
+        **values,
+    ) -> Game:
+        """Атомарно применяет изменения к строке game одним запросом.
+
+        INSERT ... ON CONFLICT (code_of_chat) DO UPDATE ... RETURNING:
+        values присваиваются, increments прибавляются на стороне БД
+        (points_awarded = points_awarded + 1), без чтения строки.
+        """
+        # Неизвестные поля игнорируем, как и раньше
+        values = {k: v for k, v in values.items() if hasattr(Game, k)}
+        increments = increments or {}
+
+        inserted = {**values, **increments}
+        changes = {getattr(Game, k).key: v for k, v in values.items()}
+        for key, delta in increments.items():
+            column = getattr(Game, key)
+            changes[column.key] = func.coalesce(column, 0) + delta
+        if not changes:
+            # DO UPDATE без изменений, чтобы RETURNING вернул строку
+            changes = {"code_of_chat": Game.code_of_chat}
+
+        query = (
+            insert(Game)
+            .values(code_of_chat=code_of_chat, **inserted)
+            .on_conflict_do_update(
+                index_elements=[Game.code_of_chat], set_=changes
+            )
+            .returning(Game)
+        )
         async with self.app.database.session() as session:
             try:
-                code_of_chat = kwargs.get(
-                    "code_of_chat", None
-                )  # Проверяем наличие code_of_chat
-                if code_of_chat is None:
-                    raise ValueError(
-                        "Поле code_of_chat обязательно для создания записи"
-                    )
-
-                # Пытаемся найти существующую запись
-                query = select(Game).where(Game.code_of_chat == code_of_chat)
                 result = await session.execute(query)
-                game = result.scalar_one_or_none()
-
-                if game:
-                    # Обновляем только переданные параметры
-                    for key, value in kwargs.items():
-                        if hasattr(game, key):
-                            setattr(game, key, value)
-                else:
-                    # Создаём новую запись, если не найдено
-                    game = Game(**kwargs)
-                    session.add(game)
-
+                game = result.scalar_one()
                 await session.commit()
-
             except IntegrityError as e:
                 await session.rollback()
                 self.logger.error("Ошибка при работе с таблицей game: %s", e)
@@ -165,8 +601,77 @@ class GameAccessor(BaseAccessor):
                 await session.rollback()
                 self.logger.error("Общая ошибка: %s", e)
                 raise
-            else:
-                return game
+
+        if "is_working" in values:
+            self._track_working(code_of_chat, values["is_working"])
+        return game
+
+    async def load_game_state(self, code_of_chat: int) -> GameState | None:
+        async with self.app.database.session() as session:
+            query = (
+                select(Game, Questions)
+                .outerjoin(Questions, Game.question_id == Questions.id)
+                .where(Game.code_of_chat == code_of_chat)
+            )
+            row = (await session.execute(query)).one_or_none()
+            if row is None:
+                self.logger.info(
+                    "Игра с code_of_chat=%s не найдена.", code_of_chat
+                )
+                return None
+
+            game, question = row
+            result = await session.execute(
+                select(Users.user_id).where(Users.chat_id == code_of_chat)
+            )
+            players = list(result.scalars().all())
+            if self.app.store is not None:
+                players.extend(
+                    username
+                    for username in self.app.store.users.pending_usernames(
+                        code_of_chat
+                    )
+                    if username not in players
+                )
+            return GameState(
+                chat_id=code_of_chat,
+                captain=game.captain_id,
+                respondent=game.respondent_id,
+                question=Question(
+                    text=question.question,
+                    answer=question.answer,
+                    id=question.id,
+                )
+                if question
+                else None,
+                round_number=game.round_number or 0,
+                points=game.points_awarded or 0,
+                players=players,
+                phase=GamePhase(game.phase) if game.phase else None,
+                phase_deadline=game.phase_deadline,
+            )
+
+    async def save_game_state(self, state: GameState, **kwargs) -> Game:
+        # Очки сюда не пишем: они меняются только инкрементом в SQL
+        return await self.apply_game_changes(
+            state.chat_id,
+            captain_id=state.captain,
+            respondent_id=state.respondent,
+            question_id=state.question.id if state.question else None,
+            round_number=state.round_number,
+            phase=state.phase,
+            phase_deadline=state.phase_deadline,
+            **kwargs,
+        )
+
+    async def list_working_chats(self) -> list[int]:
+        async with self.app.database.session() as session:
+            query = select(Game.code_of_chat).where(Game.is_working == 1)
+            chats = list((await session.execute(query)).scalars().all())
+
+        for code_of_chat in chats:
+            self._track_working(code_of_chat, 1)
+        return chats
 
     async def reset_respondent_id(self, code_of_chat: int) -> bool:
         async with self.app.database.session() as session:
@@ -182,13 +687,6 @@ class GameAccessor(BaseAccessor):
                 return True  # Возвращаем True, если операция успешна
             return False  # Если игра не найдена
 
-    async def get_all_code_of_chat(self) -> list[int]:
-        async with self.app.database.session() as session:
-            # Выполняем SELECT для получения всех code_of_chat
-            query = select(Game.code_of_chat)
-            result = await session.execute(query)
-            return result.scalars().all()
-
     async def is_captain_set(self, code_of_chat: int) -> bool:
         async with self.app.database.session() as session:
             # Запрос для получения captain_id по code_of_chat
@@ -271,15 +769,9 @@ class GameAccessor(BaseAccessor):
             )
 
     async def assign_question_to_game(
-        self, question_text: str, code_of_chat: int
+        self, question_id: int, code_of_chat: int
     ) -> None:
         async with self.app.database.session() as session:
-            query = select(Questions.id).where(
-                Questions.question == question_text
-            )
-            result = await session.execute(query)
-            question_id = result.scalar_one_or_none()
-
             update_query = (
                 update(Game)
                 .where(Game.code_of_chat == code_of_chat)
@@ -316,29 +808,28 @@ class GameAccessor(BaseAccessor):
 
     async def get_question_by_chat_id(
         self, code_of_chat: int
-    ) -> Questions | None:
+    ) -> Question | None:
         async with self.app.database.session() as session:
-            # Запрос с присоединением таблицы Questions
-            query = (
-                select(Questions)
-                .join(Game, Game.question_id == Questions.id)
-                .where(Game.code_of_chat == code_of_chat)
+            query = select(Game.question_id).where(
+                Game.code_of_chat == code_of_chat
             )
-            result = await session.execute(query)
-            question = result.scalar_one_or_none()
+            question_id = (await session.execute(query)).scalar_one_or_none()
 
-            if question:
-                self.logger.info(
-                    "Вопрос для code_of_chat=%s: %s",
-                    code_of_chat,
-                    question.question,
-                )
-            else:
-                self.logger.info(
-                    "Вопрос для code_of_chat=%s отсутствует.", code_of_chat
-                )
+        # Сам вопрос — из кэша QuizAccessor, таблица questions не нужна
+        question = None
+        if question_id is not None:
+            questions = await self.app.store.quiz.get_questions([question_id])
+            question = questions.get(question_id)
 
-            return question
+        if question:
+            self.logger.info(
+                "Вопрос для code_of_chat=%s: %s", code_of_chat, question.text
+            )
+        else:
+            self.logger.info(
+                "Вопрос для code_of_chat=%s отсутствует.", code_of_chat
+            )
+        return question
 
     async def get_points_awarded_by_chat_id(self, code_of_chat: int) -> int:
         try:
@@ -374,6 +865,11 @@ class GameAccessor(BaseAccessor):
     async def clear_game_users_and_asked_questions(
         self, code_of_chat: int
     ) -> None:
+        # Иначе буфер запишет строки чата уже после удаления
+        if self.app.store is not None:
+            await self.app.store.quiz.asked.discard(code_of_chat)
+            await self.app.store.users.joined.discard(code_of_chat)
+
         async with self.app.database.session() as session:
             # Удаляем связанные записи из asked_questions
             delete_asked_questions_query = delete(AskedQuestions).where(
@@ -389,6 +885,7 @@ class GameAccessor(BaseAccessor):
 
             # Фиксируем изменения
             await session.commit()
+            self._track_working(code_of_chat, None)
 
             self.logger.info(
                 "Записи из таблиц `game`, `asked_questions`, "
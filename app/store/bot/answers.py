@@ -0,0 +1,101 @@
+"""Сравнение ответа игрока с засчитываемыми вариантами.
+
+Варианты нормализуются один раз при добавлении вопроса и хранятся
+в question_answers.normalized; ответ игрока нормализуется так же и
+сравнивается с ними с допуском на опечатки. Миграция 8e4a2c7f1b93
+заполнила question_answers своей копией normalize_answer: после правок
+нормализации старые строки нужно пересчитать.
+"""
+
+import re
+import unicodedata
+from collections.abc import Iterable
+
+# Артикли в англоязычных ответах: «The Beatles» = «Beatles»
+ARTICLES = frozenset({"a", "an", "the"})
+_NOT_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_answer(text: str) -> str:
+    """'«Ёлка», the!' -> 'елка'.
+
+    Регистр, ё/е, кавычки, пунктуация и лишние пробелы не важны, артикли
+    отбрасываются. Дефис тоже разделитель: «Санкт-Петербург» совпадёт
+    с «санкт петербург».
+    """
+    text = unicodedata.normalize("NFKC", text).casefold().replace("ё", "е")
+    words = _NOT_WORD.sub(" ", text).split()
+    meaningful = [word for word in words if word not in ARTICLES]
+    # Ответ из одних артиклей оставляем как есть
+    return " ".join(meaningful or words)
+
+
+def allowed_typos(normalized: str) -> int:
+    # В числах опечатка меняет смысл: 1812 не то же, что 1813
+    if any(char.isdigit() for char in normalized):
+        return 0
+    if len(normalized) <= 4:
+        return 0
+    if len(normalized) <= 8:
+        return 1
+    return 2
+
+
+def within_distance(a: str, b: str, limit: int) -> bool:
+    """Расстояние Левенштейна между a и b не больше limit.
+
+    Считается только полоса шириной 2 * limit + 1 вокруг диагонали,
+    и проверка обрывается, как только вся строка матрицы превысила
+    limit, поэтому непохожие строки отсекаются за пару итераций.
+    """
+    if a == b:
+        return True
+    if limit <= 0 or abs(len(a) - len(b)) > limit:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+
+    n = len(a)
+    over = limit + 1
+    previous = [j if j <= limit else over for j in range(n + 1)]
+    for i, char in enumerate(b, 1):
+        current = [over] * (n + 1)
+        if i <= limit:
+            current[0] = i
+        row_min = current[0]
+        for j in range(max(1, i - limit), min(n, i + limit) + 1):
+            value = min(
+                previous[j - 1] + (a[j - 1] != char),
+                previous[j] + 1,
+                current[j - 1] + 1,
+            )
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return False
+        previous = current
+    return previous[n] <= limit
+
+
+def matches_answer(answer: str, variants: Iterable[str]) -> bool:
+    """Засчитывается ли ответ игрока; variants уже нормализованы."""
+    normalized = normalize_answer(answer)
+    if not normalized:
+        return False
+    return any(
+        within_distance(normalized, variant, allowed_typos(variant))
+        for variant in variants
+    )
+
+
+def answer_variants(
+    answer: str, alternatives: Iterable[str] = ()
+) -> list[tuple[str, str]]:
+    """[(вариант как в источнике, нормализованный), ...] без повторов."""
+    variants: dict[str, str] = {}
+    for raw in (answer, *alternatives):
+        variant = raw.strip()
+        normalized = normalize_answer(variant)
+        if normalized and normalized not in variants:
+            variants[normalized] = variant
+    return [(variant, normalized) for normalized, variant in variants.items()]
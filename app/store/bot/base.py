@@ -1,23 +1,200 @@
 import asyncio
+import logging
 import typing
 
+from app.store.bot.cluster import Supervisor
+from app.store.bot.filters import ALLOWED_UPDATES, UpdateFilter
+from app.store.bot.metrics import (
+    UPDATES_RECEIVED,
+    observe_tg_request,
+    register_bot_metrics,
+)
 from app.store.bot.poller import Poller
 from app.store.bot.worker import Worker
+from clients.tg import MessageScheduler, TgClient
+from clients.tg.api import TgApiError
+from clients.tg.dcs import DecodeError, UpdateView, decode_update
 
 if typing.TYPE_CHECKING:
     from app.web.app import Application
 
 
 class Bot:
+    """Приём апдейтов и игры одного процесса.
+
+    В одном процессе (processes=1) апдейты разбираются и обрабатываются
+    тут же. При processes > 1 этот процесс только принимает апдейты и
+    раздаёт их воркерам через Supervisor, а в процессах-воркерах
+    (app.worker_shard задан) Bot ничего не принимает из Telegram сам.
+    """
+
     def __init__(self, token: str, app: "Application"):
-        self.queue = asyncio.Queue()
-        self.poller = Poller(token, self.queue)
-        self.worker = Worker(token, self.queue, app)
+        config = app.config.bot
+        self.config = config
+        self.shard = app.worker_shard
+        if self.is_webhook_mode and not (
+            config.webhook_url and config.webhook_secret
+        ):
+            # Без секрета любой, кто узнал путь, мог бы слать апдейты
+            raise ValueError(
+                "BOT_MODE=webhook требует BOT_WEBHOOK_URL и BOT_WEBHOOK_SECRET"
+            )
+        self.cluster = (
+            Supervisor(
+                config.processes,
+                queue_size=config.process_queue_size,
+                restart_delay=config.restart_delay,
+            )
+            if self.shard is None and config.processes > 1
+            else None
+        )
+        total = self.shard[1] if self.shard else 1
+        # Ограниченная очередь: при перегрузке Poller ждёт, а не копит апдейты
+        self.queue = asyncio.Queue(maxsize=config.queue_size)
+        # Общий клиент: Poller и Worker делят один пул соединений
+        self.tg_client = TgClient(
+            token,
+            api_url=config.api_url,
+            connection_limit=config.connection_limit,
+            connection_limit_per_host=config.connection_limit_per_host,
+            keepalive_timeout=config.keepalive_timeout,
+            dns_cache_ttl=config.dns_cache_ttl,
+            observer=observe_tg_request,
+        )
+        self.sender = MessageScheduler(
+            self.tg_client,
+            # Глобальный лимит Telegram делится между процессами
+            global_rate=config.global_rate / total,
+            chat_rate_per_minute=config.chat_rate_per_minute,
+            chat_burst=config.chat_burst,
+            max_retries=config.send_retries,
+            concurrency=config.send_concurrency,
+        )
+        self.poller = Poller(self.tg_client, self.put_update)
+        self.worker = Worker(
+            self.sender,
+            self.queue,
+            app,
+            concurrency=config.workers,
+            shard_queue_size=config.shard_queue_size,
+            shard=self.shard,
+        )
+        # Фильтрует приёмный процесс; воркеры получают уже отобранное.
+        # Набор команд живой: новые команды роутера проходят фильтр сами
+        self.update_filter = (
+            UpdateFilter(self.worker.router.routes.keys())
+            if self.shard is None
+            else None
+        )
+        register_bot_metrics(self)
+
+    @property
+    def is_webhook_mode(self) -> bool:
+        return self.config.mode == "webhook"
+
+    @property
+    def is_ingest(self) -> bool:
+        return self.shard is None
+
+    @staticmethod
+    def _decode(raw: dict) -> UpdateView | None:
+        try:
+            upd = decode_update(raw)
+        except DecodeError as e:
+            logging.warning("Некорректный апдейт: %s", e)
+            return None
+        return upd
+
+    def _accepts(self, raw: dict) -> bool:
+        return self.update_filter is None or self.update_filter.accepts(raw)
+
+    async def put_update(self, raw: dict) -> None:
+        """Принимает апдейт, дожидаясь места в очереди (поллер, воркер)."""
+        if self.is_ingest:
+            UPDATES_RECEIVED.inc()
+        if not self._accepts(raw):
+            return
+        if self.cluster is not None:
+            await self.cluster.put(raw["message"]["chat"]["id"], raw)
+            return
+
+        upd = self._decode(raw)
+        if upd is not None:
+            await self.queue.put(upd)
+
+    def feed_update(self, raw: dict) -> bool:
+        """Кладёт апдейт из вебхука в общую очередь без ожидания обработки.
+
+        Возвращает False, если очередь переполнена и Telegram стоит
+        попросить повторить доставку.
+        """
+        UPDATES_RECEIVED.inc()
+        if not self._accepts(raw):
+            return True
+        if self.cluster is not None:
+            if not self.cluster.route(raw["message"]["chat"]["id"], raw):
+                logging.warning("Очередь воркера переполнена, апдейт отклонён")
+                return False
+            return True
+
+        upd = self._decode(raw)
+        if upd is None:
+            return True
+
+        try:
+            self.queue.put_nowait(upd)
+        except asyncio.QueueFull:
+            logging.warning("Очередь апдейтов переполнена, апдейт отклонён")
+            return False
+        return True
 
     async def start(self):
-        await self.poller.start()
-        await self.worker.start()
+        await self.tg_client.connect()
+        # Воркеры запускаем раньше приёма, чтобы первые апдейты было кому
+        # отдать
+        if self.cluster is not None:
+            await self.cluster.start()
+        else:
+            await self.sender.start()
+            await self.worker.start()
+
+        if not self.is_ingest:
+            return
+        await self._resolve_bot_username()
+        if self.is_webhook_mode:
+            res = await self.tg_client.set_webhook(
+                self.config.webhook_url,
+                self.config.webhook_secret,
+                allowed_updates=ALLOWED_UPDATES,
+            )
+            if not res.get("ok"):
+                # Без вебхука апдейты не придут: старт должен упасть
+                raise TgApiError.from_response(res)
+        else:
+            # getUpdates не работает, пока у бота установлен вебхук
+            res = await self.tg_client.delete_webhook()
+            if not res.get("ok"):
+                logging.error("deleteWebhook: %s", res.get("description", res))
+            await self.poller.start()
+
+    async def _resolve_bot_username(self):
+        # Нужен, чтобы отбрасывать команды вида /start@other_bot
+        try:
+            username = await self.tg_client.get_bot_username()
+        except Exception:
+            logging.exception("Не удалось получить имя бота")
+            return
+        self.update_filter.bot_username = username or None
+        self.worker.router.bot_username = username or None
 
     async def stop(self):
-        await self.poller.stop()
-        await self.worker.stop()
+        if self.is_ingest and not self.is_webhook_mode:
+            await self.poller.stop()
+        if self.update_filter is not None:
+            logging.info("Фильтр апдейтов: %s", self.update_filter.stats())
+        if self.cluster is not None:
+            await self.cluster.stop()
+        else:
+            await self.worker.stop()
+            await self.sender.stop()
+        await self.tg_client.close()
@@ -0,0 +1,271 @@
+import asyncio
+import logging
+import multiprocessing
+import queue
+import signal
+import time
+from multiprocessing.process import BaseProcess
+
+from aiohttp.web import Application as WebApplication, AppRunner, TCPSite
+
+from app.store import setup_store
+from app.web.app import Application
+from app.web.config import setup_config
+from app.web.logger import setup_logging
+from app.web.views.views import MetricsView
+
+logger = logging.getLogger(__name__)
+
+# Сколько апдейтов воркер забирает из очереди за один переход в поток
+PUMP_BATCH_SIZE = 256
+
+
+def shard_of(chat_id: int, total: int) -> int:
+    # Тот же остаток, что и при восстановлении игр: чат всегда у одного
+    # процесса
+    return chat_id % total
+
+
+class Supervisor:
+    """Процесс приёма апдейтов и N процессов-воркеров.
+
+    Приёмный процесс (поллер или вебхук) не разбирает апдейты, а только
+    достаёт chat_id из JSON и кладёт сырой апдейт в очередь процесса
+    shard_of(chat_id). Каждый воркер поднимает свой Bot с Worker'ом и
+    держит в памяти игры только своих чатов. Упавший воркер
+    перезапускается и поднимает игры своего шарда из БД.
+    """
+
+    def __init__(
+        self,
+        processes: int,
+        *,
+        queue_size: int = 1000,
+        restart_delay: float = 1.0,
+        max_restart_delay: float = 30.0,
+    ):
+        self.processes = processes
+        self.queue_size = queue_size
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        # spawn: дочерний процесс не наследует event loop и соединения
+        self._ctx = multiprocessing.get_context("spawn")
+        self._inboxes = [
+            self._ctx.Queue(maxsize=queue_size) for _ in range(processes)
+        ]
+        self.lost_updates = 0
+        self.requeued_updates = 0
+        self._stopping = False
+        # Отложенные перезапуски упавших воркеров, отменяются в stop()
+        self._restarts: dict[int, asyncio.TimerHandle] = {}
+        self._workers: list[BaseProcess | None] = [None] * processes
+        self._started_at = [0.0] * processes
+        self._failures = [0] * processes
+        self._task: asyncio.Task | None = None
+
+    @property
+    def alive(self) -> int:
+        return sum(
+            1 for process in self._workers if process and process.is_alive()
+        )
+
+    def route(self, chat_id: int, raw: dict) -> bool:
+        """Отдаёт апдейт воркеру; False, если его очередь переполнена."""
+        try:
+            self._inboxes[shard_of(chat_id, self.processes)].put_nowait(raw)
+        except queue.Full:
+            return False
+        return True
+
+    async def put(self, chat_id: int, raw: dict) -> None:
+        # Поллер ждёт, пока воркер разгрузится, а не теряет апдейты
+        while not self.route(chat_id, raw):
+            await asyncio.sleep(0.05)
+
+    def _spawn(self, index: int) -> None:
+        self._restarts.pop(index, None)
+        if self._stopping:
+            return
+        process = self._ctx.Process(
+            target=run_worker,
+            args=(index, self.processes, self._inboxes[index]),
+            name=f"bot-worker-{index}",
+        )
+        process.start()
+        self._workers[index] = process
+        self._started_at[index] = time.monotonic()
+        logger.info("Воркер %s запущен, pid %s", index, process.pid)
+
+    async def _monitor(self):
+        while True:
+            await asyncio.sleep(self.restart_delay)
+            for index, process in enumerate(self._workers):
+                if process is None or process.is_alive():
+                    continue
+
+                uptime = time.monotonic() - self._started_at[index]
+                # Падает сразу после старта: не перезапускаем в цикле
+                self._failures[index] = (
+                    self._failures[index] + 1 if uptime < 10 else 0
+                )
+                delay = min(
+                    self.max_restart_delay,
+                    self.restart_delay * 2 ** self._failures[index],
+                )
+                logger.error(
+                    "Воркер %s завершился с кодом %s, перезапуск через %s с",
+                    index,
+                    process.exitcode,
+                    delay,
+                )
+                self._workers[index] = None
+                self._replace_inbox(index)
+                self._restarts[index] = asyncio.get_running_loop().call_later(
+                    delay, self._spawn, index
+                )
+
+    def _replace_inbox(self, index: int) -> None:
+        # Процесс, убитый посреди get(), оставляет блокировку очереди
+        # захваченной, и новый воркер повис бы на ней. Недоставленные
+        # апдейты переносим в свежую очередь, пока блокировка свободна;
+        # если её держит мёртвый процесс, get_nowait сразу выдаст Empty,
+        # и оставшиеся апдейты теряются
+        old = self._inboxes[index]
+        new = self._ctx.Queue(maxsize=self.queue_size)
+        self._inboxes[index] = new
+        requeued = 0
+        while True:
+            try:
+                raw = old.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                break
+            if raw is not None:
+                new.put_nowait(raw)
+                requeued += 1
+        self.requeued_updates += requeued
+        if requeued:
+            logger.info("Воркер %s: перенесено апдейтов: %s", index, requeued)
+        try:
+            lost = old.qsize()
+        except NotImplementedError:
+            lost = 0
+        self.lost_updates += lost
+        if lost:
+            logger.warning("Воркер %s: потеряно апдейтов: %s", index, lost)
+        old.cancel_join_thread()
+        old.close()
+
+    async def start(self):
+        for index in range(self.processes):
+            self._spawn(index)
+        self._task = asyncio.create_task(self._monitor())
+
+    async def stop(self, timeout: float = 10):
+        self._stopping = True
+        for handle in self._restarts.values():
+            handle.cancel()
+        self._restarts.clear()
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        # None в очереди: воркер дорабатывает то, что уже получил, и выходит.
+        # Воркер с полной очередью не получит его и будет завершён по
+        # общему дедлайну ниже
+        for index, inbox in enumerate(self._inboxes):
+            try:
+                inbox.put_nowait(None)
+            except queue.Full:
+                logger.warning("Воркер %s: очередь полна при остановке", index)
+
+        deadline = time.monotonic() + timeout
+        for index, process in enumerate(self._workers):
+            if process is None:
+                continue
+            await asyncio.to_thread(
+                process.join, max(0.0, deadline - time.monotonic())
+            )
+            if process.is_alive():
+                logger.warning("Воркер %s не остановился, завершаем", index)
+                process.terminate()
+                await asyncio.to_thread(process.join, 1)
+            self._workers[index] = None
+
+
+def run_worker(index: int, total: int, inbox: multiprocessing.Queue) -> None:
+    """Точка входа процесса-воркера."""
+    # Остановкой управляет супервизор через очередь, Ctrl+C не должен
+    # обрывать воркер посреди обработки
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    asyncio.run(_serve_worker(index, total, inbox))
+
+
+async def _serve_worker(
+    index: int, total: int, inbox: multiprocessing.Queue
+) -> None:
+    app = Application()
+    app.worker_shard = (index, total)
+    setup_logging(app)
+    setup_config(app)
+    setup_store(app)
+
+    # HTTP-сервер воркеру не нужен, AppRunner только прогоняет
+    # on_startup/on_cleanup: подключение к БД, запуск и остановку бота
+    runner = AppRunner(app, handle_signals=False)
+    await runner.setup()
+    metrics = None
+    try:
+        metrics = await serve_worker_metrics(app, index)
+        await _pump(inbox, app)
+    finally:
+        if metrics is not None:
+            await metrics.cleanup()
+        await runner.cleanup()
+
+
+async def serve_worker_metrics(
+    app: Application, index: int
+) -> AppRunner | None:
+    """Отдаёт /metrics воркера на отдельном порту.
+
+    Игровые метрики (команды, БД, отправка, игры) пишутся только в
+    воркерах, а /metrics приёмного процесса их не видит. Каждый воркер
+    слушает worker_metrics_port + index, Prometheus опрашивает их как
+    отдельные цели.
+    """
+    config = app.config.bot
+    if not config.worker_metrics_port:
+        return None
+
+    metrics_app = WebApplication()
+    metrics_app.router.add_view("/metrics", MetricsView)
+    runner = AppRunner(metrics_app, handle_signals=False, access_log=None)
+    await runner.setup()
+    port = config.worker_metrics_port + index
+    try:
+        await TCPSite(runner, config.worker_metrics_host, port).start()
+    except OSError:
+        # Без метрик воркер всё равно должен обрабатывать игры
+        logger.exception("Воркер %s: порт метрик %s занят", index, port)
+        await runner.cleanup()
+        return None
+    logger.info("Воркер %s: метрики на порту %s", index, port)
+    return runner
+
+
+async def _pump(inbox: multiprocessing.Queue, app: Application) -> None:
+    bot = app.store.bots_manager
+    loop = asyncio.get_running_loop()
+    while True:
+        batch = [await loop.run_in_executor(None, inbox.get)]
+        while len(batch) < PUMP_BATCH_SIZE:
+            try:
+                batch.append(inbox.get_nowait())
+            except queue.Empty:
+                break
+
+        for raw in batch:
+            if raw is None:
+                return
+            await bot.put_update(raw)
@@ -0,0 +1,191 @@
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+
+from clients.tg.dcs import MessageView, UpdateView
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class CommandContext:
+    update: UpdateView
+    command: str
+    args: str
+    chat_id: int
+    user_id: int
+    username: str
+
+
+Handler = Callable[[CommandContext], Awaitable[None]]
+# middleware(ctx, call_next): может не вызывать call_next и так отбросить
+# команду
+Middleware = Callable[[CommandContext, Handler], Awaitable[None]]
+
+
+@dataclass(slots=True)
+class Route:
+    handler: Handler
+    requires_args: bool = False
+    middlewares: tuple[Middleware, ...] = ()
+    # handler, обёрнутый во все middleware; собирается при регистрации
+    call: Handler | None = None
+
+
+def parse_command(message: MessageView) -> tuple[str, str | None, str] | None:
+    """('/choose', 'botname' | None, '@vasya') или None, если не команда.
+
+    Команду берём из entity bot_command в начале сообщения; без entities
+    (старые клиенты, тесты) — до первого пробельного символа.
+    """
+    text = message.text
+    if not text or not text.startswith("/"):
+        return None
+
+    end = None
+    for entity in message.raw.get("entities") or ():
+        if entity.get("type") == "bot_command" and entity.get("offset") == 0:
+            end = entity.get("length")
+            break
+    # Длина entity в UTF-16; для ASCII-команды она совпадает с len()
+    if end is None or not text[:end].isascii():
+        end = next(
+            (i for i, char in enumerate(text) if char.isspace()), len(text)
+        )
+
+    command, _, mention = text[:end].partition("@")
+    return command.lower(), mention or None, text[end:].strip()
+
+
+class CommandRouter:
+    """Таблица команд бота: разбор один раз и поиск обработчика по dict.
+
+    Обработчики регистрируются через add() или декоратор command(),
+    в том числе из других модулей: router.include(other_router).
+    """
+
+    def __init__(self, bot_username: str | None = None):
+        self.bot_username = bot_username
+        self.routes: dict[str, Route] = {}
+        self._middlewares: list[Middleware] = []
+
+    def add(
+        self,
+        command: str,
+        handler: Handler,
+        *,
+        requires_args: bool = False,
+        middlewares: Iterable[Middleware] = (),
+    ) -> None:
+        command = command.lower()
+        if not command.startswith("/"):
+            command = f"/{command}"
+        route = Route(handler, requires_args, tuple(middlewares))
+        route.call = self._chain(route)
+        self.routes[command] = route
+
+    def command(
+        self,
+        command: str,
+        *,
+        requires_args: bool = False,
+        middlewares: Iterable[Middleware] = (),
+    ) -> Callable[[Handler], Handler]:
+        def decorator(handler: Handler) -> Handler:
+            self.add(
+                command,
+                handler,
+                requires_args=requires_args,
+                middlewares=middlewares,
+            )
+            return handler
+
+        return decorator
+
+    def use(self, middleware: Middleware) -> None:
+        """Middleware для всех команд, снаружи командных."""
+        self._middlewares.append(middleware)
+        for route in self.routes.values():
+            route.call = self._chain(route)
+
+    def include(self, other: "CommandRouter") -> None:
+        for command, route in other.routes.items():
+            self.add(
+                command,
+                route.handler,
+                requires_args=route.requires_args,
+                middlewares=route.middlewares,
+            )
+
+    def _chain(self, route: Route) -> Handler:
+        call = route.handler
+        for middleware in reversed((*self._middlewares, *route.middlewares)):
+            call = _bind(middleware, call)
+        return call
+
+    def context(self, upd: UpdateView) -> CommandContext | None:
+        message = upd.message
+        if message is None:
+            return None
+        parsed = parse_command(message)
+        if parsed is None:
+            return None
+        command, mention, args = parsed
+        if (
+            mention is not None
+            and self.bot_username is not None
+            and mention.lower() != self.bot_username.lower()
+        ):
+            return None
+
+        sender = message.from_
+        # Игроки различаются по username: без него команду не обработать
+        if sender is None or not sender.username:
+            return None
+        return CommandContext(
+            update=upd,
+            command=command,
+            args=args,
+            chat_id=message.chat.id,
+            user_id=sender.id,
+            username=sender.username,
+        )
+
+    async def dispatch(self, upd: UpdateView) -> bool:
+        """True, если команда нашлась и передана обработчику."""
+        ctx = self.context(upd)
+        if ctx is None:
+            return False
+        route = self.routes.get(ctx.command)
+        if route is None or (route.requires_args and not ctx.args):
+            return False
+        await route.call(ctx)
+        return True
+
+
+def _bind(middleware: Middleware, call_next: Handler) -> Handler:
+    async def call(ctx: CommandContext) -> None:
+        await middleware(ctx, call_next)
+
+    return call
+
+
+def timing(threshold: float = 0.5) -> Middleware:
+    """Пишет в лог команды, обработка которых дольше threshold секунд."""
+
+    async def middleware(ctx: CommandContext, call_next: Handler) -> None:
+        started = time.perf_counter()
+        try:
+            await call_next(ctx)
+        finally:
+            elapsed = time.perf_counter() - started
+            if elapsed > threshold:
+                logger.warning(
+                    "Команда %s в чате %s обработана за %.3f с",
+                    ctx.command,
+                    ctx.chat_id,
+                    elapsed,
+                )
+
+    return middleware
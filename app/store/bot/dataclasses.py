@@ -1,10 +1,24 @@
-from dataclasses import dataclass
+import enum
+from dataclasses import dataclass, field
+from datetime import datetime
+
+
+class GamePhase(enum.StrEnum):
+    REGISTRATION = "registration"
+    STARTING = "starting"
+    DISCUSSION = "discussion"
+    CHOOSING = "choosing"
+    ANSWERING = "answering"
+    FINISHED = "finished"
 
 
 @dataclass
 class Question:
     text: str
     answer: str
+    id: int | None = None
+    # Нормализованные засчитываемые ответы, см. app/store/bot/answers.py
+    variants: tuple[str, ...] = ()
 
 
 @dataclass
@@ -12,3 +26,27 @@ class Player:
     username: str
     user_id: int
     is_captain: bool = False
+
+
+@dataclass
+class GameState:
+    chat_id: int
+    # None у игр, начатых до появления фаз: такие не восстановить
+    phase: GamePhase | None = GamePhase.REGISTRATION
+    # Настенное время, а не monotonic: переживает перезапуск процесса
+    phase_deadline: datetime | None = None
+    captain: str | None = None
+    respondent: str | None = None
+    question: Question | None = None
+    round_number: int = 0
+    points: int = 0
+    players: list[str] = field(default_factory=list)
+    # Заранее перемешанные вопросы на всю игру
+    deck: list[Question] = field(default_factory=list)
+
+
+@dataclass
+class GameStatus:
+    exists: bool
+    is_working: bool = False
+    points: int = 0
@@ -0,0 +1,92 @@
+from collections import Counter
+from collections.abc import Collection
+
+# Команды по умолчанию; Bot передаёт фильтру таблицу CommandRouter.
+# Остальное отбрасывается до разбора апдейта и постановки в очередь
+COMMANDS = frozenset(
+    {
+        "/start",
+        "/join",
+        "/finish_reg",
+        "/choose",
+        "/answer",
+        "/help",
+        "/stat",
+    }
+)
+# Telegram не присылает другие типы апдейтов (my_chat_member и т.п.)
+ALLOWED_UPDATES = ("message",)
+GROUP_CHAT_TYPES = frozenset({"group", "supergroup"})
+
+
+def extract_command(text: str) -> tuple[str, str | None]:
+    """'/choose@bot @vasya' -> ('/choose', 'bot')."""
+    end = len(text)
+    for i, char in enumerate(text):
+        if char.isspace():
+            end = i
+            break
+    command, _, mention = text[:end].partition("@")
+    return command, mention or None
+
+
+class UpdateFilter:
+    """Дешёвая проверка сырого апдейта из JSON.
+
+    Пропускает только текстовые команды бота из групповых чатов и
+    считает, сколько и по какой причине отброшено.
+    """
+
+    def __init__(
+        self,
+        commands: Collection[str] = COMMANDS,
+        bot_username: str | None = None,
+    ):
+        self.commands = commands
+        # Команды вида /start@other_bot адресованы не нам
+        self.bot_username = bot_username
+        self.passed = 0
+        self.dropped: Counter[str] = Counter()
+
+    def accepts(self, raw: dict) -> bool:
+        reason = self._reject_reason(raw)
+        if reason is not None:
+            self.dropped[reason] += 1
+            return False
+        self.passed += 1
+        return True
+
+    def _reject_reason(self, raw: dict) -> str | None:
+        # Не объект (например, [1] во вебхуке) тоже не сообщение
+        message = raw.get("message") if isinstance(raw, dict) else None
+        chat = message.get("chat") if isinstance(message, dict) else None
+        if not isinstance(chat, dict) or "id" not in chat:
+            return "not_message"
+        if chat.get("type") not in GROUP_CHAT_TYPES:
+            return "not_group"
+
+        text = message.get("text")
+        if not isinstance(text, str) or not text.startswith("/"):
+            return "not_command"
+
+        command, mention = extract_command(text)
+        if command.lower() not in self.commands:
+            return "unknown_command"
+        if (
+            mention is not None
+            and self.bot_username is not None
+            and mention.lower() != self.bot_username.lower()
+        ):
+            return "other_bot"
+        return None
+
+    def stats(self) -> dict[str, int | float]:
+        dropped = sum(self.dropped.values())
+        total = dropped + self.passed
+        return {
+            "received": total,
+            "passed": self.passed,
+            "dropped": dropped,
+            "pass_ratio": self.passed / total if total else 0.0,
+            **{f"dropped_{k}": v for k, v in self.dropped.items()},
+        }
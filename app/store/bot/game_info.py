@@ -1,143 +1,336 @@
-import asyncio
 import typing
-import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime, timedelta
 
 if typing.TYPE_CHECKING:
+    from app.store.database.models import Game
     from app.web.app import Application
+from app.store.bot.answers import matches_answer, normalize_answer
+from app.store.bot.dataclasses import GamePhase, GameState
 from app.store.bot.messages import (
+    ANSWER_TIMEOUT_TEXT,
     CHOOSE_PLAYER_TEXT,
+    CHOOSE_TIMEOUT_TEXT,
     CORRECT_ANSWER_TEXT,
-    DISCUSSION_WARNING_TEXT,
+    DISCUSSION_WARNING_TEMPLATE,
     FINAL_DRAW_TEXT,
     FINAL_LOSE_TEXT,
     FINAL_WIN_TEXT,
+    GAME_RESUMED_TEXT,
     NOT_YOUR_TURN_TEXT,
     PLAYER_ANSWER_PROMPT,
     PLAYER_NOT_FOUND_TEXT,
+    QUESTIONS_EMPTY_TEXT,
     ROUND_ANNOUNCEMENT_TEMPLATE,
     RULES_TEXT,
     SCORE_TEXT,
     START_TEXT,
+    TOO_EARLY_TO_ANSWER_TEXT,
+    TOO_EARLY_TO_CHOOSE_TEXT,
     WRONG_ANSWER_TEXT,
-    TOO_EARLY_TO_CHOOSE_TEXT,  # You'll need to add this to messages
-    TOO_EARLY_TO_ANSWER_TEXT,  # You'll need to add this to messages
 )
+from app.store.bot.timers import TimerHandle
+from app.web.config import GameConfig
+from clients.tg import MessageScheduler, Priority
+
+GameAction = Callable[[], Awaitable[None]]
+# schedule(chat_id, delay, action): action выполнится в очереди этого чата
+ScheduleFn = Callable[[int, float, GameAction], TimerHandle]
 
 
 class Statistics:
-    def __init__(self, tg_client, chat_id: int, app: "Application"):
-        self.rounds = 3
+    """Ход игры как набор переходов между фазами.
+
+    Ничего не спит: каждая фаза ставит дедлайн в общий DeadlineScheduler,
+    а по его срабатыванию следующий шаг выполняется в очереди чата
+    наравне с командами игроков. Фаза и её дедлайн пишутся в game при
+    каждом переходе, поэтому после перезапуска игру можно продолжить
+    через resume().
+    """
+
+    def __init__(
+        self,
+        sender: MessageScheduler,
+        chat_id: int,
+        app: "Application",
+        schedule: ScheduleFn,
+        cancel: Callable[[TimerHandle], None],
+        on_finish: Callable[[int], None] | None = None,
+    ):
+        config = app.config.game if app.config and app.config.game else None
+        self.config = config or GameConfig()
+        self.rounds = self.config.rounds
+        self.discussion_time = self.config.discussion_time
         self.app = app
-        self.discussion_time = 60  # Set to 60 seconds
-        self.tg_client = tg_client
+        self.sender = sender
         self.chat_id = chat_id
-        self.round_complete = None
-        self.discussion_end_time = 0
-        self.can_choose = False
-        self.can_answer = False
+        self._schedule = schedule
+        self._cancel = cancel
+        self.on_finish = on_finish
+        self._timers: list[TimerHandle] = []
+        # Состояние игры держим в памяти и пишем в БД одной транзакцией
+        self.state: GameState | None = None
+
+    @property
+    def can_choose(self) -> bool:
+        return self.state is not None and self.state.phase == GamePhase.CHOOSING
+
+    @property
+    def can_answer(self) -> bool:
+        return (
+            self.state is not None and self.state.phase == GamePhase.ANSWERING
+        )
+
+    def _after(self, delay: float, action: GameAction) -> None:
+        self._timers.append(self._schedule(self.chat_id, delay, action))
+
+    def cancel_timers(self) -> None:
+        for handle in self._timers:
+            self._cancel(handle)
+        self._timers = []
+
+    def _is_current(self, phase: GamePhase, round_number: int) -> bool:
+        # Таймер мог сработать уже после перехода в другую фазу
+        return (
+            self.state.phase == phase
+            and self.state.round_number == round_number
+        )
+
+    async def _set_phase(
+        self, phase: GamePhase, timeout: float | None = None, **kwargs
+    ) -> "Game":
+        self.cancel_timers()
+        self.state.phase = phase
+        self.state.phase_deadline = (
+            datetime.now(UTC) + timedelta(seconds=timeout)
+            if timeout is not None
+            else None
+        )
+        game = await self.app.store.creategame.save_game_state(
+            self.state, **kwargs
+        )
+        if timeout is not None:
+            self._arm(timeout)
+        return game
+
+    def _arm(self, remaining: float) -> None:
+        """Ставит таймеры текущей фазы, до дедлайна которой remaining с."""
+        phase = self.state.phase
+        round_number = self.state.round_number
+        if phase == GamePhase.STARTING:
+            if round_number == 0:
+                self._after(remaining, self._begin)
+            elif round_number >= self.rounds:
+                self._after(remaining, self.finish_game)
+            else:
+                self._after(
+                    remaining, lambda: self.play_round(round_number + 1)
+                )
+        elif phase == GamePhase.DISCUSSION:
+            warn_in = remaining - self.config.warning_before
+            if warn_in > 0:
+                self._after(warn_in, lambda: self._warn(round_number))
+            self._after(remaining, lambda: self._open_choosing(round_number))
+        elif phase == GamePhase.CHOOSING:
+            self._after(remaining, lambda: self._choose_timeout(round_number))
+        elif phase == GamePhase.ANSWERING:
+            self._after(remaining, lambda: self._answer_timeout(round_number))
+
+    async def resume(self, state: GameState) -> None:
+        """Продолжает игру, прерванную перезапуском, с сохранённой фазы.
+
+        Оставшиеся вопросы добираются заново: уже заданные помечены
+        в asked_questions и повторно не выпадут. Отметка текущего вопроса
+        могла не дойти до базы из буфера отложенной вставки, поэтому он
+        исключается явно и помечается ещё раз. Просроченный дедлайн
+        срабатывает сразу.
+        """
+        self.state = state
+        quiz = self.app.store.quiz
+        current = [state.question.id] if state.question is not None else []
+        for question_id in current:
+            await quiz.mark_question_as_asked(self.chat_id, question_id)
+        left = self.rounds - state.round_number
+        if left > 0:
+            self.state.deck = await quiz.draw_question_deck(
+                self.chat_id, left, exclude=current
+            )
+
+        remaining = 0.0
+        if state.phase_deadline is not None:
+            remaining = max(
+                0.0,
+                (state.phase_deadline - datetime.now(UTC)).total_seconds(),
+            )
+        await self.sender.send_message(
+            self.chat_id, GAME_RESUMED_TEXT, Priority.HIGH
+        )
+        self._arm(remaining)
 
     async def start_game(self):
-        captain = await self.app.store.creategame.is_captain_set(self.chat_id)
-        rules = RULES_TEXT.format(captain=captain, rounds=self.rounds)
-        await self.tg_client.send_message(self.chat_id, rules)
-        await asyncio.sleep(5)
-        await self.tg_client.send_message(self.chat_id, START_TEXT)
+        self.state = await self.app.store.creategame.load_game_state(
+            self.chat_id
+        )
+        # Колода с вариантами ответов: дальше ответы игроков
+        # проверяются без базы
+        self.state.deck = await self.app.store.quiz.draw_question_deck(
+            self.chat_id, self.rounds
+        )
+        await self._set_phase(GamePhase.STARTING, self.config.rules_delay)
 
-    async def play_round(self, round_number: int):
-        self.round_complete = asyncio.Event()
-        self.can_choose = False
-        self.can_answer = False
+        rules = RULES_TEXT.format(
+            captain=self.state.captain, rounds=self.rounds
+        )
+        await self.sender.send_message(self.chat_id, rules)
+
+    async def _begin(self):
+        if self.state.phase != GamePhase.STARTING:
+            return
+        await self.sender.send_message(self.chat_id, START_TEXT)
+        await self.play_round(1)
+
+    async def play_round(self, round_number: int) -> bool:
+        if not self.state.deck:
+            await self.sender.send_message(self.chat_id, QUESTIONS_EMPTY_TEXT)
+            await self.finish_game()
+            return False
 
-        await self.app.store.creategame.set_round_number(self.chat_id, round_number)
+        question = self.state.deck.pop()
+        await self.app.store.quiz.mark_question_as_asked(
+            self.chat_id, question.id
+        )
 
-        question = await self.app.store.quiz.get_random_unasked_question(self.chat_id)
-        await self.app.store.quiz.mark_question_as_asked(self.chat_id, question.id)
-        await self.app.store.creategame.assign_question_to_game(question.question, self.chat_id)
+        self.state.round_number = round_number
+        self.state.question = question
+        await self._set_phase(GamePhase.DISCUSSION, self.discussion_time)
 
         round_announcement = ROUND_ANNOUNCEMENT_TEMPLATE.format(
             round_number=round_number,
-            question_text=question.question,
+            question_text=question.text,
             discussion_time=self.discussion_time,
         )
-        await self.tg_client.send_message(self.chat_id, round_announcement)
+        await self.sender.send_message(
+            self.chat_id, round_announcement, Priority.HIGH
+        )
+        return True
 
-        # Set discussion end time
-        self.discussion_end_time = time.time() + self.discussion_time
+    async def _warn(self, round_number: int):
+        if not self._is_current(GamePhase.DISCUSSION, round_number):
+            return
+        warning = DISCUSSION_WARNING_TEMPLATE.format(
+            seconds=self.config.warning_before
+        )
+        await self.sender.send_message(self.chat_id, warning, Priority.HIGH)
 
-        # Wait for discussion time
-        await asyncio.sleep(self.discussion_time - 10)
-        await self.tg_client.send_message(self.chat_id, DISCUSSION_WARNING_TEXT)
-        await asyncio.sleep(10)
+    async def _open_choosing(self, round_number: int):
+        if not self._is_current(GamePhase.DISCUSSION, round_number):
+            return
+        await self._set_phase(GamePhase.CHOOSING, self.config.choose_timeout)
+        await self.sender.send_message(
+            self.chat_id,
+            CHOOSE_PLAYER_TEXT.format(captain=self.state.captain),
+            Priority.HIGH,
+        )
 
-        # Enable choosing after discussion time
-        self.can_choose = True
-        captain = await self.app.store.creategame.is_captain_set(self.chat_id)
-        await self.tg_client.send_message(
+    async def _choose_timeout(self, round_number: int):
+        if not self._is_current(GamePhase.CHOOSING, round_number):
+            return
+        await self.sender.send_message(
             self.chat_id,
-            CHOOSE_PLAYER_TEXT.format(captain=captain),
+            CHOOSE_TIMEOUT_TEXT.format(
+                correct_answer=self.state.question.answer
+            ),
+            Priority.HIGH,
         )
+        await self._complete_round()
 
-        await self.round_complete.wait()
-        self.round_complete.clear()
-        return True
+    async def _answer_timeout(self, round_number: int):
+        if not self._is_current(GamePhase.ANSWERING, round_number):
+            return
+        self.state.respondent = None
+        await self.sender.send_message(
+            self.chat_id,
+            ANSWER_TIMEOUT_TEXT.format(
+                correct_answer=self.state.question.answer
+            ),
+            Priority.HIGH,
+        )
+        await self._complete_round()
+
+    async def _send_score(self):
+        score_team = self.state.points
+        now_rounds = self.state.round_number
+        await self.sender.send_message(
+            self.chat_id,
+            SCORE_TEXT.format(
+                team_score=score_team, bot_score=abs(now_rounds - score_team)
+            ),
+        )
+
+    async def _complete_round(self, increments: dict[str, int] | None = None):
+        # Смена фазы, сброс отвечающего и начисление очков одним запросом
+        game = await self._set_phase(
+            GamePhase.STARTING, self.config.round_pause, increments=increments
+        )
+        self.state.points = game.points_awarded or 0
+        await self._send_score()
 
     async def handle_answer(self, username: str, answer: str) -> bool:
         if not self.can_answer:
-            await self.tg_client.send_message(self.chat_id, TOO_EARLY_TO_ANSWER_TEXT)
+            await self.sender.send_message(
+                self.chat_id, TOO_EARLY_TO_ANSWER_TEXT, Priority.LOW
+            )
             return False
 
-        choosen_player = await self.app.store.creategame.get_respondent_id_by_chat_id(self.chat_id)
+        choosen_player = self.state.respondent
         if not choosen_player:
             return False
 
         if username != choosen_player:
-            await self.tg_client.send_message(self.chat_id, NOT_YOUR_TURN_TEXT)
+            await self.sender.send_message(
+                self.chat_id, NOT_YOUR_TURN_TEXT, Priority.LOW
+            )
             return False
 
-        # Disable further answers for this round
-        self.can_answer = False
-
-        await self.app.store.creategame.create_or_update_game(
-            code_of_chat=self.chat_id, respondent_id=None
-        )
-
-        question = await self.app.store.creategame.get_question_by_chat_id(self.chat_id)
-        score_team = await self.app.store.creategame.get_points_awarded_by_chat_id(self.chat_id)
+        question = self.state.question
+        if not question.variants:
+            # Вопрос восстановленной игры загружен без вариантов
+            variants = await self.app.store.quiz.get_answer_variants(
+                [question.id]
+            )
+            question.variants = variants.get(question.id) or (
+                normalize_answer(question.answer),
+            )
+        is_correct = matches_answer(answer, question.variants)
 
-        if answer.lower().strip() == question.answer.lower().strip():
-            await self.app.store.creategame.create_or_update_game(
-                code_of_chat=self.chat_id, points_awarded=score_team + 1
+        self.state.respondent = None
+        if is_correct:
+            await self.sender.send_message(
+                self.chat_id, CORRECT_ANSWER_TEXT, Priority.HIGH
             )
-            await self.tg_client.send_message(self.chat_id, CORRECT_ANSWER_TEXT)
         else:
-            await self.tg_client.send_message(
+            await self.sender.send_message(
                 self.chat_id,
                 WRONG_ANSWER_TEXT.format(correct_answer=question.answer),
+                Priority.HIGH,
             )
 
-        score_team = await self.app.store.creategame.get_points_awarded_by_chat_id(self.chat_id)
-        now_rounds = await self.app.store.creategame.get_round_number_by_chat_id(self.chat_id)
-        await self.tg_client.send_message(
-            self.chat_id,
-            SCORE_TEXT.format(
-                team_score=score_team, bot_score=abs(now_rounds - score_team)
-            ),
+        await self._complete_round(
+            {"points_awarded": 1} if is_correct else None
         )
-
-        if self.round_complete is not None:
-            self.round_complete.set()
         return True
 
     async def handle_captain_choice(self, chosen_username: str) -> bool:
         if not self.can_choose:
-            await self.tg_client.send_message(self.chat_id, TOO_EARLY_TO_CHOOSE_TEXT)
+            await self.sender.send_message(
+                self.chat_id, TOO_EARLY_TO_CHOOSE_TEXT, Priority.LOW
+            )
             return False
 
-        choosen_player = await self.app.store.creategame.get_respondent_id_by_chat_id(self.chat_id)
-        if choosen_player:
+        if self.state.respondent:
             return False
 
-        participants = await self.app.store.users.get_users_by_chat_id(self.chat_id)
+        participants = self.state.players
 
         chosen_player = next(
             (player for player in participants if player == chosen_username),
@@ -145,26 +338,27 @@ class Statistics:
         )
 
         if not chosen_player:
-            await self.tg_client.send_message(self.chat_id, PLAYER_NOT_FOUND_TEXT)
+            await self.sender.send_message(
+                self.chat_id, PLAYER_NOT_FOUND_TEXT, Priority.LOW
+            )
             return False
 
-        # Enable answering after successful choice
-        self.can_choose = False
-        self.can_answer = True
+        self.state.respondent = chosen_username
+        await self._set_phase(GamePhase.ANSWERING, self.config.answer_timeout)
 
-        await self.app.store.creategame.create_or_update_game(
-            code_of_chat=self.chat_id, respondent_id=chosen_username
-        )
-
-        await self.tg_client.send_message(
+        await self.sender.send_message(
             self.chat_id,
             PLAYER_ANSWER_PROMPT.format(player=chosen_username),
+            Priority.HIGH,
         )
         return True
 
     async def finish_game(self):
-        score_team = await self.app.store.creategame.get_points_awarded_by_chat_id(self.chat_id)
-        now_rounds = await self.app.store.creategame.get_round_number_by_chat_id(self.chat_id)
+        if self.state.phase == GamePhase.FINISHED:
+            return
+
+        score_team = self.state.points
+        now_rounds = self.state.round_number
         score_bot = abs(now_rounds - score_team)
 
         if score_team > score_bot:
@@ -180,7 +374,7 @@ class Statistics:
                 team_score=score_team, bot_score=score_bot
             )
 
-        await self.tg_client.send_message(self.chat_id, final_message)
-        await self.app.store.creategame.create_or_update_game(
-            code_of_chat=self.chat_id, is_working=0
-        )
\ No newline at end of file
+        await self.sender.send_message(self.chat_id, final_message)
+        await self._set_phase(GamePhase.FINISHED, is_working=0)
+        if self.on_finish is not None:
+            self.on_finish(self.chat_id)
@@ -0,0 +1,154 @@
+import csv
+import json
+import logging
+import typing
+from collections.abc import AsyncIterable, Callable
+from dataclasses import dataclass
+
+if typing.TYPE_CHECKING:
+    from app.store.bot.accessor import QuizAccessor
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("jsonl", "csv")
+# Засчитываемые варианты ответа в CSV и строкой в JSONL: "Ёлка; ель"
+ALTERNATIVES_SEPARATOR = ";"
+# Пачка уходит одним INSERT по 2 параметра на вопрос, а у asyncpg их
+# не больше 32767
+MAX_BATCH_SIZE = 5000
+
+
+@dataclass
+class ImportReport:
+    total: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    invalid: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "total": self.total,
+            "inserted": self.inserted,
+            "duplicates": self.duplicates,
+            "invalid": self.invalid,
+        }
+
+
+class QuestionImporter:
+    """Потоковый импорт вопросов из JSONL или CSV.
+
+    Строки читаются по одной и копятся в пачку фиксированного размера,
+    поэтому память не зависит от размера файла.
+    """
+
+    def __init__(
+        self,
+        quiz: "QuizAccessor",
+        batch_size: int = 1000,
+        on_progress: Callable[[ImportReport], None] | None = None,
+    ):
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(
+                f"batch_size должен быть от 1 до {MAX_BATCH_SIZE}: {batch_size}"
+            )
+        self.quiz = quiz
+        self.batch_size = batch_size
+        self.on_progress = on_progress
+
+    async def import_lines(
+        self, lines: AsyncIterable[str], fmt: str = "jsonl"
+    ) -> ImportReport:
+        if fmt not in FORMATS:
+            raise ValueError(f"Неизвестный формат импорта: {fmt}")
+
+        report = ImportReport()
+        batch: dict[str, dict] = {}
+        parse = self._parse_jsonl if fmt == "jsonl" else self._parse_csv
+
+        async for row in parse(lines):
+            report.total += 1
+            question = (row.get("question") or "").strip()
+            answer = (row.get("answer") or "").strip()
+            if not question or not answer:
+                report.invalid += 1
+                continue
+            if question in batch:
+                report.duplicates += 1
+                continue
+
+            batch[question] = {
+                "question": question,
+                "answer": answer,
+                "alternatives": self._alternatives(row.get("alternatives")),
+            }
+            if len(batch) >= self.batch_size:
+                await self._flush(batch, report)
+
+        await self._flush(batch, report)
+        logger.info("Импорт вопросов завершён: %s", report.as_dict())
+        return report
+
+    @staticmethod
+    def _alternatives(value) -> list[str]:
+        if not value:
+            return []
+        if isinstance(value, str):
+            value = value.split(ALTERNATIVES_SEPARATOR)
+        if not isinstance(value, list):
+            return []
+        return [item.strip() for item in value if isinstance(item, str)]
+
+    async def _flush(
+        self, batch: dict[str, dict], report: ImportReport
+    ) -> None:
+        if not batch:
+            return
+        inserted = await self.quiz.bulk_create_questions(list(batch.values()))
+        report.inserted += inserted
+        report.duplicates += len(batch) - inserted
+        batch.clear()
+
+        logger.info(
+            "Импортировано строк: %s, добавлено вопросов: %s",
+            report.total,
+            report.inserted,
+        )
+        if self.on_progress is not None:
+            self.on_progress(report)
+
+    @staticmethod
+    async def _parse_jsonl(
+        lines: AsyncIterable[str],
+    ) -> typing.AsyncIterator[dict]:
+        async for line in lines:
+            stripped = line.strip()
+            if not stripped:
+                continue
+            try:
+                row = json.loads(stripped)
+            except json.JSONDecodeError:
+                row = {}
+            yield row if isinstance(row, dict) else {}
+
+    @staticmethod
+    async def _parse_csv(
+        lines: AsyncIterable[str],
+    ) -> typing.AsyncIterator[dict]:
+        header = None
+        pending = ""
+        async for line in lines:
+            pending += line if line.endswith("\n") else line + "\n"
+            # Нечётное число кавычек: поле с переводом строки ещё не закрыто
+            if pending.count('"') % 2:
+                continue
+
+            record, pending = pending, ""
+            values = next(csv.reader([record]), [])
+            if not values:
+                continue
+            if header is None:
+                header = [value.strip().lower() for value in values]
+                if "question" in header and "answer" in header:
+                    continue
+                header = ["question", "answer"]
+            yield dict(zip(header, values, strict=False))
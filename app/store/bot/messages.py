@@ -38,7 +38,7 @@ ROUND_ANNOUNCEMENT_TEMPLATE = (
     "💭 Вопрос: {question_text}\n\n"
     "⏳ Время на обсуждение: {discussion_time} секунд"
 )
-DISCUSSION_WARNING_TEXT = "⚠️ 10 секунд до окончания обсуждения!"
+DISCUSSION_WARNING_TEMPLATE = "⚠️ {seconds} секунд до окончания обсуждения!"
 CHOOSE_PLAYER_TEXT = (
     "👑 @{captain}, выберите отвечающего командой /choose @username"
 )
@@ -46,6 +46,14 @@ PLAYER_NOT_FOUND_TEXT = "❌ Выбранный игрок не участвуе
 PLAYER_ANSWER_PROMPT = (
     "🎯 @{player}, ваш ответ? Формат ответа: /answer ваш_ответ"
 )
+CHOOSE_TIMEOUT_TEXT = (
+    "⌛ Капитан не выбрал отвечающего. Балл получает бот.\n"
+    "Правильный ответ: {correct_answer}"
+)
+ANSWER_TIMEOUT_TEXT = (
+    "⌛ Время на ответ вышло! Балл получает бот.\n"
+    "Правильный ответ: {correct_answer}"
+)
 NOT_YOUR_TURN_TEXT = "❌ Сейчас не ваша очередь отвечать!"
 CORRECT_ANSWER_TEXT = "✅ Правильный ответ! Команда получает балл."
 WRONG_ANSWER_TEXT = "❌ Неправильно! Правильный ответ: {correct_answer}"
@@ -75,6 +83,16 @@ PLAYER_REGISTERED_TEXT = (
     "✅ @{username} зарегистрирован!\n"
     "👥 Количество игроков: {current_players}/{max_players}"
 )
+RATE_LIMITED_TEXT = "⏳ Слишком много команд, подождите немного."
+GAME_RESUMED_TEXT = "🔄 Бот перезапущен, игра продолжается с того же места."
+GAME_ABORTED_TEXT = (
+    "⚠️ Бот перезапущен, и текущую игру продолжить не удалось. "
+    "Начните новую командой /start"
+)
+REGISTRATION_TIMEOUT_TEXT = (
+    "⌛ Регистрация отменена: игра так и не началась. "
+    "Начните заново командой /start"
+)
 REGISTRATION_ALREADY_CLOSED_TEXT = "❌ Регистрация уже закрыта"
 REGISTRATION_FINISHED_TEXT = (
     "✅ Регистрация завершена!\n\n"
@@ -0,0 +1,138 @@
+import time
+import typing
+
+from app.base.metrics import REGISTRY
+from app.store.bot.commands import CommandContext, Handler
+
+if typing.TYPE_CHECKING:
+    from app.store.bot.base import Bot
+
+UPDATES_RECEIVED = REGISTRY.counter(
+    "bot_updates_received_total", "Апдейты, полученные из Telegram"
+)
+COMMAND_LATENCY = REGISTRY.histogram(
+    "bot_command_duration_seconds",
+    "Время обработки команды в Worker",
+    labels=("command",),
+)
+COMMAND_ERRORS = REGISTRY.counter(
+    "bot_command_errors_total",
+    "Команды, обработчик которых упал с исключением",
+    labels=("command",),
+)
+TG_LATENCY = REGISTRY.histogram(
+    "tg_request_duration_seconds",
+    "Время запроса к Bot API",
+    labels=("method",),
+    # getUpdates держит long polling до 60 с
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+TG_ERRORS = REGISTRY.counter(
+    "tg_request_errors_total",
+    "Ответы Bot API с ok=false и сетевые ошибки, code=429 — флуд-лимит",
+    labels=("method", "code"),
+)
+
+
+def observe_tg_request(method: str, seconds: float, error: str | None):
+    TG_LATENCY.observe(seconds, method)
+    if error is not None:
+        TG_ERRORS.inc(method, error)
+
+
+async def command_metrics(ctx: CommandContext, call_next: Handler) -> None:
+    started = time.perf_counter()
+    try:
+        await call_next(ctx)
+    except Exception:
+        COMMAND_ERRORS.inc(ctx.command)
+        raise
+    finally:
+        COMMAND_LATENCY.observe(time.perf_counter() - started, ctx.command)
+
+
+def register_bot_metrics(bot: "Bot") -> None:
+    """Метрики, которые читаются из состояния бота при отдаче /metrics."""
+    worker = bot.worker
+    REGISTRY.callback(
+        "bot_queue_depth",
+        "Апдейты в общей очереди Bot.queue",
+        bot.queue.qsize,
+    )
+    REGISTRY.callback(
+        "bot_shard_queue_depth",
+        "Апдейты и шаги игр в очередях шардов Worker",
+        lambda: worker.backlog,
+    )
+    REGISTRY.callback(
+        "tg_send_queue_depth",
+        "Исходящие сообщения в очереди MessageScheduler",
+        lambda: bot.sender.pending,
+    )
+    REGISTRY.callback(
+        "bot_active_games",
+        "Игры в памяти этого процесса, по фазам",
+        lambda: _games_by_kind(bot),
+        labels=("kind",),
+    )
+    REGISTRY.callback(
+        "bot_pending_timers",
+        "Дедлайны игр в DeadlineScheduler",
+        lambda: len(worker.timers),
+    )
+    REGISTRY.callback(
+        "bot_rate_limited_total",
+        "Команды, отброшенные FloodGuard",
+        lambda: {
+            (command,): count
+            for command, count in worker.flood_guard.dropped.items()
+        },
+        labels=("command",),
+        kind="counter",
+    )
+    if bot.update_filter is not None:
+        update_filter = bot.update_filter
+        REGISTRY.callback(
+            "bot_updates_passed_total",
+            "Апдейты, прошедшие UpdateFilter",
+            lambda: update_filter.passed,
+            kind="counter",
+        )
+        REGISTRY.callback(
+            "bot_updates_filtered_total",
+            "Апдейты, отброшенные UpdateFilter, по причине",
+            lambda: {
+                (reason,): count
+                for reason, count in update_filter.dropped.items()
+            },
+            labels=("reason",),
+            kind="counter",
+        )
+    if bot.cluster is not None:
+        cluster = bot.cluster
+        REGISTRY.callback(
+            "bot_worker_processes_alive",
+            "Живые процессы-воркеры",
+            lambda: cluster.alive,
+        )
+        REGISTRY.callback(
+            "bot_worker_lost_updates_total",
+            "Апдейты, потерянные при падении воркеров",
+            lambda: cluster.lost_updates,
+            kind="counter",
+        )
+        REGISTRY.callback(
+            "bot_worker_requeued_updates_total",
+            "Апдейты упавших воркеров, переданные их преемникам",
+            lambda: cluster.requeued_updates,
+            kind="counter",
+        )
+
+
+def _games_by_kind(bot: "Bot") -> dict[tuple[str], int]:
+    counts: dict[tuple[str], int] = {}
+    for game in bot.worker.games.values():
+        state = getattr(game, "state", None)
+        kind = str(state.phase) if state is not None else "registration"
+        counts[(kind,)] = counts.get((kind,), 0) + 1
+    return counts
@@ -1,29 +1,73 @@
 import asyncio
+import logging
 from asyncio import Task
+from collections.abc import Awaitable, Callable
 
+import aiohttp
+
+from app.store.bot.filters import ALLOWED_UPDATES
 from clients.tg import TgClient
+from clients.tg.api import TgApiError
+
+logger = logging.getLogger(__name__)
 
 
 class Poller:
-    def __init__(self, token: str, queue: asyncio.Queue):
-        self.tg_client = TgClient(token)
-        self.queue = queue
-        self._task: Task | None
+    def __init__(
+        self,
+        tg_client: TgClient,
+        handler: Callable[[dict], Awaitable[None]],
+        *,
+        backoff_base: float = 1.0,
+        backoff_max: float = 60.0,
+    ):
+        self.tg_client = tg_client
+        # Апдейты отдаются сырыми: разбирает их тот, кто будет обрабатывать
+        self.handler = handler
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._task: Task | None = None
+
+    def _backoff(self, failures: int) -> float:
+        return min(self.backoff_base * 2 ** (failures - 1), self.backoff_max)
 
     async def _worker(self):
         offset = 0
+        failures = 0
         while True:
-            res = await self.tg_client.get_updates_in_objects(
-                offset=offset, timeout=60
-            )
-            for u in res.result:
-                offset = u.update_id + 1
-                if u.message and u.message.chat.type in ["group", "supergroup"]:
-                    try:
-                        asyncio.get_running_loop()
-                    except RuntimeError:
-                        return
-                    self.queue.put_nowait(u)
+            try:
+                res = await self.tg_client.get_updates(
+                    offset=offset, timeout=60, allowed_updates=ALLOWED_UPDATES
+                )
+            except (aiohttp.ClientError, TimeoutError) as e:
+                failures += 1
+                delay = self._backoff(failures)
+                logger.warning(
+                    "getUpdates: ошибка сети %r, повтор через %s с", e, delay
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            if not res.get("ok"):
+                # 401 (неверный токен), 409 (установлен webhook или
+                # работает второй поллер): без паузы здесь был бы цикл
+                # из мгновенных запросов
+                failures += 1
+                error = TgApiError.from_response(res)
+                delay = error.retry_after or self._backoff(failures)
+                logger.error(
+                    "getUpdates: %s %s, повтор через %s с",
+                    error.error_code,
+                    error.description,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                continue
+
+            failures = 0
+            for raw in res["result"]:
+                offset = raw["update_id"] + 1
+                await self.handler(raw)
 
     async def start(self):
         self._task = asyncio.create_task(self._worker())
@@ -31,5 +75,8 @@ class Poller:
     async def stop(self):
         if self._task:
             self._task.cancel()
-            await self._task
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
             self._task = None
@@ -0,0 +1,93 @@
+"""Кэш банка вопросов в памяти процесса.
+
+Вопросы пишутся редко, а читаются на каждую игру: колода, текущий
+вопрос, проверка ответа. Кэш держит их вместе с нормализованными
+вариантами ответа, так что в установившемся режиме раунды не ходят
+в таблицу questions. Правки через QuizAccessor сбрасывают запись сразу;
+в кластере у каждого процесса свой кэш, и правки из другого процесса
+становятся видны не позже чем через ttl.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+
+from app.store.bot.dataclasses import Question
+
+
+class QuestionCache:
+    """LRU question_id -> Question с вариантами ответа."""
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # (время, (min(id), max(id))) банка для выборки колоды
+        self._bounds: tuple[float, tuple[int, int]] | None = None
+        self._items: OrderedDict[int, tuple[float, Question]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, question_id: int) -> Question | None:
+        item = self._items.get(question_id)
+        if item is None or time.monotonic() - item[0] > self.ttl:
+            self._items.pop(question_id, None)
+            self.misses += 1
+            return None
+        self._items.move_to_end(question_id)
+        self.hits += 1
+        return item[1]
+
+    def get_many(
+        self, question_ids: Iterable[int]
+    ) -> tuple[dict[int, Question], list[int]]:
+        """(найденные, id промахов) в порядке question_ids."""
+        found: dict[int, Question] = {}
+        missing = []
+        for question_id in question_ids:
+            question = self.get(question_id)
+            if question is None:
+                missing.append(question_id)
+            else:
+                found[question_id] = question
+        return found, missing
+
+    def put(self, question: Question) -> None:
+        if self.maxsize <= 0:
+            return
+        self._items[question.id] = (time.monotonic(), question)
+        self._items.move_to_end(question.id)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, question_id: int) -> None:
+        self._items.pop(question_id, None)
+
+    def get_bounds(self) -> tuple[int, int] | None:
+        if self._bounds is None:
+            return None
+        created, bounds = self._bounds
+        return bounds if time.monotonic() - created <= self.ttl else None
+
+    def set_bounds(self, low: int, high: int) -> None:
+        self._bounds = (time.monotonic(), (low, high))
+
+    def invalidate_bounds(self) -> None:
+        # Новые вопросы за max(id) иначе не попадут в случайную выборку
+        self._bounds = None
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._bounds = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._items),
+        }
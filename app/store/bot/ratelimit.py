@@ -0,0 +1,157 @@
+import time
+from collections import Counter, OrderedDict, deque
+from collections.abc import Hashable, Iterable
+from dataclasses import dataclass
+
+from app.store.bot.commands import CommandContext, Handler
+from app.store.bot.messages import RATE_LIMITED_TEXT
+from clients.tg import MessageScheduler, Priority
+
+
+@dataclass(frozen=True, slots=True)
+class CommandLimit:
+    user: int  # команд от одного пользователя за окно
+    chat: int  # команд из одного чата за окно
+    window: float  # секунд
+
+
+# Каждая из этих команд ходит в БД и отвечает в чат
+DEFAULT_LIMITS: dict[str, CommandLimit] = {
+    "/start": CommandLimit(user=3, chat=5, window=60),
+    "/join": CommandLimit(user=3, chat=30, window=30),
+    "/finish_reg": CommandLimit(user=3, chat=5, window=30),
+    "/choose": CommandLimit(user=5, chat=10, window=10),
+    "/answer": CommandLimit(user=3, chat=10, window=10),
+    "/help": CommandLimit(user=2, chat=5, window=60),
+    "/stat": CommandLimit(user=2, chat=5, window=60),
+}
+DEFAULT_LIMIT = CommandLimit(user=10, chat=30, window=10)
+
+
+class _Window:
+    __slots__ = ("hits", "window")
+
+    def __init__(self, limit: int, window: float):
+        self.hits: deque[float] = deque(maxlen=limit)
+        self.window = window
+
+
+class SlidingWindowLimiter:
+    """Точный скользящий лог: не больше limit событий за window секунд.
+
+    На ключ хранится не больше limit отметок времени. Ключи лежат в
+    OrderedDict в порядке последнего обращения: давно молчавшие, у которых
+    окно истекло, вычищаются с головы, а при переполнении max_keys
+    выбрасываются самые старые.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._keys: OrderedDict[Hashable, _Window] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def allow(
+        self,
+        key: Hashable,
+        limit: int,
+        window: float,
+        now: float | None = None,
+    ) -> bool:
+        return self.allow_all([(key, limit, window)], now)
+
+    def allow_all(
+        self,
+        checks: Iterable[tuple[Hashable, int, float]],
+        now: float | None = None,
+    ) -> bool:
+        """Событие проходит, только если его пропускают все окна checks.
+
+        Отметка пишется во все окна сразу или ни в одно: событие,
+        отклонённое одним лимитом, не расходует остальные.
+        """
+        now = time.monotonic() if now is None else now
+        self._evict(now)
+
+        checks = list(checks)
+        for key, limit, window in checks:
+            entry = self._keys.get(key)
+            if entry is None:
+                if limit <= 0:
+                    return False
+                continue
+            self._keys.move_to_end(key)
+            hits = entry.hits
+            while hits and hits[0] <= now - window:
+                hits.popleft()
+            if len(hits) >= limit:
+                # Отклонённое событие не пишем, иначе спам продлевает
+                # блокировку
+                return False
+
+        for key, limit, window in checks:
+            entry = self._keys.get(key)
+            if entry is None:
+                # Место освобождаем только под новый ключ: иначе при полном
+                # словаре каждое обращение сбрасывало бы чей-то лимит
+                self._evict(now, self.max_keys - 1)
+                entry = self._keys[key] = _Window(limit, window)
+            entry.hits.append(now)
+        return True
+
+    def _evict(self, now: float, max_keys: int | None = None) -> None:
+        max_keys = self.max_keys if max_keys is None else max_keys
+        while self._keys:
+            key, entry = next(iter(self._keys.items()))
+            expired = not entry.hits or entry.hits[-1] <= now - entry.window
+            if not expired and len(self._keys) <= max_keys:
+                break
+            del self._keys[key]
+
+
+class FloodGuard:
+    """Middleware CommandRouter: лимиты на пользователя и на чат.
+
+    Команда сверх лимита отбрасывается до обработчика, то есть без
+    запросов в БД. Без silent в чат уходит одно предупреждение за окно.
+    """
+
+    def __init__(
+        self,
+        sender: MessageScheduler,
+        limits: dict[str, CommandLimit] | None = None,
+        *,
+        default: CommandLimit = DEFAULT_LIMIT,
+        silent: bool = True,
+        max_keys: int = 100_000,
+    ):
+        self.sender = sender
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+        self.default = default
+        self.silent = silent
+        self.limiter = SlidingWindowLimiter(max_keys)
+        self.allowed = 0
+        self.dropped: Counter[str] = Counter()
+
+    async def __call__(self, ctx: CommandContext, call_next: Handler) -> None:
+        limit = self.limits.get(ctx.command, self.default)
+        # Команду, отклонённую лимитом чата, не списываем с лимита
+        # пользователя, и наоборот
+        if self.limiter.allow_all(
+            [
+                (("user", ctx.command, ctx.user_id), limit.user, limit.window),
+                (("chat", ctx.command, ctx.chat_id), limit.chat, limit.window),
+            ]
+        ):
+            self.allowed += 1
+            await call_next(ctx)
+            return
+
+        self.dropped[ctx.command] += 1
+        if not self.silent and self.limiter.allow(
+            ("notice", ctx.chat_id), 1, limit.window
+        ):
+            await self.sender.send_message(
+                ctx.chat_id, RATE_LIMITED_TEXT, Priority.LOW
+            )
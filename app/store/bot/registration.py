@@ -12,18 +12,21 @@ from app.store.bot.messages import (
     REGISTRATION_FINISHED_TEXT,
     REGISTRATION_START_TEXT,
 )
+from clients.tg import MessageScheduler
 
 
 class GameRegistration:
-    def __init__(self, tg_client, chat_id: int, app: "Application"):
-        self.tg_client = tg_client
+    def __init__(
+        self, sender: MessageScheduler, chat_id: int, app: "Application"
+    ):
+        self.sender = sender
         self.app = app
         self.chat_id = chat_id
         self.max_players = 12
 
     async def start_registration(self):
         message = REGISTRATION_START_TEXT.format(max_players=self.max_players)
-        await self.tg_client.send_message(self.chat_id, message)
+        await self.sender.send_message(self.chat_id, message)
 
     async def add_player(self, user_id: int, username: str) -> bool:
         players = await self.app.store.users.get_users_by_chat_id(self.chat_id)
@@ -31,26 +34,26 @@ class GameRegistration:
             await self.app.store.creategame.is_captain_set(self.chat_id)
         )
         if not registration_open:
-            await self.tg_client.send_message(
+            await self.sender.send_message(
                 self.chat_id, REGISTRATION_CLOSED_TEXT
             )
             return False
 
         if len(players) >= self.max_players:
-            await self.tg_client.send_message(
+            await self.sender.send_message(
                 self.chat_id, MAX_PLAYERS_REACHED_TEXT
             )
             return False
 
         if username in players:
-            await self.tg_client.send_message(
+            await self.sender.send_message(
                 self.chat_id, ALREADY_REGISTERED_TEXT
             )
             return False
 
         await self.app.store.users.join_user(user_id, username, self.chat_id)
 
-        await self.tg_client.send_message(
+        await self.sender.send_message(
             self.chat_id,
             PLAYER_REGISTERED_TEXT.format(
                 username=username,
@@ -65,7 +68,7 @@ class GameRegistration:
             await self.app.store.creategame.is_captain_set(self.chat_id)
         )
         if not registration_open:
-            await self.tg_client.send_message(
+            await self.sender.send_message(
                 self.chat_id, REGISTRATION_ALREADY_CLOSED_TEXT
             )
             return False
@@ -86,5 +89,5 @@ class GameRegistration:
             total_players=len(players),
         )
 
-        await self.tg_client.send_message(self.chat_id, final_message)
+        await self.sender.send_message(self.chat_id, final_message)
         return True
@@ -0,0 +1,132 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class TimerHandle:
+    __slots__ = ("callback", "cancelled", "key", "seq", "when")
+
+    def __init__(
+        self, when: float, seq: int, callback: Callable[[], None], key
+    ):
+        self.when = when
+        self.seq = seq
+        self.callback = callback
+        self.key = key
+        self.cancelled = False
+
+    def __lt__(self, other: "TimerHandle") -> bool:
+        return (self.when, self.seq) < (other.when, other.seq)
+
+
+class DeadlineScheduler:
+    """Одна задача и куча дедлайнов на все игры процесса.
+
+    Вместо спящей корутины на каждую игру храним дедлайны в heapq:
+    постановка и отмена O(log n), отменённые записи удаляются лениво.
+    Колбэки синхронные и должны быть дешёвыми: обычно они только кладут
+    событие в очередь чата.
+    """
+
+    def __init__(self):
+        self._heap: list[TimerHandle] = []
+        self._by_key: dict[Hashable, set[TimerHandle]] = {}
+        self._seq = itertools.count()
+        self._cancelled = 0
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return len(self._heap) - self._cancelled
+
+    def call_later(
+        self,
+        delay: float,
+        callback: Callable[[], None],
+        key: Hashable | None = None,
+    ) -> TimerHandle:
+        return self.call_at(time.monotonic() + delay, callback, key)
+
+    def call_at(
+        self,
+        when: float,
+        callback: Callable[[], None],
+        key: Hashable | None = None,
+    ) -> TimerHandle:
+        handle = TimerHandle(when, next(self._seq), callback, key)
+        heapq.heappush(self._heap, handle)
+        if key is not None:
+            self._by_key.setdefault(key, set()).add(handle)
+        if self._heap[0] is handle:
+            # Новый дедлайн раньше текущего: будим цикл пересчитать сон
+            self._wakeup.set()
+        return handle
+
+    def cancel(self, handle: TimerHandle | None) -> None:
+        if handle is None or handle.cancelled:
+            return
+        handle.cancelled = True
+        self._cancelled += 1
+        self._forget(handle)
+        if self._cancelled > len(self._heap) // 2:
+            self._heap = [h for h in self._heap if not h.cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+
+    def cancel_key(self, key: Hashable) -> None:
+        for handle in list(self._by_key.get(key, ())):
+            self.cancel(handle)
+
+    def _forget(self, handle: TimerHandle) -> None:
+        handles = self._by_key.get(handle.key)
+        if handles is not None:
+            handles.discard(handle)
+            if not handles:
+                del self._by_key[handle.key]
+
+    def _pop_due(self, now: float) -> list[TimerHandle]:
+        due = []
+        while self._heap and (
+            self._heap[0].cancelled or self._heap[0].when <= now
+        ):
+            handle = heapq.heappop(self._heap)
+            if handle.cancelled:
+                self._cancelled -= 1
+                continue
+            self._forget(handle)
+            due.append(handle)
+        return due
+
+    async def _run(self):
+        while True:
+            for handle in self._pop_due(time.monotonic()):
+                try:
+                    handle.callback()
+                except Exception:
+                    logger.exception("Ошибка в колбэке таймера %s", handle.key)
+
+            self._wakeup.clear()
+            timeout = (
+                self._heap[0].when - time.monotonic() if self._heap else None
+            )
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except TimeoutError:
+                pass
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self._heap.clear()
+        self._by_key.clear()
+        self._cancelled = 0
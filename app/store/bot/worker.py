@@ -1,78 +1,269 @@
 import asyncio
+import functools
 import logging
 import typing
+from datetime import UTC, datetime, timedelta
 
 if typing.TYPE_CHECKING:
     from app.web.app import Application
-from app.store.bot.game_info import Statistics
+from app.store.bot.cluster import shard_of
+from app.store.bot.commands import CommandContext, CommandRouter, timing
+from app.store.bot.dataclasses import GamePhase, GameState
+from app.store.bot.game_info import GameAction, Statistics
 from app.store.bot.messages import (
+    GAME_ABORTED_TEXT,
     GAME_IN_PROGRESS_TEXT,
     HELP_TEXT,
     ONLY_CAPTAIN_TEXT,
     REGISTRATION_CLOSED_TEXT,
+    REGISTRATION_TIMEOUT_TEXT,
     STATISTICS_TEXT,
 )
+from app.store.bot.metrics import command_metrics
+from app.store.bot.ratelimit import CommandLimit, FloodGuard
 from app.store.bot.registration import GameRegistration
-from clients.tg import TgClient
-from clients.tg.dcs import UpdateObj
+from app.store.bot.timers import DeadlineScheduler, TimerHandle
+from app.web.config import GameConfig
+from clients.tg import MessageScheduler, Priority
+from clients.tg.dcs import UpdateView
 
 
 class Worker:
-    def __init__(self, token: str, queue: asyncio.Queue, app: "Application"):
-        self.tg_client = TgClient(token)
+    def __init__(
+        self,
+        sender: MessageScheduler,
+        queue: asyncio.Queue,
+        app: "Application",
+        concurrency: int = 8,
+        shard_queue_size: int = 100,
+        shard: tuple[int, int] | None = None,
+    ):
+        self.sender = sender
         self.app = app
         self.queue = queue
+        self.concurrency = concurrency
+        self.shard_queue_size = shard_queue_size
         self._tasks: list[asyncio.Task] = []
+        self._shards: list[asyncio.Queue] = []
+        self._pending: set[asyncio.Task] = set()
+        # (номер, всего) процесса-воркера: он ведёт только свои чаты
+        self.shard = shard
         self.games: dict[int, GameRegistration | Statistics] = {}
+        self.timers = DeadlineScheduler()
+        config = app.config.game if app.config and app.config.game else None
+        self.game_config = config or GameConfig()
+        self.router = CommandRouter()
+        # Сначала лимиты: отброшенная команда не доходит до БД и таймингов
+        self.flood_guard = self._build_flood_guard()
+        self.router.use(self.flood_guard)
+        self.router.use(command_metrics)
+        self.router.use(timing())
+        self._register_commands()
 
-    async def start_game_rounds(self, chat_id: int):
-        game = self.games.get(chat_id)
-        if not game or not isinstance(game, Statistics):
+    @property
+    def backlog(self) -> int:
+        """Апдейты и шаги игр, ждущие в очередях шардов."""
+        return sum(shard.qsize() for shard in self._shards)
+
+    def _build_flood_guard(self) -> FloodGuard:
+        config = self.app.config.bot if self.app.config else None
+        if config is None:
+            return FloodGuard(self.sender)
+        return FloodGuard(
+            self.sender,
+            {
+                command: CommandLimit(*limit)
+                for command, limit in config.rate_limits.items()
+            },
+            silent=config.rate_limit_silent,
+        )
+
+    def _register_commands(self) -> None:
+        self.router.add("/start", self.handle_start)
+        self.router.add("/join", self.handle_join)
+        self.router.add("/finish_reg", self.handle_finish_reg)
+        self.router.add("/choose", self.handle_choose, requires_args=True)
+        self.router.add("/answer", self.handle_answer, requires_args=True)
+        self.router.add("/help", self.handle_help)
+        self.router.add("/stat", self.print_statictics)
+
+    def schedule(
+        self, chat_id: int, delay: float, action: GameAction
+    ) -> TimerHandle:
+        # Сработавший дедлайн не выполняется сам, а встаёт в очередь чата,
+        # поэтому не гоняется с командами игроков того же чата
+        return self.timers.call_later(
+            delay, functools.partial(self._post, chat_id, action), key=chat_id
+        )
+
+    def _post(self, chat_id: int, action: GameAction) -> None:
+        if not self._shards:
             return
+        shard = self._shard_for(chat_id)
+        try:
+            shard.put_nowait(action)
+        except asyncio.QueueFull:
+            task = asyncio.create_task(shard.put(action))
+            self._pending.add(task)
+            task.add_done_callback(self._pending.discard)
+
+    def _on_game_finished(self, chat_id: int) -> None:
+        self.timers.cancel_key(chat_id)
+        self.games.pop(chat_id, None)
+
+    async def _registration_timeout(self, chat_id: int):
+        if not isinstance(self.games.get(chat_id), GameRegistration):
+            return
+        del self.games[chat_id]
+        await self.app.store.creategame.create_or_update_game(
+            code_of_chat=chat_id,
+            is_working=0,
+            phase=GamePhase.FINISHED,
+            phase_deadline=None,
+        )
+        await self.sender.send_message(chat_id, REGISTRATION_TIMEOUT_TEXT)
 
+    def _schedule_registration_timeout(self, chat_id: int, delay: float):
+        self.schedule(
+            chat_id,
+            delay,
+            functools.partial(self._registration_timeout, chat_id),
+        )
+
+    def _new_statistics(self, chat_id: int) -> Statistics:
+        return Statistics(
+            self.sender,
+            chat_id,
+            self.app,
+            schedule=self.schedule,
+            cancel=self.timers.cancel,
+            on_finish=self._on_game_finished,
+        )
+
+    async def recover_games(self) -> None:
+        """Поднимает игры, которые шли в момент остановки процесса.
+
+        Игра продолжается с сохранённой фазы, оставшееся до дедлайна
+        время досчитывается. Если восстановить игру нельзя или её дедлайн
+        истёк больше resume_grace секунд назад, она завершается, и чат
+        получает сообщение вместо вечного GAME_IN_PROGRESS_TEXT.
+        """
         try:
-            for i in range(1, game.rounds + 1):
-                if not await game.play_round(i):
-                    break
-                await asyncio.sleep(2)
-        except Exception as e:
-            logging.error("Error in game rounds for chat %d: %s", chat_id, e)
-        finally:
-            await game.finish_game()
-            if chat_id in self.games:
-                del self.games[chat_id]
-
-    async def handle_start(self, chat_id: int):
-        codes = await self.app.store.creategame.get_all_code_of_chat()
-        if chat_id in codes and await self.app.store.creategame.is_game_working(
-            chat_id
-        ):
-            await self.tg_client.send_message(chat_id, GAME_IN_PROGRESS_TEXT)
+            chats = await self.app.store.creategame.list_working_chats()
+        except Exception:
+            logging.exception("Не удалось получить список активных игр")
+            return
+        if self.shard is not None:
+            index, total = self.shard
+            chats = [chat for chat in chats if shard_of(chat, total) == index]
+        if not chats:
+            return
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def recover(chat_id: int):
+            async with semaphore:
+                try:
+                    state = await self.app.store.creategame.load_game_state(
+                        chat_id
+                    )
+                    recovered = await self._recover_game(chat_id, state)
+                except Exception:
+                    logging.exception(
+                        "Не удалось восстановить игру %s", chat_id
+                    )
+                    recovered = False
+                if not recovered:
+                    await self._abort_game(chat_id)
+                return recovered
+
+        results = await asyncio.gather(*(recover(chat) for chat in chats))
+        logging.info("Восстановлено игр: %s из %s", sum(results), len(results))
+
+    async def _recover_game(self, chat_id: int, state: GameState | None):
+        if state is None or state.phase is None:
+            return False
+        if state.phase_deadline is not None:
+            overdue = (datetime.now(UTC) - state.phase_deadline).total_seconds()
+            if overdue > self.game_config.resume_grace:
+                # Бот лежал дольше, чем игроки готовы ждать
+                return False
+
+        if state.phase == GamePhase.REGISTRATION:
+            self.games[chat_id] = GameRegistration(
+                self.sender, chat_id, self.app
+            )
+            remaining = self.game_config.registration_timeout
+            if state.phase_deadline is not None:
+                remaining = (
+                    state.phase_deadline - datetime.now(UTC)
+                ).total_seconds()
+            self._schedule_registration_timeout(chat_id, max(0, remaining))
+            return True
+
+        if state.phase == GamePhase.FINISHED:
+            return False
+        if state.phase != GamePhase.STARTING and state.question is None:
+            # Вопрос раунда удалён из базы, доигрывать нечего
+            return False
+
+        game = self._new_statistics(chat_id)
+        self.games[chat_id] = game
+        try:
+            await game.resume(state)
+        except Exception:
+            game.cancel_timers()
+            del self.games[chat_id]
+            raise
+        return True
+
+    async def _abort_game(self, chat_id: int):
+        self.timers.cancel_key(chat_id)
+        self.games.pop(chat_id, None)
+        await self.app.store.creategame.create_or_update_game(
+            code_of_chat=chat_id,
+            is_working=0,
+            phase=GamePhase.FINISHED,
+            phase_deadline=None,
+        )
+        await self.sender.send_message(chat_id, GAME_ABORTED_TEXT)
+
+    async def handle_start(self, ctx: CommandContext):
+        chat_id = ctx.chat_id
+        status = await self.app.store.creategame.get_game_status(chat_id)
+        if status.is_working:
+            await self.sender.send_message(chat_id, GAME_IN_PROGRESS_TEXT)
             return
 
         await self.app.store.creategame.clear_game_users_and_asked_questions(
             chat_id
         )
+        timeout = self.game_config.registration_timeout
         await self.app.store.creategame.create_or_update_game(
-            code_of_chat=chat_id, is_working=1
-        )
-        self.games[chat_id] = GameRegistration(
-            self.tg_client, chat_id, self.app
+            code_of_chat=chat_id,
+            is_working=1,
+            phase=GamePhase.REGISTRATION,
+            phase_deadline=datetime.now(UTC) + timedelta(seconds=timeout),
         )
+        self.timers.cancel_key(chat_id)
+        self.games[chat_id] = GameRegistration(self.sender, chat_id, self.app)
         await self.games[chat_id].start_registration()
+        self._schedule_registration_timeout(chat_id, timeout)
 
-    async def handle_join(self, chat_id: int, user_id: int, username: str):
+    async def handle_join(self, ctx: CommandContext):
+        chat_id = ctx.chat_id
         if chat_id not in self.games:
             return
 
         game = self.games[chat_id]
         if not isinstance(game, GameRegistration):
-            await self.tg_client.send_message(chat_id, GAME_IN_PROGRESS_TEXT)
+            await self.sender.send_message(chat_id, GAME_IN_PROGRESS_TEXT)
             return
 
-        await game.add_player(user_id, username)
+        await game.add_player(ctx.user_id, ctx.username)
 
-    async def handle_finish_reg(self, chat_id: int):
+    async def handle_finish_reg(self, ctx: CommandContext):
+        chat_id = ctx.chat_id
         if chat_id not in self.games:
             return
 
@@ -81,96 +272,124 @@ class Worker:
             return
 
         if await game.finish_registration():
-            self.games[chat_id] = Statistics(self.tg_client, chat_id, self.app)
+            self.timers.cancel_key(chat_id)
+            self.games[chat_id] = self._new_statistics(chat_id)
             await self.games[chat_id].start_game()
 
-            task = asyncio.create_task(self.start_game_rounds(chat_id))
-            self._tasks.append(task)
-
-    async def handle_choose(self, chat_id: int, username: str, text: str):
+    async def handle_choose(self, ctx: CommandContext):
+        chat_id = ctx.chat_id
         game = self.games.get(chat_id)
         if not game or not isinstance(game, Statistics):
-            await self.tg_client.send_message(chat_id, REGISTRATION_CLOSED_TEXT)
+            await self.sender.send_message(chat_id, REGISTRATION_CLOSED_TEXT)
             return
 
-        captain = await self.app.store.creategame.is_captain_set(chat_id)
-        if username != captain:
-            await self.tg_client.send_message(chat_id, ONLY_CAPTAIN_TEXT)
+        if ctx.username != game.state.captain:
+            await self.sender.send_message(
+                chat_id, ONLY_CAPTAIN_TEXT, Priority.LOW
+            )
             return
 
-        chosen_player = text.split("/choose ", 1)[1].strip().lstrip("@")
+        chosen_player = ctx.args.split()[0].lstrip("@")
         await game.handle_captain_choice(chosen_player)
 
-    async def handle_answer(self, chat_id: int, username: str, text: str):
-        game = self.games.get(chat_id)
+    async def handle_answer(self, ctx: CommandContext):
+        game = self.games.get(ctx.chat_id)
         if not game or not isinstance(game, Statistics):
             return
 
-        answer = text.split("/answer ", 1)[1].strip()
-        await game.handle_answer(username, answer)
+        await game.handle_answer(ctx.username, ctx.args)
+
+    async def handle_update(self, upd: UpdateView):
+        await self.router.dispatch(upd)
 
-    async def handle_update(self, upd: UpdateObj):
-        if not upd.message or not upd.message.text:
+    async def handle_help(self, ctx: CommandContext):
+        await self.sender.send_message(ctx.chat_id, HELP_TEXT, Priority.LOW)
+
+    async def print_statictics(self, ctx: CommandContext):
+        chat_id = ctx.chat_id
+        status = await self.app.store.creategame.get_game_status(chat_id)
+        if not status.exists:
+            return
+        if status.is_working:
+            await self.sender.send_message(chat_id, GAME_IN_PROGRESS_TEXT)
             return
 
-        text = upd.message.text
-        chat_id = upd.message.chat.id
-        user_id = upd.message.from_.id
-        username = upd.message.from_.username
-
-        if text == "/start":
-            await self.handle_start(chat_id)
-        elif text == "/join":
-            await self.handle_join(chat_id, user_id, username)
-        elif text == "/finish_reg":
-            await self.handle_finish_reg(chat_id)
-        elif text.startswith("/choose "):
-            await self.handle_choose(chat_id, username, text)
-        elif text.startswith("/answer "):
-            await self.handle_answer(chat_id, username, text)
-        elif text == "/help":
-            await self.handle_help(chat_id)
-        elif text == "/stat":
-            await self.print_statictics(chat_id)
-
-    async def handle_help(self, chat_id: int):
-        await self.tg_client.send_message(chat_id, HELP_TEXT)
-
-    async def print_statictics(self, chat_id: int):
-        codes = await self.app.store.creategame.get_all_code_of_chat()
-        if chat_id in codes:
-            if await self.app.store.creategame.is_game_working(chat_id):
-                await self.tg_client.send_message(
-                    chat_id, GAME_IN_PROGRESS_TEXT
-                )
-                return
-
-            score_team = await (
-                self.app.store.creategame.get_points_awarded_by_chat_id(chat_id)
-            )
-            await self.tg_client.send_message(
-                chat_id, STATISTICS_TEXT.format(score_team=score_team)
-            )
+        await self.sender.send_message(
+            chat_id,
+            STATISTICS_TEXT.format(score_team=status.points),
+            Priority.LOW,
+        )
+
+    def _shard_for(self, chat_id: int) -> asyncio.Queue:
+        # Все апдейты одного чата попадают в одну очередь и обрабатываются
+        # строго по порядку, разные чаты идут параллельно. В процессе-
+        # воркере все chat_id дают один остаток по числу процессов, поэтому
+        # сначала делим на него, иначе часть очередей простаивает
+        stride = self.shard[1] if self.shard else 1
+        return self._shards[(chat_id // stride) % len(self._shards)]
 
-    async def _worker(self):
+    async def _dispatcher(self):
         try:
             while True:
                 upd = await self.queue.get()
                 try:
-                    await self.handle_update(upd)
+                    # put() ждёт, если шард переполнен: общая очередь
+                    # перестаёт разбираться, и Poller упирается в maxsize
+                    await self._shard_for(upd.message.chat.id).put(upd)
                 finally:
                     self.queue.task_done()
+        except asyncio.CancelledError:
+            logging.warning("Dispatcher loop was cancelled.")
+            raise
+
+    async def _worker(self, shard: asyncio.Queue):
+        try:
+            while True:
+                item = await shard.get()
+                try:
+                    if isinstance(item, UpdateView):
+                        await self.handle_update(item)
+                    else:
+                        # Отложенный шаг игры от DeadlineScheduler
+                        await item()
+                except Exception:
+                    logging.exception(
+                        "Ошибка обработки %s",
+                        getattr(item, "update_id", item),
+                    )
+                finally:
+                    shard.task_done()
         except asyncio.CancelledError:
             logging.warning("Worker loop was cancelled.")
             raise
 
     async def start(self):
-        self._tasks = [asyncio.create_task(self._worker())]
+        self._shards = [
+            asyncio.Queue(maxsize=self.shard_queue_size)
+            for _ in range(self.concurrency)
+        ]
+        await self.timers.start()
+        config = self.app.config.bot if self.app.config else None
+        if config and config.question_cache_warmup > 0:
+            await self.app.store.quiz.warm_up(config.question_cache_warmup)
+        # До разбора апдейтов: команды в восстановленные чаты должны
+        # увидеть игру в self.games
+        await self.recover_games()
+        self._tasks = [asyncio.create_task(self._dispatcher())]
+        self._tasks.extend(
+            asyncio.create_task(self._worker(shard)) for shard in self._shards
+        )
 
     async def stop(self):
         await self.queue.join()
+        # Новые дедлайны больше не нужны: игры прерываются вместе с процессом
+        await self.timers.stop()
+        await asyncio.gather(*self._pending, return_exceptions=True)
+        for shard in self._shards:
+            await shard.join()
         for t in self._tasks:
             t.cancel()
         await asyncio.gather(*self._tasks, return_exceptions=True)
         self._tasks = []
+        self._shards = []
         logging.info("Worker tasks завершены.")
@@ -1,4 +1,5 @@
 import logging
+import time
 from typing import TYPE_CHECKING, Any
 
 from sqlalchemy import URL, text
@@ -9,6 +10,7 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.store.database.models import BaseModel
 
@@ -18,6 +20,31 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 
 
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    # Считаем, сколько запросы ждали свободного соединения из пула.
+    # Ожиданием считается выдача, когда все pool_size соединений заняты:
+    # запрос ждёт возврата соединения или открытия overflow
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _do_get(self):
+        contended = self.checkedout() >= self.size()
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            self.checkouts += 1
+            if contended:
+                elapsed = time.perf_counter() - started
+                self.waits += 1
+                self.wait_time_total += elapsed
+                self.wait_time_max = max(self.wait_time_max, elapsed)
+
+
 class Database:
     def __init__(self, app: "Application") -> None:
         self.app = app
@@ -27,21 +54,24 @@ class Database:
         self.session: async_sessionmaker[AsyncSession] | None = None
 
     async def connect(self, *args: Any, **kwargs: Any) -> None:
-        user = self.app.config.database.user
-        password = self.app.config.database.password
-        host = self.app.config.database.host
-        database = self.app.config.database.database
-        port = self.app.config.database.port
+        config = self.app.config.database
 
         self.engine = create_async_engine(
             URL.create(
                 drivername="postgresql+asyncpg",
-                username=user,
-                password=password,
-                host=host,
-                port=port,
-                database=database,
+                username=config.user,
+                password=config.password,
+                host=config.host,
+                port=config.port,
+                database=config.database,
             ),
+            poolclass=TimedQueuePool,
+            pool_size=config.pool_size,
+            max_overflow=config.max_overflow,
+            pool_timeout=config.pool_timeout,
+            pool_recycle=config.pool_recycle,
+            pool_pre_ping=config.pool_pre_ping,
+            connect_args={"statement_cache_size": config.statement_cache_size},
         )
 
         self.session = async_sessionmaker(
@@ -57,5 +87,27 @@ class Database:
             logger.error("Ошибка подключения к базе данных: %s", e)
 
     async def disconnect(self, *args: Any, **kwargs: Any) -> None:
-        if self.session:
-            await self.session().close()
+        if self.engine:
+            await self.engine.dispose()
+            self.engine = None
+            self.session = None
+            logger.info("Пул соединений с базой данных закрыт.")
+
+    def pool_stats(self) -> dict[str, float]:
+        if self.engine is None:
+            return {}
+        pool = self.engine.pool
+        stats = {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+        }
+        if isinstance(pool, TimedQueuePool):
+            stats.update(
+                checkouts=pool.checkouts,
+                waits=pool.waits,
+                wait_time_total=pool.wait_time_total,
+                wait_time_max=pool.wait_time_max,
+            )
+        return stats
@@ -1,4 +1,14 @@
-from sqlalchemy import BigInteger, ForeignKey, String
+from datetime import datetime
+
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    ForeignKey,
+    Index,
+    String,
+    UniqueConstraint,
+    func,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
 
@@ -20,15 +30,67 @@ class Questions(BaseModel):
         back_populates="question_rel",
         cascade="all, delete-orphan",
     )
+    answers: Mapped[list["QuestionAnswers"]] = relationship(
+        "QuestionAnswers",
+        back_populates="question_rel",
+        cascade="all, delete-orphan",
+    )
+
+
+# Уникальность текста вопроса для импорта; md5, т.к. текст может быть длинным
+Index(
+    "ix_questions_question_md5",
+    func.md5(Questions.question),
+    unique=True,
+)
+
+
+class QuestionAnswers(BaseModel):
+    __tablename__ = "question_answers"
+    # Ведущий question_id покрывает и выборку вариантов вопроса
+    __table_args__ = (
+        UniqueConstraint(
+            "question_id",
+            "normalized",
+            name="uq_question_answers_question_id_normalized",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    question_id: Mapped[int] = mapped_column(
+        ForeignKey("questions.id", ondelete="CASCADE"),
+        nullable=False,
+        comment="Вопрос, к которому относится ответ",
+    )
+    answer: Mapped[str] = mapped_column(
+        String, nullable=False, comment="Засчитываемый ответ как в источнике"
+    )
+    normalized: Mapped[str] = mapped_column(
+        String,
+        nullable=False,
+        index=True,
+        comment="Ответ после normalize_answer, с ним сравнивается ввод",
+    )
+
+    question_rel: Mapped["Questions"] = relationship(
+        "Questions", back_populates="answers"
+    )
 
 
 class AskedQuestions(BaseModel):
     __tablename__ = "asked_questions"
+    # Ведущий chat_id покрывает и выборки по чату
+    __table_args__ = (
+        UniqueConstraint(
+            "chat_id", "question", name="uq_asked_questions_chat_id_question"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     question: Mapped[int] = mapped_column(
         ForeignKey("questions.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
         comment="Вопрос, который был",
     )
     chat_id: Mapped[int] = mapped_column(
@@ -74,6 +136,14 @@ class Game(BaseModel):
     is_working: Mapped[int | None] = mapped_column(
         nullable=True, comment="активен ли игра в данный момент"
     )
+    phase: Mapped[str | None] = mapped_column(
+        String, nullable=True, comment="Текущая фаза игры"
+    )
+    phase_deadline: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True),
+        nullable=True,
+        comment="Когда фаза завершится по таймауту",
+    )
 
     asked_questions: Mapped[list["AskedQuestions"]] = relationship(
         "AskedQuestions", back_populates="game", cascade="all, delete-orphan"
@@ -82,6 +152,11 @@ class Game(BaseModel):
 
 class Users(BaseModel):
     __tablename__ = "users"
+    __table_args__ = (
+        UniqueConstraint(
+            "chat_id", "int_user_id", name="uq_users_chat_id_int_user_id"
+        ),
+    )
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
     int_user_id: Mapped[int] = mapped_column(
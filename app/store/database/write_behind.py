@@ -0,0 +1,220 @@
+"""Отложенная пакетная вставка мелких строк.
+
+Отметки заданных вопросов и регистрации игроков приходят по одной
+строке из тысяч чатов; транзакция на каждую строку упирается в commit
+и WAL. WriteBehindBuffer копит строки и пишет их одним многострочным
+INSERT ... ON CONFLICT DO NOTHING по размеру пачки или по таймеру.
+
+Чтения по чату должны подмешивать pending(chat_id): строки, ещё
+не дошедшие до базы. Этого достаточно, потому что все апдейты чата
+обрабатывает один процесс, а значит, и один буфер.
+"""
+
+import asyncio
+import logging
+import typing
+from collections.abc import Iterable
+
+from sqlalchemy import Table
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+
+from app.base.metrics import REGISTRY
+
+if typing.TYPE_CHECKING:
+    from app.store.database import Database
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_ROWS = REGISTRY.counter(
+    "db_write_behind_rows_total",
+    "Строки, записанные через буфер отложенной вставки",
+    labels=("table",),
+)
+WRITE_BEHIND_FLUSHES = REGISTRY.counter(
+    "db_write_behind_flushes_total",
+    "Многострочные INSERT буфера отложенной вставки",
+    labels=("table",),
+)
+WRITE_BEHIND_DROPPED = REGISTRY.counter(
+    "db_write_behind_dropped_total",
+    "Строки, отвергнутые базой при вставке (например, чат уже удалён)",
+    labels=("table",),
+)
+
+# Параметров в одном запросе asyncpg не больше 32767
+MAX_STATEMENT_ROWS = 1000
+
+
+class WriteBehindBuffer:
+    """Буфер строк одной таблицы, сгруппированных по chat_id.
+
+    Пока буфер не запущен (start), add пишет строку сразу, как раньше.
+    Запущенный буфер сбрасывается фоновой задачей через max_delay
+    после первой строки или сразу, когда набралось max_rows.
+    """
+
+    def __init__(
+        self,
+        database: "Database",
+        table: Table,
+        conflict_columns: Iterable[str],
+        max_rows: int = 500,
+        max_delay: float = 0.05,
+        retry_delay: float = 1.0,
+    ):
+        self.database = database
+        self.table = table
+        self.conflict_columns = tuple(conflict_columns)
+        self.max_rows = max_rows
+        self.max_delay = max_delay
+        self.retry_delay = retry_delay
+        # chat_id -> {значения conflict_columns: строка}
+        self._rows: dict[int, dict[tuple, dict]] = {}
+        # Строки идущего сброса: до commit их ещё не видно в базе
+        self._flushing: dict[int, dict[tuple, dict]] = {}
+        self._size = 0
+        self._has_rows = asyncio.Event()
+        self._full = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    async def add(self, row: dict) -> None:
+        if not self.running:
+            await self._write([row])
+            return
+
+        chat_id = row["chat_id"]
+        chat_rows = self._rows.setdefault(chat_id, {})
+        key = tuple(row[column] for column in self.conflict_columns)
+        if key in chat_rows or key in self._flushing.get(chat_id, ()):
+            return
+        chat_rows[key] = row
+        self._size += 1
+        self._has_rows.set()
+        if self._size >= self.max_rows:
+            self._full.set()
+        if self._size >= self.max_rows * 10:
+            # База не успевает или недоступна: не копим без предела
+            await self.flush()
+
+    def pending(self, chat_id: int) -> list[dict]:
+        """Строки чата, ещё не записанные в базу."""
+        return [
+            *self._flushing.get(chat_id, {}).values(),
+            *self._rows.get(chat_id, {}).values(),
+        ]
+
+    async def discard(self, chat_id: int) -> None:
+        """Забывает строки чата перед удалением его записей из базы.
+
+        Дожидается идущего сброса: строки чата, которые уже в запросе,
+        окажутся в базе до удаления, а не после него.
+        """
+        self._size -= len(self._rows.pop(chat_id, {}))
+        # Идущий сброс их уже не вернёт в буфер при ошибке
+        self._flushing.pop(chat_id, None)
+        async with self._lock:
+            pass
+
+    async def flush(self) -> None:
+        async with self._lock:
+            if not self._size:
+                return
+            self._flushing, self._rows, self._size = self._rows, {}, 0
+            self._has_rows.clear()
+            self._full.clear()
+            rows = [
+                row for chat in self._flushing.values() for row in chat.values()
+            ]
+            try:
+                await self._write(rows)
+            except Exception:
+                self._restore(self._flushing)
+                raise
+            finally:
+                self._flushing = {}
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Останавливает фоновую задачу и записывает всё накопленное."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception(
+                "%s: при остановке не записано строк: %s",
+                self.table.name,
+                self._size,
+            )
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_rows.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), self.max_delay)
+            except TimeoutError:
+                pass
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception(
+                    "%s: сброс буфера не удался, повтор через %s с",
+                    self.table.name,
+                    self.retry_delay,
+                )
+                await asyncio.sleep(self.retry_delay)
+
+    def _restore(self, taken: dict[int, dict[tuple, dict]]) -> None:
+        # Строки неудачного сброса возвращаются к добавленным за это время
+        for chat_id, chat_rows in taken.items():
+            current = self._rows.setdefault(chat_id, {})
+            for key, row in chat_rows.items():
+                if key not in current:
+                    current[key] = row
+                    self._size += 1
+        if self._size:
+            self._has_rows.set()
+
+    async def _write(self, rows: list[dict]) -> None:
+        written = len(rows)
+        try:
+            for start in range(0, len(rows), MAX_STATEMENT_ROWS):
+                await self._insert(rows[start : start + MAX_STATEMENT_ROWS])
+        except IntegrityError:
+            # Одна строка без родителя (игру чата уже удалили) не должна
+            # терять всю пачку: пишем по одной и отбрасываем отвергнутые
+            for row in rows:
+                try:
+                    await self._insert([row])
+                except IntegrityError as e:
+                    written -= 1
+                    WRITE_BEHIND_DROPPED.inc(self.table.name)
+                    logger.warning(
+                        "%s: строка %s отвергнута: %s", self.table.name, row, e
+                    )
+        WRITE_BEHIND_ROWS.inc(self.table.name, amount=written)
+
+    async def _insert(self, rows: list[dict]) -> None:
+        query = (
+            insert(self.table)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=list(self.conflict_columns))
+        )
+        async with self.database.session() as session:
+            await session.execute(query)
+            await session.commit()
+        WRITE_BEHIND_FLUSHES.inc(self.table.name)
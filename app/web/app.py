@@ -1,5 +1,6 @@
 from aiohttp.web import (
     Application as AiohttpApplication,
+    HTTPBadRequest,
     Request as AiohttpRequest,
     View as AiohttpView,
 )
@@ -9,12 +10,15 @@ from app.store import Database, Store, setup_store
 from app.web.config import setup_config
 from app.web.logger import setup_logging
 from app.web.routes import setup_routes
+from clients.tg.dcs import loads
 
 
 class Application(AiohttpApplication):
     config = None
     store: Store | None = None
     database = None
+    # (номер, всего) в процессе-воркере кластера, None в приёмном процессе
+    worker_shard: tuple[int, int] | None = None
 
 
 class Request(AiohttpRequest):
@@ -42,7 +46,11 @@ class View(AiohttpView):
 
     async def _iter(self):
         if self.request.content_type == "application/json":
-            self.request["data"] = await self.request.json()
+            try:
+                self.request["data"] = await self.request.json(loads=loads)
+            except ValueError as e:
+                # И json, и orjson сообщают о битом теле через ValueError
+                raise HTTPBadRequest(text="Malformed JSON body") from e
         return await super()._iter()
 
 
@@ -1,6 +1,6 @@
 import os
 import typing
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from dotenv import load_dotenv
 
@@ -22,6 +22,55 @@ class AdminConfig:
 @dataclass
 class BotConfig:
     token: str
+    api_url: str = "https://api.telegram.org"
+    connection_limit: int = 100
+    connection_limit_per_host: int = 30
+    keepalive_timeout: float = 30
+    dns_cache_ttl: int = 300
+    workers: int = 8
+    queue_size: int = 1000
+    shard_queue_size: int = 100
+    global_rate: float = 30
+    chat_rate_per_minute: float = 20
+    chat_burst: int = 3
+    send_retries: int = 5
+    send_concurrency: int = 10
+    active_chats_cache: bool = True
+    mode: str = "poller"  # poller | webhook
+    webhook_url: str | None = None
+    webhook_path: str = "/webhook"
+    webhook_secret: str | None = None
+    # Число процессов-воркеров; 1 — всё в одном процессе
+    processes: int = 1
+    process_queue_size: int = 1000
+    restart_delay: float = 1.0
+    # Воркер i отдаёт свои /metrics на worker_metrics_port + i; 0 — не отдаёт
+    worker_metrics_host: str = "localhost"
+    worker_metrics_port: int = 8081
+    # команда -> (на пользователя, на чат, окно в секундах); дополняет
+    # DEFAULT_LIMITS из app/store/bot/ratelimit.py
+    rate_limits: dict[str, tuple[int, int, float]] = field(default_factory=dict)
+    rate_limit_silent: bool = True
+    question_cache_size: int = 10000
+    # Сколько вопросов загрузить в кэш при старте; 0 — без прогрева
+    question_cache_warmup: int = 0
+    # Правки из других процессов кластера видны не позже чем через ttl
+    question_cache_ttl: float = 600
+
+
+@dataclass
+class GameConfig:
+    rounds: int = 3
+    discussion_time: int = 60
+    warning_before: int = 10
+    rules_delay: int = 5
+    round_pause: int = 2
+    choose_timeout: int = 60
+    answer_timeout: int = 60
+    registration_timeout: int = 600
+    # Игру, дедлайн которой истёк больше resume_grace секунд назад,
+    # после перезапуска не продолжаем, а завершаем: чат давно не ждёт
+    resume_grace: int = 300
 
 
 @dataclass
@@ -31,6 +80,16 @@ class DatabaseConfig:
     user: str = "postgres"
     password: str = "postgres"
     database: str = "project"
+    pool_size: int = 10
+    max_overflow: int = 20
+    pool_timeout: float = 30
+    pool_recycle: int = 1800
+    pool_pre_ping: bool = True
+    statement_cache_size: int = 100
+    # Отложенная пакетная запись asked_questions и users
+    write_behind: bool = True
+    write_behind_rows: int = 500
+    write_behind_delay: float = 0.05
 
 
 @dataclass
@@ -39,6 +98,17 @@ class Config:
     session: SessionConfig | None = None
     bot: BotConfig | None = None
     database: DatabaseConfig | None = None
+    game: GameConfig | None = None
+
+
+def parse_rate_limits(spec: str) -> dict[str, tuple[int, int, float]]:
+    """'/answer=3:10:10,/join=3:30:30' -> {'/answer': (3, 10, 10.0), ...}."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        command, _, values = item.partition("=")
+        user, chat, window = values.split(":")
+        limits[command.strip()] = (int(user), int(chat), float(window))
+    return limits
 
 
 def setup_config(app: "Application"):
@@ -59,6 +129,42 @@ def setup_config(app: "Application"):
         ),
         bot=BotConfig(
             token=os.getenv("BOT_TOKEN"),
+            api_url=os.getenv("TG_API_URL", "https://api.telegram.org"),
+            connection_limit=int(os.getenv("TG_CONNECTION_LIMIT", "100")),
+            connection_limit_per_host=int(
+                os.getenv("TG_CONNECTION_LIMIT_PER_HOST", "30")
+            ),
+            keepalive_timeout=float(os.getenv("TG_KEEPALIVE_TIMEOUT", "30")),
+            dns_cache_ttl=int(os.getenv("TG_DNS_CACHE_TTL", "300")),
+            workers=int(os.getenv("BOT_WORKERS", "8")),
+            queue_size=int(os.getenv("BOT_QUEUE_SIZE", "1000")),
+            shard_queue_size=int(os.getenv("BOT_SHARD_QUEUE_SIZE", "100")),
+            global_rate=float(os.getenv("TG_GLOBAL_RATE", "30")),
+            chat_rate_per_minute=float(
+                os.getenv("TG_CHAT_RATE_PER_MINUTE", "20")
+            ),
+            chat_burst=int(os.getenv("TG_CHAT_BURST", "3")),
+            send_retries=int(os.getenv("TG_SEND_RETRIES", "5")),
+            send_concurrency=int(os.getenv("TG_SEND_CONCURRENCY", "10")),
+            active_chats_cache=os.getenv("BOT_ACTIVE_CHATS_CACHE", "1") == "1",
+            mode=os.getenv("BOT_MODE", "poller"),
+            webhook_url=os.getenv("BOT_WEBHOOK_URL"),
+            webhook_path=os.getenv("BOT_WEBHOOK_PATH", "/webhook"),
+            webhook_secret=os.getenv("BOT_WEBHOOK_SECRET"),
+            processes=int(os.getenv("BOT_PROCESSES", "1")),
+            process_queue_size=int(os.getenv("BOT_PROCESS_QUEUE_SIZE", "1000")),
+            restart_delay=float(os.getenv("BOT_RESTART_DELAY", "1")),
+            worker_metrics_host=os.getenv(
+                "BOT_WORKER_METRICS_HOST", "localhost"
+            ),
+            worker_metrics_port=int(
+                os.getenv("BOT_WORKER_METRICS_PORT", "8081")
+            ),
+            rate_limits=parse_rate_limits(os.getenv("BOT_RATE_LIMITS", "")),
+            rate_limit_silent=os.getenv("BOT_RATE_LIMIT_SILENT", "1") == "1",
+            question_cache_size=int(os.getenv("QUESTION_CACHE_SIZE", "10000")),
+            question_cache_warmup=int(os.getenv("QUESTION_CACHE_WARMUP", "0")),
+            question_cache_ttl=float(os.getenv("QUESTION_CACHE_TTL", "600")),
         ),
         database=DatabaseConfig(
             host=os.getenv("DB_HOST", "localhost"),
@@ -66,5 +172,31 @@ def setup_config(app: "Application"):
             user=os.getenv("DB_USER", "postgres"),
             password=os.getenv("DB_PASSWORD", "postgres"),
             database=os.getenv("DB_NAME", "what"),
+            pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+            pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+            pool_pre_ping=os.getenv("DB_POOL_PRE_PING", "1") == "1",
+            statement_cache_size=int(
+                os.getenv("DB_STATEMENT_CACHE_SIZE", "100")
+            ),
+            write_behind=os.getenv("DB_WRITE_BEHIND", "1") == "1",
+            write_behind_rows=int(os.getenv("DB_WRITE_BEHIND_ROWS", "500")),
+            write_behind_delay=float(
+                os.getenv("DB_WRITE_BEHIND_DELAY", "0.05")
+            ),
+        ),
+        game=GameConfig(
+            rounds=int(os.getenv("GAME_ROUNDS", "3")),
+            discussion_time=int(os.getenv("GAME_DISCUSSION_TIME", "60")),
+            warning_before=int(os.getenv("GAME_WARNING_BEFORE", "10")),
+            rules_delay=int(os.getenv("GAME_RULES_DELAY", "5")),
+            round_pause=int(os.getenv("GAME_ROUND_PAUSE", "2")),
+            choose_timeout=int(os.getenv("GAME_CHOOSE_TIMEOUT", "60")),
+            answer_timeout=int(os.getenv("GAME_ANSWER_TIMEOUT", "60")),
+            registration_timeout=int(
+                os.getenv("GAME_REGISTRATION_TIMEOUT", "600")
+            ),
+            resume_grace=int(os.getenv("GAME_RESUME_GRACE", "300")),
         ),
     )
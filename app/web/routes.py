@@ -5,7 +5,19 @@ if typing.TYPE_CHECKING:
 
 
 def setup_routes(app: "Application"):
-    from app.web.views.views import QuestionAddView, QuestionListView
+    from app.web.views.views import (
+        MetricsView,
+        QuestionAddView,
+        QuestionImportView,
+        QuestionListView,
+        QuestionUpdateView,
+        TelegramWebhookView,
+    )
 
     app.router.add_view("/add_question", QuestionAddView)
+    app.router.add_view("/update_question", QuestionUpdateView)
     app.router.add_view("/questions", QuestionListView)
+    app.router.add_view("/import_questions", QuestionImportView)
+    app.router.add_view("/metrics", MetricsView)
+    if app.config.bot.mode == "webhook":
+        app.router.add_view(app.config.bot.webhook_path, TelegramWebhookView)
@@ -1,10 +1,33 @@
-from marshmallow import Schema, fields
+from marshmallow import Schema, fields, validate
 
 
 class QuestionSchema(Schema):
     question = fields.Str(required=True)
     answer = fields.Str(required=True)
+    # Другие засчитываемые ответы
+    alternatives = fields.List(fields.Str(), load_default=list)
+
+
+class QuestionUpdateSchema(Schema):
+    id = fields.Int(required=True)
+    question = fields.Str()
+    answer = fields.Str()
+    # Без поля дополнительные ответы не меняются, [] — удаляет их
+    alternatives = fields.List(fields.Str())
 
 
 class QuestionListRequestSchema(Schema):
-    pass
+    after_id = fields.Int(load_default=0)
+    limit = fields.Int(
+        load_default=100, validate=validate.Range(min=1, max=1000)
+    )
+    stream = fields.Bool(load_default=False)
+
+
+class QuestionItemSchema(QuestionSchema):
+    id = fields.Int(required=True)
+
+
+class QuestionListResponseSchema(Schema):
+    questions = fields.List(fields.Nested(QuestionItemSchema))
+    next_after_id = fields.Int(allow_none=True)
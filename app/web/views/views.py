@@ -1,8 +1,34 @@
-from aiohttp.web import HTTPBadRequest, json_response
-from aiohttp_apispec import request_schema, response_schema, docs
+import hmac
+import json
 
+from aiohttp.web import (
+    HTTPBadRequest,
+    HTTPNotFound,
+    Response,
+    StreamResponse,
+    json_response,
+)
+from aiohttp_apispec import (
+    docs,
+    querystring_schema,
+    request_schema,
+    response_schema,
+)
+from marshmallow import ValidationError
+
+from app.base.metrics import REGISTRY
+from app.store.bot.importer import FORMATS, MAX_BATCH_SIZE, QuestionImporter
 from app.web.app import View
-from app.web.schema import QuestionSchema, QuestionListRequestSchema
+from app.web.schema import (
+    QuestionItemSchema,
+    QuestionListRequestSchema,
+    QuestionListResponseSchema,
+    QuestionSchema,
+    QuestionUpdateSchema,
+)
+
+STREAM_CHUNK_SIZE = 500
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
 
 
 class QuestionAddView(View):
@@ -19,15 +45,18 @@ class QuestionAddView(View):
             if "question" not in self.data or "answer" not in self.data:
                 raise HTTPBadRequest(text="Question and answer are required")
 
+            alternatives = self.data.get("alternatives") or []
             await self.store.quiz.create_question(
                 question_text=self.data["question"],
                 answer_text=self.data["answer"],
+                alternatives=alternatives,
             )
 
             return json_response(
                 data={
                     "question": self.data["question"],
                     "answer": self.data["answer"],
+                    "alternatives": alternatives,
                 }
             )
 
@@ -35,22 +64,162 @@ class QuestionAddView(View):
             return json_response(status=500, data={"error": str(e)})
 
 
+class QuestionUpdateView(View):
+    @request_schema(QuestionUpdateSchema)
+    @response_schema(QuestionItemSchema)
+    @docs(tags=['add'],
+          summary='update question',
+          description='Edits question text, answer or alternatives')
+    async def patch(self):
+        try:
+            params = QuestionUpdateSchema().load(self.data)
+        except ValidationError as e:
+            raise HTTPBadRequest(text=json.dumps(e.messages)) from e
+
+        try:
+            question = await self.store.quiz.update_question(
+                params["id"],
+                question_text=params.get("question"),
+                answer_text=params.get("answer"),
+                alternatives=params.get("alternatives"),
+            )
+        except Exception as e:
+            return json_response(status=500, data={"error": str(e)})
+
+        if question is None:
+            raise HTTPNotFound(text=f"Question {params['id']} not found")
+        return json_response(
+            data={
+                "id": question.id,
+                "question": question.text,
+                "answer": question.answer,
+            }
+        )
+
+
 class QuestionListView(View):
-    @request_schema(QuestionListRequestSchema)
-    @response_schema(QuestionListRequestSchema)
+    @querystring_schema(QuestionListRequestSchema)
+    @response_schema(QuestionListResponseSchema)
     @docs(tags=['get'],
           summary=' get all questions',
-          description='Test method get all questions')
+          description='Keyset-paginated question list, '
+                      'stream=true streams the whole bank')
     async def get(self):
         try:
-            questions = await self.store.quiz.list_questions()
+            params = QuestionListRequestSchema().load(self.request.query)
+        except ValidationError as e:
+            raise HTTPBadRequest(text=json.dumps(e.messages)) from e
+
+        if params["stream"]:
+            return await self._stream()
+
+        try:
+            questions = await self.store.quiz.list_questions(
+                after_id=params["after_id"], limit=params["limit"]
+            )
+            next_after_id = (
+                questions[-1].id
+                if len(questions) == params["limit"]
+                else None
+            )
             return json_response(
                 data={
                     "questions": [
-                        {"question": q.question, "answer": q.answer}
+                        {"id": q.id, "question": q.question, "answer": q.answer}
                         for q in questions
-                    ]
+                    ],
+                    "next_after_id": next_after_id,
                 }
             )
         except Exception as e:
             return json_response(status=500, data={"error": str(e)})
+
+    async def _stream(self) -> StreamResponse:
+        response = StreamResponse(
+            headers={"Content-Type": "application/json; charset=utf-8"}
+        )
+        response.enable_chunked_encoding()
+        await response.prepare(self.request)
+
+        # Пишем JSON кусками прямо из курсора, не собирая ответ целиком
+        await response.write(b'{"questions": [')
+        chunk: list[str] = []
+        first = True
+        async for q in self.store.quiz.stream_questions():
+            item = json.dumps(
+                {"id": q.id, "question": q.question, "answer": q.answer},
+                ensure_ascii=False,
+            )
+            chunk.append(item if first else "," + item)
+            first = False
+            if len(chunk) >= STREAM_CHUNK_SIZE:
+                await response.write("".join(chunk).encode())
+                chunk.clear()
+        chunk.append('], "next_after_id": null}')
+        await response.write("".join(chunk).encode())
+        await response.write_eof()
+        return response
+
+
+class QuestionImportView(View):
+    @docs(tags=['add'],
+          summary='bulk import questions',
+          description='Streams a JSONL or CSV upload into the question bank')
+    async def post(self):
+        fmt = self.request.query.get("format") or (
+            "csv" if self.request.content_type == "text/csv" else "jsonl"
+        )
+        if fmt not in FORMATS:
+            raise HTTPBadRequest(text=f"Unsupported format: {fmt}")
+
+        try:
+            batch_size = int(self.request.query.get("batch_size", 1000))
+        except ValueError as e:
+            raise HTTPBadRequest(text="batch_size must be integer") from e
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise HTTPBadRequest(
+                text=f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+
+        importer = QuestionImporter(self.store.quiz, batch_size=batch_size)
+        try:
+            report = await importer.import_lines(self._lines(), fmt)
+        except Exception as e:
+            return json_response(status=500, data={"error": str(e)})
+        return json_response(data=report.as_dict())
+
+    async def _lines(self):
+        # Тело читается построчно, целиком в память не загружается
+        async for line in self.request.content:
+            yield line.decode("utf-8-sig")
+
+
+class MetricsView(View):
+    @docs(tags=['monitoring'],
+          summary='prometheus metrics',
+          description='Metrics in Prometheus text exposition format')
+    async def get(self):
+        return Response(
+            text=REGISTRY.render(),
+            headers={"Content-Type": METRICS_CONTENT_TYPE},
+        )
+
+
+class TelegramWebhookView(View):
+    @docs(tags=['bot'],
+          summary='telegram webhook',
+          description='Receives Telegram updates in webhook mode')
+    async def post(self):
+        # Секрет обязателен в режиме webhook, см. Bot.__init__
+        secret = self.request.app.config.bot.webhook_secret
+        header = self.request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+        if not secret or not hmac.compare_digest(header, secret):
+            return Response(status=401)
+
+        # Апдейт Telegram всегда JSON-объект, остальное не разбираем
+        if not isinstance(self.data, dict):
+            return Response(status=400)
+
+        # Отвечаем сразу: обработка идёт в Worker, а не в запросе
+        if not self.store.bots_manager.feed_update(self.data):
+            return Response(status=503)
+        return Response(status=200)
@@ -0,0 +1,254 @@
+"""Прогон микробенчмарков с сохранением и сравнением результатов.
+
+    python -m bench --output base.json            # до изменения
+    python -m bench --baseline base.json          # после: сравнение
+
+Бенчмарки с базой идут только против отдельной базы BENCH_DB_NAME
+(и BENCH_DB_HOST/PORT/USER/PASSWORD, по умолчанию как DB_*), иначе
+пропускаются. Фикстуры строятся от --seed: банк вопросов размера --bank-size,
+--chats чатов с --asked заданными вопросами и пачка из --batch-size
+апдейтов. Вместо синтетической пачки можно взять записанную
+(--updates, ответ getUpdates или список апдейтов), а синтетическую
+записать для следующих прогонов (--record-updates). С --baseline
+процесс завершается с кодом 1, если время какого-то бенчмарка выросло
+больше чем на --threshold. По умолчанию сравнивается минимум замеров:
+фоновая нагрузка его почти не сдвигает, в отличие от медианы.
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import UTC, datetime
+
+from sqlalchemy import text
+
+from app.store.database import Database
+from app.web.app import Application
+from app.web.config import setup_config
+from bench.fixtures import (
+    BenchDatabaseError,
+    bench_chats,
+    load_updates,
+    make_updates,
+    mark_asked,
+    save_updates,
+    seed_bank,
+    seed_chats,
+    use_bench_database,
+)
+from bench.suite import BENCHMARKS, Context, Operation
+
+# Параметры, от которых зависят фикстуры: сравнивать можно только
+# прогоны с одинаковыми
+FIXTURE_PARAMS = ("seed", "bank_size", "chats", "asked", "batch_size")
+
+
+async def call_many(op: Operation, number: int) -> float:
+    started = time.perf_counter()
+    for _ in range(number):
+        result = op()
+        if inspect.isawaitable(result):
+            await result
+    return time.perf_counter() - started
+
+
+async def measure(op: Operation, repeat: int, sample_time: float) -> dict:
+    # Как timeit: число вызовов в замере подбирается так, чтобы замер
+    # длился не меньше sample_time
+    number = 1
+    while (elapsed := await call_many(op, number)) < sample_time:
+        number = max(number * 2, int(number * sample_time / max(elapsed, 1e-9)))
+    samples = [
+        await call_many(op, number) / number * 1e6 for _ in range(repeat)
+    ]
+    return {
+        "median_us": statistics.median(samples),
+        "min_us": min(samples),
+        "stdev_us": statistics.stdev(samples) if repeat > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+async def connect_database() -> tuple[Application | None, str | None]:
+    try:
+        use_bench_database()
+    except BenchDatabaseError as e:
+        return None, str(e)
+    app = Application()
+    setup_config(app)
+    app.database = Database(app)
+    await app.database.connect()
+    try:
+        async with app.database.engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except Exception as e:
+        await app.database.disconnect()
+        return None, f"база недоступна: {e}"
+    return app, None
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args: argparse.Namespace) -> dict:
+    selected = [
+        bench
+        for name, bench in BENCHMARKS.items()
+        if not args.select or any(part in name for part in args.select)
+    ]
+    if args.updates:
+        updates = load_updates(args.updates)
+    else:
+        updates = make_updates(
+            args.batch_size, random.Random(args.seed), chats=args.chats
+        )
+    if args.record_updates:
+        save_updates(args.record_updates, updates)
+
+    ctx = Context(
+        seed=args.seed, updates=updates, chats=bench_chats(args.chats)
+    )
+    skipped: dict[str, str] = {}
+    if any(bench.db for bench in selected):
+        reason = "отключено --no-db"
+        if not args.no_db:
+            ctx.app, reason = await connect_database()
+        if ctx.app is None:
+            skipped = {bench.name: reason for bench in selected if bench.db}
+            selected = [bench for bench in selected if not bench.db]
+        else:
+            args.bank_size = await seed_bank(ctx.app, args.bank_size)
+            await seed_chats(ctx.app, ctx.chats)
+            await mark_asked(
+                ctx.app, ctx.chats, args.asked, random.Random(args.seed)
+            )
+
+    results = {}
+    try:
+        for bench in selected:
+            # Выбор вопросов внутри аксессоров тоже должен повторяться
+            random.seed(args.seed)
+            result = await measure(
+                bench.setup(ctx), args.repeat, args.sample_time
+            )
+            results[bench.name] = result
+            print(
+                f"{bench.name:<34} median={result['median_us']:10.1f}us "
+                f"min={result['min_us']:10.1f}us"
+            )
+    finally:
+        if ctx.app is not None:
+            await ctx.app.database.disconnect()
+
+    for name, reason in skipped.items():
+        print(f"{name:<34} пропущен: {reason}")
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "created": datetime.now(UTC).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "params": {name: getattr(args, name) for name in FIXTURE_PARAMS},
+            "updates": args.updates,
+        },
+        "results": results,
+        "skipped": skipped,
+    }
+
+
+def compare(
+    baseline: dict, current: dict, threshold: float, metric: str
+) -> list[str]:
+    """Печатает сравнение и возвращает имена регрессировавших."""
+    if baseline["meta"]["params"] != current["meta"]["params"]:
+        print(
+            "Внимание: фикстуры прогонов различаются: "
+            f"{baseline['meta']['params']} -> {current['meta']['params']}"
+        )
+    print(f"\nсравнение с {baseline['meta'].get('commit') or 'baseline'}:")
+    regressions = []
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:<34} новый")
+            continue
+        ratio = result[metric] / base[metric]
+        status = ""
+        if ratio > 1 + threshold:
+            status = "РЕГРЕССИЯ"
+            regressions.append(name)
+        elif ratio < 1 - threshold:
+            status = "быстрее"
+        print(
+            f"{name:<34} {base[metric]:10.1f}us -> "
+            f"{result[metric]:10.1f}us  x{ratio:5.2f} {status}"
+        )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m bench",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "-k",
+        dest="select",
+        action="append",
+        help="только бенчмарки, в имени которых есть подстрока",
+    )
+    parser.add_argument("--list", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bank-size", type=int, default=10000)
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--asked", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--updates")
+    parser.add_argument("--record-updates")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--sample-time", type=float, default=0.05)
+    parser.add_argument("--no-db", action="store_true")
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument(
+        "--metric", choices=("min_us", "median_us"), default="min_us"
+    )
+    args = parser.parse_args()
+
+    if args.list:
+        for name, bench in BENCHMARKS.items():
+            print(f"{name}{' (db)' if bench.db else ''}")
+        return 0
+
+    current = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(current, file, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        if compare(baseline, current, args.threshold, args.metric):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""Разбор ответа getUpdates: UpdateView на orjson против stdlib json.
+
+Без сети и базы, на синтетических апдейтах:
+
+    python -m bench.decoding --batch-size 100 --batches 2000
+
+Пути прогреваются и меряются по очереди несколько раз, в отчёт идёт
+лучший прогон каждого: порядок запуска не влияет на результат.
+"""
+
+import argparse
+import json
+import random
+import time
+
+from bench.fixtures import make_body, make_updates
+from clients.tg.dcs import decode_updates
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def consume(updates) -> int:
+    # То, что реально читает Worker
+    touched = 0
+    for upd in updates:
+        message = upd.message
+        if message is None or not message.text:
+            continue
+        touched += message.chat.id + message.from_.id + len(message.text)
+    return touched
+
+
+def stdlib_path(body: bytes) -> int:
+    return consume(decode_updates(json.loads(body)))
+
+
+def orjson_path(body: bytes) -> int:
+    return consume(decode_updates(orjson.loads(body)))
+
+
+def measure(decode, bodies: list[bytes]) -> float:
+    started = time.perf_counter()
+    for body in bodies:
+        decode(body)
+    return time.perf_counter() - started
+
+
+def main(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    bodies = [
+        make_body(
+            make_updates(args.batch_size, rng, first_id=i * args.batch_size)
+        )
+        for i in range(args.batches)
+    ]
+    paths = {"stdlib json": stdlib_path}
+    if orjson is None:
+        print("orjson не установлен, меряется только stdlib json")
+    else:
+        paths["orjson"] = orjson_path
+        # Оба пути должны видеть одно и то же
+        if orjson_path(bodies[0]) != stdlib_path(bodies[0]):
+            raise SystemExit("Результаты разбора расходятся")
+
+    for decode in paths.values():
+        measure(decode, bodies[: max(1, len(bodies) // 10)])
+    best = dict.fromkeys(paths, float("inf"))
+    for _ in range(args.repeat):
+        for name, decode in paths.items():
+            best[name] = min(best[name], measure(decode, bodies))
+
+    print(
+        f"batches={args.batches} batch_size={args.batch_size} "
+        f"repeat={args.repeat}"
+    )
+    updates = len(bodies) * args.batch_size
+    for name, elapsed in best.items():
+        print(f"UpdateView + {name:<12} {updates / elapsed:12,.0f} updates/s")
+    if orjson is not None:
+        print(f"orjson speedup x{best['stdlib json'] / best['orjson']:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--batches", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    main(parser.parse_args())
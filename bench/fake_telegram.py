@@ -0,0 +1,285 @@
+"""Фейковый Telegram Bot API для нагрузочных и сквозных прогонов.
+
+Отвечает на getUpdates, sendMessage, getMe, getChatAdministrators,
+setWebhook и deleteWebhook по адресу /bot<token>/<метод>; бот
+направляется сюда через TG_API_URL. Апдейты кладёт сценарий
+(push_command), getUpdates отдаёт их long-poll'ом. Сообщения бота
+передаются в on_message, так сценарий может на них отвечать. Задержка
+ответа и доля 429 на sendMessage настраиваются.
+
+Отдельно, со сценарием из JSON-файла (список шагов
+{"chat_id", "user_id", "username", "text", "delay"}):
+
+    python -m bench.fake_telegram --rate-429 0.01 --scenario steps.json
+    TG_API_URL=http://127.0.0.1:8090 python main.py
+
+Порт по умолчанию 8090: 8080 занимает сам бот, а с 8081 начинаются
+порты метрик воркеров (BOT_WORKER_METRICS_PORT).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter, deque
+from collections.abc import Callable
+
+from aiohttp import web
+
+from clients.tg.dcs import dumps, loads
+
+# on_message(chat_id, text): вызывается на каждое принятое sendMessage
+MessageListener = Callable[[int, str], None]
+
+
+class FakeTelegram:
+    def __init__(
+        self,
+        *,
+        bot_username: str = "fake_bot",
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        rate_429: float = 0.0,
+        retry_after: int = 1,
+        seed: int | None = None,
+    ):
+        self.bot_user = {
+            "id": 1,
+            "is_bot": True,
+            "first_name": "Fake",
+            "username": bot_username,
+        }
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.on_message: MessageListener | None = None
+        # chat_id -> username администраторов для getChatAdministrators
+        self.admins: dict[int, list[str]] = {}
+
+        self.calls: Counter[str] = Counter()
+        self.delivered = 0  # апдейтов отдано через getUpdates
+        self.sent = 0  # принятых sendMessage
+        self.throttled = 0  # sendMessage, получивших 429
+
+        self._updates: deque[dict] = deque()
+        self._arrived = asyncio.Event()
+        self._next_update_id = 1
+        self._next_message_id = 1
+        self._runner: web.AppRunner | None = None
+        self._methods = {
+            "getUpdates": self.get_updates,
+            "sendMessage": self.send_message,
+            "getMe": self.get_me,
+            "getChatAdministrators": self.get_chat_administrators,
+            "setWebhook": self.set_webhook,
+            "deleteWebhook": self.set_webhook,
+        }
+
+        self.app = web.Application()
+        self.app.router.add_route("*", "/bot{token}/{method}", self.handle)
+
+    @property
+    def pending(self) -> int:
+        """Апдейты, которые бот ещё не подтвердил через offset."""
+        return len(self._updates)
+
+    def push_command(
+        self, chat_id: int, user_id: int, username: str, text: str
+    ) -> int:
+        """Кладёт сообщение пользователя в группу; возвращает update_id."""
+        command = text.split(maxsplit=1)[0] if text.startswith("/") else ""
+        message = {
+            "message_id": self._next_message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "supergroup", "title": "bench"},
+            "from": {
+                "id": user_id,
+                "is_bot": False,
+                "first_name": username,
+                "username": username,
+            },
+            "text": text,
+        }
+        if command:
+            message["entities"] = [
+                {"type": "bot_command", "offset": 0, "length": len(command)}
+            ]
+        self._next_message_id += 1
+        return self.push_update({"message": message})
+
+    def push_update(self, update: dict) -> int:
+        update_id = self._next_update_id
+        self._next_update_id += 1
+        self._updates.append({"update_id": update_id, **update})
+        self._arrived.set()
+        return update_id
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"]
+        self.calls[method] += 1
+        params = dict(request.query)
+        if request.can_read_body:
+            params.update(await request.json(loads=loads))
+
+        if self.latency or self.jitter:
+            await asyncio.sleep(
+                self.latency + self.random.uniform(0, self.jitter)
+            )
+
+        handler = self._methods.get(method)
+        if handler is None:
+            return self._error(404, f"Not Found: method {method} not found")
+        return await handler(params)
+
+    async def get_updates(self, params: dict) -> web.Response:
+        offset = int(params.get("offset", 0))
+        timeout = float(params.get("timeout", 0))
+        limit = int(params.get("limit", 100))
+
+        # Всё, что ниже offset, бот подтвердил
+        while self._updates and self._updates[0]["update_id"] < offset:
+            self._updates.popleft()
+        if not self._updates and timeout:
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), timeout)
+            except TimeoutError:
+                pass
+
+        result = [
+            update
+            for _, update in zip(range(limit), self._updates, strict=False)
+        ]
+        self.delivered += len(result)
+        return self._ok(result)
+
+    async def send_message(self, params: dict) -> web.Response:
+        if self.rate_429 and self.random.random() < self.rate_429:
+            self.throttled += 1
+            return self._error(
+                429,
+                f"Too Many Requests: retry after {self.retry_after}",
+                {"retry_after": self.retry_after},
+            )
+
+        chat_id = int(params["chat_id"])
+        text = params["text"]
+        message = {
+            "message_id": self._next_message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "supergroup", "title": "bench"},
+            "from": self.bot_user,
+            "text": text,
+        }
+        self._next_message_id += 1
+        self.sent += 1
+        if self.on_message is not None:
+            self.on_message(chat_id, text)
+        return self._ok(message)
+
+    async def get_me(self, params: dict) -> web.Response:
+        return self._ok(self.bot_user)
+
+    async def get_chat_administrators(self, params: dict) -> web.Response:
+        chat_id = int(params["chat_id"])
+        admins = [{"status": "administrator", "user": self.bot_user}]
+        admins.extend(
+            {
+                "status": "administrator",
+                "user": {
+                    "id": index,
+                    "is_bot": False,
+                    "first_name": username,
+                    "username": username,
+                },
+            }
+            for index, username in enumerate(self.admins.get(chat_id, ()), 2)
+        )
+        return self._ok(admins)
+
+    async def set_webhook(self, params: dict) -> web.Response:
+        return self._ok(result=True)
+
+    @staticmethod
+    def _ok(result) -> web.Response:
+        return web.json_response({"ok": True, "result": result}, dumps=dumps)
+
+    @staticmethod
+    def _error(
+        status: int, description: str, parameters: dict | None = None
+    ) -> web.Response:
+        body = {"ok": False, "error_code": status, "description": description}
+        if parameters:
+            body["parameters"] = parameters
+        return web.json_response(body, status=status, dumps=dumps)
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Поднимает сервер и возвращает адрес для TG_API_URL."""
+        self._runner = web.AppRunner(self.app, handle_signals=False)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        # При port=0 порт выбирает система
+        host, port = self._runner.addresses[0][:2]
+        return f"http://{host}:{port}"
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+async def play_scenario(fake: FakeTelegram, steps: list[dict]) -> None:
+    for step in steps:
+        await asyncio.sleep(step.get("delay", 0))
+        fake.push_command(
+            step["chat_id"],
+            step.get("user_id", 1000),
+            step["username"],
+            step["text"],
+        )
+
+
+async def main(args: argparse.Namespace, steps: list[dict]) -> None:
+    fake = FakeTelegram(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    fake.on_message = lambda chat_id, text: print(
+        f"[{chat_id}] {text.splitlines()[0]}"
+    )
+    url = await fake.start(args.host, args.port)
+    print(f"TG_API_URL={url}")
+    try:
+        await play_scenario(fake, steps)
+        await asyncio.Event().wait()
+    finally:
+        await fake.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--scenario")
+    args = parser.parse_args()
+    steps = []
+    if args.scenario:
+        with open(args.scenario, encoding="utf-8") as file:
+            steps = json.load(file)
+    try:
+        asyncio.run(main(args, steps))
+    except KeyboardInterrupt:
+        pass
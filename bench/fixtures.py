@@ -0,0 +1,205 @@
+"""Воспроизводимые данные для бенчмарков.
+
+Всё, что зависит от случайности, строится от явного random.Random(seed),
+поэтому два прогона с одним seed видят одинаковые банк вопросов, чаты
+и апдейты и их результаты можно сравнивать между коммитами.
+
+Бенчмарки пишут в базу вопросы «bench question N», игры и заданные
+вопросы, поэтому работают только с отдельной базой BENCH_DB_*,
+см. use_bench_database.
+"""
+
+import json
+import os
+import random
+
+from sqlalchemy import delete, func, insert, select
+
+from app.store.bot.accessor import GameAccessor
+from app.store.database.models import AskedQuestions, Questions
+from app.web.app import Application
+from app.web.config import setup_config
+
+INSERT_BATCH = 1000
+# Чаты бенчмарков не пересекаются с настоящими
+FIRST_CHAT_ID = -1_000_000_000_000
+CHAT_TEXTS = ("/join", "/answer пушкин", "/help", "привет", "/choose @p1")
+
+
+class BenchDatabaseError(RuntimeError):
+    pass
+
+
+def use_bench_database() -> None:
+    """Переключает DB_* окружения на базу бенчмарков из BENCH_DB_*.
+
+    BENCH_DB_NAME обязателен, BENCH_DB_HOST/PORT/USER/PASSWORD по
+    умолчанию берутся из DB_*. База, совпадающая с рабочей (тот же
+    хост, порт и имя), отвергается. Окружение меняется целиком, так что
+    его видят и процессы-воркеры, и повторный setup_config: .env
+    уже заданные переменные не перекрывает.
+    """
+    probe = Application()
+    setup_config(probe)  # заодно подгружает .env в окружение
+    config = probe.config.database
+    name = os.getenv("BENCH_DB_NAME")
+    if not name:
+        raise BenchDatabaseError(
+            "не задан BENCH_DB_NAME: бенчмарки пишут в базу "
+            "и на рабочей не запускаются"
+        )
+    bench = {
+        "DB_HOST": os.getenv("BENCH_DB_HOST", config.host),
+        "DB_PORT": os.getenv("BENCH_DB_PORT", config.port),
+        "DB_USER": os.getenv("BENCH_DB_USER", config.user),
+        "DB_PASSWORD": os.getenv("BENCH_DB_PASSWORD", config.password),
+        "DB_NAME": name,
+    }
+    if (bench["DB_HOST"], bench["DB_PORT"], name) == (
+        config.host,
+        config.port,
+        config.database,
+    ):
+        raise BenchDatabaseError(
+            f"BENCH_DB_NAME={name} указывает на рабочую базу DB_NAME"
+        )
+    os.environ.update(bench)
+
+
+def bench_chats(count: int) -> list[int]:
+    return [FIRST_CHAT_ID - i for i in range(count)]
+
+
+def make_update(
+    update_id: int, rng: random.Random, chats: int = 50, users: int = 500
+) -> dict:
+    chat = {
+        "id": FIRST_CHAT_ID - update_id % chats,
+        "type": "supergroup",
+        "title": "t",
+    }
+    user = {
+        "id": update_id % users,
+        "is_bot": False,
+        "first_name": "Игрок",
+        "last_name": None,
+        "username": f"player{update_id % users}",
+        "language_code": "ru",
+    }
+    if update_id % 10 == 0:
+        # Служебные апдейты: у нас они не используются
+        return {
+            "update_id": update_id,
+            "my_chat_member": {
+                "chat": chat,
+                "from": user,
+                "date": 0,
+                "old_chat_member": {"status": "left", "user": user},
+                "new_chat_member": {"status": "member", "user": user},
+            },
+        }
+    text = rng.choice(CHAT_TEXTS)
+    message = {
+        "message_id": update_id,
+        "date": 0,
+        "chat": chat,
+        "from": user,
+        "text": text,
+    }
+    if text.startswith("/"):
+        message["entities"] = [
+            {"type": "bot_command", "offset": 0, "length": len(text.split()[0])}
+        ]
+    return {"update_id": update_id, "message": message}
+
+
+def make_updates(
+    count: int, rng: random.Random, chats: int = 50, first_id: int = 1
+) -> list[dict]:
+    return [make_update(first_id + i, rng, chats) for i in range(count)]
+
+
+def make_body(updates: list[dict]) -> bytes:
+    """Тело ответа getUpdates, как его отдаёт Telegram."""
+    return json.dumps({"ok": True, "result": updates}).encode()
+
+
+def load_updates(path: str) -> list[dict]:
+    """Записанные апдейты: ответ getUpdates целиком или список апдейтов."""
+    with open(path, encoding="utf-8") as file:
+        data = json.load(file)
+    return data["result"] if isinstance(data, dict) else data
+
+
+def save_updates(path: str, updates: list[dict]) -> None:
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(updates, file, ensure_ascii=False, indent=1)
+
+
+async def seed_bank(app: Application, bank_size: int) -> int:
+    """Дополняет банк вопросов до bank_size строк."""
+    async with app.database.session() as session:
+        count = (
+            await session.execute(select(func.count(Questions.id)))
+        ).scalar_one()
+        for start in range(count, bank_size, INSERT_BATCH):
+            stop = min(start + INSERT_BATCH, bank_size)
+            await session.execute(
+                insert(Questions).values(
+                    [
+                        {
+                            "question": f"bench question {i}",
+                            "answer": f"answer {i}",
+                        }
+                        for i in range(start, stop)
+                    ]
+                )
+            )
+        await session.commit()
+    return max(count, bank_size)
+
+
+async def seed_chats(app: Application, chat_ids: list[int]) -> None:
+    """Строки game для чатов: на них ссылается asked_questions."""
+    games = GameAccessor(app)
+    for chat_id in chat_ids:
+        await games.create_or_update_game(code_of_chat=chat_id, is_working=0)
+
+
+async def mark_asked(
+    app: Application,
+    chat_ids: list[int],
+    asked: int,
+    rng: random.Random | None = None,
+) -> None:
+    """Помечает asked вопросов заданными в каждом из chat_ids.
+
+    Без rng берутся первые asked вопросов, с rng — случайные свои
+    для каждого чата.
+    """
+    async with app.database.session() as session:
+        await session.execute(
+            delete(AskedQuestions).where(AskedQuestions.chat_id.in_(chat_ids))
+        )
+        ids = (
+            (await session.execute(select(Questions.id).order_by(Questions.id)))
+            .scalars()
+            .all()
+        )
+        for chat_id in chat_ids:
+            chosen = (
+                rng.sample(ids, min(asked, len(ids)))
+                if rng is not None
+                else ids[:asked]
+            )
+            rows = [
+                {"chat_id": chat_id, "question": question_id}
+                for question_id in chosen
+            ]
+            for start in range(0, len(rows), INSERT_BATCH):
+                await session.execute(
+                    insert(AskedQuestions).values(
+                        rows[start : start + INSERT_BATCH]
+                    )
+                )
+        await session.commit()
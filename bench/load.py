@@ -0,0 +1,262 @@
+"""Сквозная нагрузка: групповые чаты играют полные игры через фейковый
+Bot API из bench/fake_telegram.py.
+
+Каждый чат проходит /start, /join всех игроков, /finish_reg, а в каждом
+раунде /choose и /answer, отвечая на сообщения бота. Бот поднимается
+в этом же процессе с отдельной базой BENCH_DB_* (см. fixtures.py,
+нужны вопросы в банке) и ходит в фейк через TG_API_URL. Таймеры игры
+укорочены, а лимиты отправки подняты через BENCH_ENV; заданное
+в окружении важнее.
+
+    python -m bench.load --chats 2000 --ramp 10 --rate-429 0.01
+
+Печатает апдейты/с, p50/p99 задержки от команды до первого ответа бота
+в чат и число SQL-запросов на игру. С --external бот не поднимается:
+фейк слушает --port, бот запускается отдельно с TG_API_URL, запросы к
+БД тогда не считаются (как и в процессах-воркерах при BOT_PROCESSES>1).
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import time
+from collections import defaultdict
+
+from aiohttp.web import AppRunner
+from sqlalchemy import event
+
+from app.store import setup_store
+from app.store.bot.messages import (
+    CHOOSE_PLAYER_TEXT,
+    CORRECT_ANSWER_TEXT,
+    FINAL_DRAW_TEXT,
+    FINAL_LOSE_TEXT,
+    FINAL_WIN_TEXT,
+    PLAYER_ANSWER_PROMPT,
+    PLAYER_REGISTERED_TEXT,
+    QUESTIONS_EMPTY_TEXT,
+    REGISTRATION_FINISHED_TEXT,
+    REGISTRATION_START_TEXT,
+    WRONG_ANSWER_TEXT,
+)
+from app.web.app import Application
+from app.web.config import setup_config
+from app.web.logger import setup_logging
+from bench.fake_telegram import FakeTelegram
+from bench.fixtures import FIRST_CHAT_ID, use_bench_database
+from bench.question_selection import report
+
+BENCH_ENV = {
+    "BOT_TOKEN": "bench",
+    "TG_GLOBAL_RATE": "100000",
+    "TG_CHAT_RATE_PER_MINUTE": "6000",
+    "TG_CHAT_BURST": "50",
+    "TG_SEND_CONCURRENCY": "100",
+    "GAME_DISCUSSION_TIME": "1",
+    "GAME_RULES_DELAY": "0",
+    "GAME_ROUND_PAUSE": "0",
+}
+CAPTAIN_RE = re.compile(r"Капитан @(\S+)")
+
+
+def marker(template: str) -> str:
+    """Самый длинный неизменный кусок шаблона сообщения."""
+    return max(re.split(r"\{[^}]*\}", template), key=len)
+
+
+REGISTRATION_STARTED = marker(REGISTRATION_START_TEXT)
+PLAYER_REGISTERED = marker(PLAYER_REGISTERED_TEXT)
+REGISTRATION_FINISHED = marker(REGISTRATION_FINISHED_TEXT)
+CHOOSE = marker(CHOOSE_PLAYER_TEXT)
+ANSWER_PROMPT = marker(PLAYER_ANSWER_PROMPT)
+ANSWER_CHECKED = (marker(CORRECT_ANSWER_TEXT), marker(WRONG_ANSWER_TEXT))
+GAME_OVER = tuple(
+    marker(text)
+    for text in (
+        FINAL_WIN_TEXT,
+        FINAL_LOSE_TEXT,
+        FINAL_DRAW_TEXT,
+        QUESTIONS_EMPTY_TEXT,
+    )
+)
+
+
+class QueryCounter:
+    """Слушатель before_cursor_execute: считает SQL-запросы движка."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args) -> None:
+        self.count += 1
+
+
+class ChatPlayer:
+    """Сценарий одного чата: команды игроков в ответ на сообщения бота."""
+
+    def __init__(
+        self,
+        fake: FakeTelegram,
+        index: int,
+        players: int,
+        latencies: dict[str, list[float]],
+        timeout: float,
+    ):
+        self.fake = fake
+        self.chat_id = FIRST_CHAT_ID - index
+        self.players = [f"bench{index}_{i}" for i in range(players)]
+        self.latencies = latencies
+        self.timeout = timeout
+        self.inbox: asyncio.Queue[str] = asyncio.Queue()
+        # (команда, время отправки) до первого ответа бота
+        self._waiting: tuple[str, float] | None = None
+
+    def on_message(self, text: str) -> None:
+        if self._waiting is not None:
+            command, sent_at = self._waiting
+            self.latencies[command].append(
+                (time.perf_counter() - sent_at) * 1000
+            )
+            self._waiting = None
+        self.inbox.put_nowait(text)
+
+    def command(self, username: str, text: str) -> None:
+        user_id = abs(self.chat_id) * 100 + self.players.index(username)
+        self._waiting = (text.split(maxsplit=1)[0], time.perf_counter())
+        self.fake.push_command(self.chat_id, user_id, username, text)
+
+    async def expect(self, *markers: str) -> str:
+        while True:
+            text = await asyncio.wait_for(self.inbox.get(), self.timeout)
+            if any(part in text for part in markers):
+                return text
+
+    async def play(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        owner = self.players[0]
+        self.command(owner, "/start")
+        await self.expect(REGISTRATION_STARTED)
+        for player in self.players:
+            self.command(player, "/join")
+            await self.expect(PLAYER_REGISTERED)
+        self.command(owner, "/finish_reg")
+        captain = CAPTAIN_RE.search(
+            await self.expect(REGISTRATION_FINISHED)
+        ).group(1)
+
+        while CHOOSE in await self.expect(CHOOSE, *GAME_OVER):
+            respondent = random.choice(self.players)
+            self.command(captain, f"/choose @{respondent}")
+            await self.expect(ANSWER_PROMPT)
+            self.command(respondent, "/answer не знаю")
+            await self.expect(*ANSWER_CHECKED)
+
+
+async def start_bot() -> tuple[AppRunner, QueryCounter | None]:
+    # Так же, как процесс-воркер кластера: без HTTP-сервера
+    app = Application()
+    setup_logging(app)
+    setup_config(app)
+    setup_store(app)
+    runner = AppRunner(app, handle_signals=False)
+    await runner.setup()
+
+    if app.config.bot.processes > 1:
+        return runner, None
+    counter = QueryCounter()
+    event.listen(
+        app.database.engine.sync_engine, "before_cursor_execute", counter
+    )
+    return runner, counter
+
+
+async def main(args: argparse.Namespace) -> None:
+    if not args.external:
+        # До старта фейка: без отдельной базы дальше идти нельзя
+        use_bench_database()
+    random.seed(args.seed)
+    fake = FakeTelegram(
+        latency=args.latency,
+        jitter=args.jitter,
+        rate_429=args.rate_429,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    latencies: dict[str, list[float]] = defaultdict(list)
+    chats = {
+        player.chat_id: player
+        for player in (
+            ChatPlayer(fake, i, args.players, latencies, args.timeout)
+            for i in range(args.chats)
+        )
+    }
+    fake.on_message = lambda chat_id, text: (
+        chats[chat_id].on_message(text) if chat_id in chats else None
+    )
+
+    url = await fake.start(args.host, args.port if args.external else 0)
+    runner = counter = None
+    if args.external:
+        print(f"Фейк слушает {url}, ждём бота: TG_API_URL={url}")
+        while not fake.calls["getUpdates"]:
+            await asyncio.sleep(0.5)
+    else:
+        for name, value in BENCH_ENV.items():
+            os.environ.setdefault(name, value)
+        os.environ["TG_API_URL"] = url
+        os.environ["BOT_MODE"] = "poller"
+        runner, counter = await start_bot()
+
+    try:
+        if counter is not None:
+            counter.count = 0  # без запросов старта и восстановления игр
+        started = time.perf_counter()
+        results = await asyncio.gather(
+            *(
+                chat.play(random.uniform(0, args.ramp))
+                for chat in chats.values()
+            ),
+            return_exceptions=True,
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+        await fake.stop()
+
+    finished = sum(result is None for result in results)
+    print(
+        f"chats={args.chats} players={args.players} "
+        f"finished={finished} failed={len(results) - finished} "
+        f"elapsed={elapsed:.1f}s"
+    )
+    print(
+        f"updates/s={fake.delivered / elapsed:,.0f} "
+        f"messages/s={fake.sent / elapsed:,.0f} 429={fake.throttled}"
+    )
+    for command, timings in sorted(latencies.items()):
+        report(command, timings)
+    report("all commands", [t for ts in latencies.values() for t in ts])
+    if counter is not None and finished:
+        print(f"db queries/game={counter.count / finished:.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--players", type=int, default=4)
+    parser.add_argument("--ramp", type=float, default=5.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--external", action="store_true")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,87 @@
+"""Сравнение выбора вопроса: ORDER BY random() против колоды по id.
+
+Запуск против отдельной базы (BENCH_DB_*, см. bench/fixtures.py):
+
+    BENCH_DB_NAME=what_bench python -m bench.question_selection --runs 50
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.store.bot.accessor import GameAccessor, QuizAccessor
+from app.store.database import Database
+from app.web.app import Application
+from app.web.config import setup_config
+from bench.fixtures import mark_asked, seed_bank, use_bench_database
+
+BENCH_CHAT_ID = -1
+
+
+async def measure(runs: int, call) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        await call()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(
+        f"{name:<32} mean={statistics.mean(timings):8.2f}ms "
+        f"p50={statistics.median(timings):8.2f}ms p99={p99:8.2f}ms"
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    use_bench_database()
+    app = Application()
+    setup_config(app)
+    app.database = Database(app)
+    await app.database.connect()
+    quiz = QuizAccessor(app)
+    games = GameAccessor(app)
+
+    try:
+        bank_size = await seed_bank(app, args.bank_size)
+        await games.clear_game_users_and_asked_questions(BENCH_CHAT_ID)
+        await games.create_or_update_game(code_of_chat=BENCH_CHAT_ID)
+        await mark_asked(app, [BENCH_CHAT_ID], args.asked)
+        print(f"bank={bank_size} asked={args.asked} runs={args.runs}")
+
+        report(
+            "ORDER BY random() LIMIT 1",
+            await measure(
+                args.runs,
+                lambda: quiz.get_random_unasked_question(BENCH_CHAT_ID),
+            ),
+        )
+        report(
+            "deck, 1 question",
+            await measure(
+                args.runs, lambda: quiz.draw_question_deck(BENCH_CHAT_ID, 1)
+            ),
+        )
+        report(
+            f"deck, {args.deck_size} questions",
+            await measure(
+                args.runs,
+                lambda: quiz.draw_question_deck(BENCH_CHAT_ID, args.deck_size),
+            ),
+        )
+    finally:
+        await games.clear_game_users_and_asked_questions(BENCH_CHAT_ID)
+        await app.database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bank-size", type=int, default=100000)
+    parser.add_argument("--asked", type=int, default=100)
+    parser.add_argument("--deck-size", type=int, default=3)
+    parser.add_argument("--runs", type=int, default=30)
+    asyncio.run(main(parser.parse_args()))
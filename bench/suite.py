@@ -0,0 +1,152 @@
+"""Микробенчмарки горячих путей для python -m bench.
+
+Бенчмарк — фабрика: по контексту готовит данные и возвращает операцию
+без аргументов, раннер меряет только её. Бенчмарки с db=True ходят
+в базу (DB_* из .env) и пропускаются, если она недоступна.
+"""
+
+import itertools
+import json
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from app.store.bot.accessor import GameAccessor, QuizAccessor
+from app.store.bot.answers import answer_variants, matches_answer
+from app.store.bot.filters import COMMANDS, UpdateFilter
+from app.store.bot.worker import Worker
+from app.web.app import Application
+from app.web.config import AdminConfig, BotConfig, Config, GameConfig
+from bench.fixtures import make_body
+from clients.tg.dcs import decode_update, decode_updates
+
+# Операция: обычная функция или корутинная, вызывается много раз подряд
+Operation = Callable[[], object]
+
+
+@dataclass
+class Context:
+    seed: int
+    updates: list[dict]  # одна пачка getUpdates
+    chats: list[int]
+    app: Application | None = None  # с подключённой базой
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    setup: Callable[[Context], Operation]
+    db: bool = False
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, *, db: bool = False):
+    def decorator(setup):
+        BENCHMARKS[name] = Benchmark(name, setup, db)
+        return setup
+
+    return decorator
+
+
+class _NullSender:
+    """Отправка в никуда: меряем разбор и маршрутизацию, а не сеть."""
+
+    async def send_message(self, *args, **kwargs) -> None:
+        return None
+
+
+@benchmark("decode.update_view")
+def decode_update_view(ctx: Context) -> Operation:
+    # dcs.loads: orjson, если установлен
+    body = make_body(ctx.updates)
+    return lambda: decode_updates(body)
+
+
+@benchmark("decode.update_view_stdlib_json")
+def decode_update_view_stdlib_json(ctx: Context) -> Operation:
+    body = make_body(ctx.updates)
+    return lambda: decode_updates(json.loads(body))
+
+
+@benchmark("filter.accepts")
+def filter_accepts(ctx: Context) -> Operation:
+    update_filter = UpdateFilter(COMMANDS)
+    updates = ctx.updates
+
+    def run():
+        for raw in updates:
+            update_filter.accepts(raw)
+
+    return run
+
+
+@benchmark("answers.match")
+def answers_match(ctx: Context) -> Operation:
+    variants = [
+        normalized
+        for _, normalized in answer_variants(
+            "Александр Сергеевич Пушкин", ["Пушкин", "А. С. Пушкин"]
+        )
+    ]
+    attempts = ("пушкин", "Пушкен!", "лермонтов", "«А.С. Пушкин»", "1837")
+
+    def run():
+        for attempt in attempts:
+            matches_answer(attempt, variants)
+
+    return run
+
+
+@benchmark("worker.handle_update")
+def worker_handle_update(ctx: Context) -> Operation:
+    # Без базы: в пачке нет /start, поэтому игр нет и обработчики
+    # отвечают сразу. Лимиты подняты, иначе после первых повторов
+    # меряется только отбрасывание FloodGuard
+    app = Application()
+    app.config = Config(
+        admin=AdminConfig(email="", password=""),
+        bot=BotConfig(
+            token="bench",
+            rate_limits=dict.fromkeys(COMMANDS, (10**9, 10**9, 1.0)),
+        ),
+        game=GameConfig(),
+    )
+    worker = Worker(_NullSender(), None, app)
+    updates = [decode_update(raw) for raw in ctx.updates if "message" in raw]
+
+    async def run():
+        for upd in updates:
+            await worker.handle_update(upd)
+
+    return run
+
+
+@benchmark("db.get_random_unasked_question", db=True)
+def db_random_question(ctx: Context) -> Operation:
+    quiz = QuizAccessor(ctx.app)
+    chats = itertools.cycle(ctx.chats)
+    return lambda: quiz.get_random_unasked_question(next(chats))
+
+
+@benchmark("db.draw_question_deck", db=True)
+def db_question_deck(ctx: Context) -> Operation:
+    quiz = QuizAccessor(ctx.app)
+    chats = itertools.cycle(ctx.chats)
+    return lambda: quiz.draw_question_deck(next(chats), 3)
+
+
+@benchmark("db.create_or_update_game", db=True)
+def db_create_or_update_game(ctx: Context) -> Operation:
+    games = GameAccessor(ctx.app)
+    chats = itertools.cycle(ctx.chats)
+    return lambda: games.create_or_update_game(
+        code_of_chat=next(chats), is_working=0
+    )
+
+
+@benchmark("db.load_game_state", db=True)
+def db_load_game_state(ctx: Context) -> Operation:
+    games = GameAccessor(ctx.app)
+    chats = itertools.cycle(ctx.chats)
+    return lambda: games.load_game_state(next(chats))
@@ -1,2 +1,3 @@
 from .api import *
 from .dcs import *
+from .scheduler import *
@@ -1,52 +1,162 @@
+import time
+from collections.abc import Callable, Sequence
+
 import aiohttp
 
-from clients.tg.dcs import GetUpdatesResponse, SendMessageResponse
+from clients.tg.dcs import MessageView, dumps, loads
+
+
+class TgApiError(Exception):
+    def __init__(
+        self,
+        error_code: int,
+        description: str,
+        retry_after: int | None = None,
+    ):
+        super().__init__(f"{error_code}: {description}")
+        self.error_code = error_code
+        self.description = description
+        self.retry_after = retry_after
+
+    @classmethod
+    def from_response(cls, res_dict: dict) -> "TgApiError":
+        parameters = res_dict.get("parameters") or {}
+        return cls(
+            res_dict.get("error_code", 0),
+            res_dict.get("description", ""),
+            parameters.get("retry_after"),
+        )
+
+
+# observer(api_method, seconds, error): error None при ok=true, иначе
+# error_code из ответа или "network"
+RequestObserver = Callable[[str, float, str | None], None]
 
 
 class TgClient:
-    def __init__(self, token: str = ""):
+    def __init__(
+        self,
+        token: str = "",
+        *,
+        api_url: str = "https://api.telegram.org",
+        connection_limit: int = 100,
+        connection_limit_per_host: int = 30,
+        keepalive_timeout: float = 30,
+        dns_cache_ttl: int = 300,
+        observer: RequestObserver | None = None,
+    ):
         self.token = token
+        # Свой адрес нужен локальному Bot API серверу и нагрузочным тестам
+        self.api_url = api_url.rstrip("/")
+        self.observer = observer
+        self.connection_limit = connection_limit
+        self.connection_limit_per_host = connection_limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self._session: aiohttp.ClientSession | None = None
+
+    async def connect(self) -> None:
+        if self._session is not None and not self._session.closed:
+            return
+
+        # Один keep-alive коннектор на весь процесс: TCP+TLS рукопожатие
+        # выполняется один раз, дальше соединения переиспользуются
+        connector = aiohttp.TCPConnector(
+            limit=self.connection_limit,
+            limit_per_host=self.connection_limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=True,
+        )
+        self._session = aiohttp.ClientSession(
+            connector=connector, json_serialize=dumps
+        )
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            raise RuntimeError("TgClient не подключен, вызовите connect()")
+        return self._session
 
     def get_url(self, method: str):
-        return f"https://api.telegram.org/bot{self.token}/{method}"
+        return f"{self.api_url}/bot{self.token}/{method}"
+
+    async def _call(
+        self,
+        http_method: str,
+        api_method: str,
+        *,
+        params: dict | None = None,
+        json: dict | None = None,
+    ) -> dict:
+        started = time.perf_counter()
+        error = "network"
+        try:
+            async with self.session.request(
+                http_method, self.get_url(api_method), params=params, json=json
+            ) as resp:
+                res_dict = await resp.json(loads=loads)
+            error = (
+                None
+                if res_dict.get("ok")
+                else str(res_dict.get("error_code", resp.status))
+            )
+            return res_dict
+        finally:
+            if self.observer is not None:
+                self.observer(api_method, time.perf_counter() - started, error)
 
     async def get_me(self) -> dict:
-        url = self.get_url("getMe")
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as resp:
-                return await resp.json()
+        return await self._call("GET", "getMe")
 
     async def get_updates(
-        self, offset: int | None = None, timeout: int = 0
+        self,
+        offset: int | None = None,
+        timeout: int = 0,
+        allowed_updates: Sequence[str] | None = None,
     ) -> dict:
-        url = self.get_url("getUpdates")
         params = {}
         if offset:
             params["offset"] = offset
         if timeout:
             params["timeout"] = timeout
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, params=params) as resp:
-                return await resp.json()
-
-    async def get_updates_in_objects(
-        self, offset: int | None = None, timeout: int = 0
-    ) -> GetUpdatesResponse:
-        res_dict = await self.get_updates(offset=offset, timeout=timeout)
-        return GetUpdatesResponse.Schema().load(res_dict)
-
-    async def send_message(
-        self, chat_id: int, text: str
-    ) -> SendMessageResponse:
-        url = self.get_url("sendMessage")
+        if allowed_updates is not None:
+            # В query-строке список передаётся JSON-строкой
+            params["allowed_updates"] = dumps(list(allowed_updates))
+        return await self._call("GET", "getUpdates", params=params)
+
+    async def set_webhook(
+        self,
+        url: str,
+        secret_token: str | None = None,
+        allowed_updates: Sequence[str] | None = None,
+    ) -> dict:
+        payload = {"url": url}
+        if secret_token:
+            payload["secret_token"] = secret_token
+        if allowed_updates is not None:
+            payload["allowed_updates"] = list(allowed_updates)
+        return await self._call("POST", "setWebhook", json=payload)
+
+    async def delete_webhook(self) -> dict:
+        return await self._call("POST", "deleteWebhook")
+
+    async def send_message(self, chat_id: int, text: str) -> MessageView:
         payload = {
             "chat_id": chat_id,
             "text": text,
         }
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, json=payload) as resp:
-                res_dict = await resp.json()
-                return SendMessageResponse.Schema().load(res_dict)
+        res_dict = await self._call("POST", "sendMessage", json=payload)
+        if not res_dict.get("ok"):
+            # 429 приходит с parameters.retry_after, его разбирает
+            # MessageScheduler
+            raise TgApiError.from_response(res_dict)
+        return MessageView(res_dict["result"])
 
     async def get_bot_username(self) -> str:
         bot_info = await self.get_me()
@@ -55,15 +165,13 @@ class TgClient:
     async def get_group_members(self, chat_id: int) -> list[str]:
         members = []
         bot_username = await self.get_bot_username()
-        async with aiohttp.ClientSession() as session:
-            url = self.get_url("getChatAdministrators")
-            params = {"chat_id": chat_id}
-            async with session.get(url, params=params) as resp:
-                data = await resp.json()
-                for member in data.get("result", []):
-                    user = member["user"]
-                    username = user.get("username")
-                    if username != bot_username:
-                        members.append(username)
+        data = await self._call(
+            "GET", "getChatAdministrators", params={"chat_id": chat_id}
+        )
+        for member in data.get("result", []):
+            user = member["user"]
+            username = user.get("username")
+            if username != bot_username:
+                members.append(username)
 
         return members
@@ -1,84 +1,157 @@
-from dataclasses import field
-from typing import ClassVar
+import json
+from collections.abc import Callable
+from typing import Any
 
-from marshmallow import EXCLUDE, Schema
-from marshmallow_dataclass import dataclass
+try:
+    import orjson
+except ImportError:  # pragma: no cover - без orjson работает и stdlib json
+    orjson = None
 
+if orjson is not None:
+    loads: Callable[[str | bytes], Any] = orjson.loads
 
-@dataclass
-class MessageFrom:
-    id: int
-    first_name: str
-    last_name: str | None
-    username: str
+    def dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
 
-    class Meta:
-        unknown = EXCLUDE
+else:
+    loads = json.loads
+    dumps = json.dumps
 
 
-@dataclass
-class Chat:
-    id: int
-    type: str
-    first_name: str | None = None
-    last_name: str | None = None
-    username: str | None = None
-    title: str | None = None
+# Апдейт не валидируется схемой целиком: классы ниже только оборачивают
+# dict из JSON. Поля читаются при обращении, вложенные объекты создаются
+# один раз и кэшируются; Worker читает upd.message.chat.id и
+# message.from_.
 
-    class Meta:
-        unknown = EXCLUDE
 
+class DecodeError(ValueError):
+    pass
 
-@dataclass
-class Message:
-    message_id: int
-    from_: MessageFrom = field(metadata={"data_key": "from"})
-    chat: Chat
-    text: str | None = None
 
-    class Meta:
-        unknown = EXCLUDE
+class UserView:
+    __slots__ = ("_raw",)
 
+    def __init__(self, raw: dict):
+        self._raw = raw
 
-@dataclass
-class MyChatMember:
-    chat: Chat
-    from_: MessageFrom = field(metadata={"data_key": "from"})
-    date: int
-    old_chat_member: dict
-    new_chat_member: dict
+    @property
+    def id(self) -> int:
+        return self._raw["id"]
 
-    class Meta:
-        unknown = EXCLUDE
+    @property
+    def first_name(self) -> str | None:
+        return self._raw.get("first_name")
 
+    @property
+    def last_name(self) -> str | None:
+        return self._raw.get("last_name")
 
-@dataclass
-class UpdateObj:
-    update_id: int
-    message: Message | None = None
-    my_chat_member: MyChatMember | None = None
+    @property
+    def username(self) -> str | None:
+        return self._raw.get("username")
 
-    class Meta:
-        unknown = EXCLUDE
 
+class ChatView:
+    __slots__ = ("_raw",)
 
-@dataclass
-class GetUpdatesResponse:
-    ok: bool
-    result: list[UpdateObj]
+    def __init__(self, raw: dict):
+        self._raw = raw
 
-    Schema: ClassVar[type[Schema]] = Schema
+    @property
+    def id(self) -> int:
+        return self._raw["id"]
 
-    class Meta:
-        unknown = EXCLUDE
+    @property
+    def type(self) -> str:
+        return self._raw["type"]
 
+    @property
+    def title(self) -> str | None:
+        return self._raw.get("title")
 
-@dataclass
-class SendMessageResponse:
-    ok: bool
-    result: Message
+    @property
+    def username(self) -> str | None:
+        return self._raw.get("username")
 
-    Schema: ClassVar[type[Schema]] = Schema
 
-    class Meta:
-        unknown = EXCLUDE
+class MessageView:
+    __slots__ = ("_chat", "_from", "_raw")
+
+    def __init__(self, raw: dict):
+        self._raw = raw
+        self._chat: ChatView | None = None
+        self._from: UserView | None = None
+
+    @property
+    def message_id(self) -> int:
+        return self._raw["message_id"]
+
+    @property
+    def raw(self) -> dict:
+        return self._raw
+
+    @property
+    def text(self) -> str | None:
+        return self._raw.get("text")
+
+    @property
+    def chat(self) -> ChatView:
+        if self._chat is None:
+            self._chat = ChatView(self._raw["chat"])
+        return self._chat
+
+    @property
+    def from_(self) -> UserView | None:
+        if self._from is None:
+            raw = self._raw.get("from")
+            if raw is None:
+                return None
+            self._from = UserView(raw)
+        return self._from
+
+
+class UpdateView:
+    __slots__ = ("_message", "_raw")
+
+    def __init__(self, raw: dict):
+        self._raw = raw
+        self._message: MessageView | None = None
+
+    @property
+    def update_id(self) -> int:
+        return self._raw["update_id"]
+
+    @property
+    def raw(self) -> dict:
+        return self._raw
+
+    @property
+    def message(self) -> MessageView | None:
+        if self._message is None:
+            raw = self._raw.get("message")
+            if raw is None:
+                return None
+            self._message = MessageView(raw)
+        return self._message
+
+
+def decode_update(raw: dict) -> UpdateView:
+    """Оборачивает апдейт, проверяя только то, без чего его не обработать."""
+    if not isinstance(raw, dict) or not isinstance(raw.get("update_id"), int):
+        raise DecodeError("update_id обязателен")
+    message = raw.get("message")
+    if message is not None and not (
+        isinstance(message, dict)
+        and isinstance(message.get("chat"), dict)
+        and "id" in message["chat"]
+    ):
+        raise DecodeError("message без chat.id")
+    return UpdateView(raw)
+
+
+def decode_updates(body: str | bytes | dict) -> list[UpdateView]:
+    """Разбирает ответ getUpdates; body может быть уже распарсенным."""
+    data = loads(body) if isinstance(body, str | bytes) else body
+    if not data.get("ok"):
+        raise DecodeError(data.get("description", "getUpdates вернул ok=false"))
+    return [decode_update(raw) for raw in data.get("result", [])]
@@ -0,0 +1,265 @@
+import asyncio
+import enum
+import functools
+import itertools
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+
+import aiohttp
+
+from clients.tg.api import TgApiError, TgClient
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(enum.IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate  # токенов в секунду
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def delay(self) -> float:
+        """Сколько секунд ждать до появления свободного токена."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+    @property
+    def is_full(self) -> bool:
+        self._refill()
+        return self.tokens >= self.capacity
+
+
+@dataclass(order=True)
+class OutgoingMessage:
+    priority: int
+    seq: int
+    chat_id: int = field(compare=False)
+    text: str = field(compare=False)
+
+
+class MessageScheduler:
+    """Очередь исходящих сообщений с учётом лимитов Telegram.
+
+    Глобальный лимит (~30 сообщений в секунду) и лимит на чат
+    (~20 сообщений в минуту) считаются token bucket'ами. У каждого чата
+    своя FIFO-очередь, поэтому сообщения одного чата доставляются
+    по порядку; приоритет решает только, какой чат обслужить следующим.
+    429 обрабатывается по retry_after.
+    """
+
+    def __init__(
+        self,
+        tg_client: TgClient,
+        *,
+        global_rate: float = 30,
+        chat_rate_per_minute: float = 20,
+        chat_burst: int = 3,
+        max_retries: int = 5,
+        backoff_base: float = 0.5,
+        concurrency: int = 10,
+        queue_size: int = 10000,
+        max_tracked_chats: int = 10000,
+    ):
+        self.tg_client = tg_client
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self.chat_rate = chat_rate_per_minute / 60
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.queue_size = queue_size
+        self.max_tracked_chats = max_tracked_chats
+
+        # chat_id -> сообщения чата в порядке отправки
+        self._chats: dict[int, deque[OutgoingMessage]] = {}
+        # (приоритет, seq, chat_id) чатов, которым есть что отправить
+        self._ready: asyncio.PriorityQueue[tuple[int, int, int]] = (
+            asyncio.PriorityQueue()
+        )
+        # Актуальная запись чата в _ready, остальные его записи устарели
+        self._scheduled: dict[int, tuple[int, int]] = {}
+        # Чаты, ждущие токена своего bucket'а
+        self._deferred: set[int] = set()
+        self._size = 0
+        self._space = asyncio.Semaphore(queue_size)
+        self._seq = itertools.count()
+        self._slots = asyncio.Semaphore(concurrency)
+        self._chat_buckets: dict[int, TokenBucket] = {}
+        # Последняя задача доставки в чат: следующая ждёт её завершения
+        self._chat_tail: dict[int, asyncio.Task] = {}
+        self._inflight: set[asyncio.Task] = set()
+        self._task: asyncio.Task | None = None
+
+    async def send_message(
+        self, chat_id: int, text: str, priority: Priority = Priority.NORMAL
+    ) -> None:
+        # Ждём только если очередь переполнена, доставка идёт в фоне
+        await self._space.acquire()
+        msg = OutgoingMessage(priority, next(self._seq), chat_id, text)
+        self._chats.setdefault(chat_id, deque()).append(msg)
+        self._size += 1
+        if chat_id in self._deferred:
+            return
+        current = self._scheduled.get(chat_id)
+        if current is None or priority < current[0]:
+            # Срочное сообщение поднимает чат, но не обгоняет его очередь
+            self._schedule(chat_id, priority, msg.seq)
+
+    @property
+    def pending(self) -> int:
+        """Сообщения в очереди, в том числе отложенные лимитом чата."""
+        return self._size
+
+    def _schedule(self, chat_id: int, priority: int, seq: int) -> None:
+        self._scheduled[chat_id] = (priority, seq)
+        self._ready.put_nowait((priority, seq, chat_id))
+
+    def _reschedule(self, chat_id: int) -> None:
+        messages = self._chats.get(chat_id)
+        if not messages:
+            self._chats.pop(chat_id, None)
+            return
+        priority = min(msg.priority for msg in messages)
+        self._schedule(chat_id, priority, messages[0].seq)
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            if len(self._chat_buckets) >= self.max_tracked_chats:
+                self._forget_idle_chats()
+            bucket = TokenBucket(self.chat_rate, self.chat_burst)
+            self._chat_buckets[chat_id] = bucket
+        return bucket
+
+    def _forget_idle_chats(self) -> None:
+        # Полный bucket ничем не отличается от нового, его можно выбросить
+        for chat_id in [c for c, b in self._chat_buckets.items() if b.is_full]:
+            del self._chat_buckets[chat_id]
+
+    def _defer(self, chat_id: int, delay: float) -> None:
+        self._deferred.add(chat_id)
+
+        def wake():
+            self._deferred.discard(chat_id)
+            self._reschedule(chat_id)
+
+        asyncio.get_running_loop().call_later(delay, wake)
+
+    async def _acquire_global(self) -> None:
+        while (delay := self.global_bucket.delay()) > 0:
+            await asyncio.sleep(delay)
+        self.global_bucket.consume()
+
+    async def _run(self):
+        while True:
+            priority, seq, chat_id = await self._ready.get()
+            if self._scheduled.get(chat_id) != (priority, seq):
+                continue
+            del self._scheduled[chat_id]
+
+            chat_bucket = self._chat_bucket(chat_id)
+            delay = chat_bucket.delay()
+            if delay > 0:
+                self._defer(chat_id, delay)
+                continue
+
+            await self._acquire_global()
+            chat_bucket.consume()
+            await self._slots.acquire()
+
+            msg = self._chats[chat_id].popleft()
+            self._size -= 1
+            self._space.release()
+            self._reschedule(chat_id)
+
+            previous = self._chat_tail.get(chat_id)
+            task = asyncio.create_task(self._deliver(msg, previous))
+            self._chat_tail[chat_id] = task
+            self._inflight.add(task)
+            task.add_done_callback(
+                functools.partial(self._on_delivered, chat_id)
+            )
+
+    def _on_delivered(self, chat_id: int, task: asyncio.Task) -> None:
+        self._inflight.discard(task)
+        self._slots.release()
+        if self._chat_tail.get(chat_id) is task:
+            del self._chat_tail[chat_id]
+
+    async def _deliver(
+        self, msg: OutgoingMessage, previous: asyncio.Task | None
+    ) -> None:
+        if previous is not None:
+            await asyncio.wait([previous])
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.tg_client.send_message(msg.chat_id, msg.text)
+            except TgApiError as e:
+                if e.error_code != 429:
+                    logger.error(
+                        "Сообщение в чат %s не доставлено: %s", msg.chat_id, e
+                    )
+                    return
+                delay = e.retry_after or self.backoff_base * 2**attempt
+                logger.warning(
+                    "429 для чата %s, повтор через %s с", msg.chat_id, delay
+                )
+            except (aiohttp.ClientError, TimeoutError) as e:
+                delay = self.backoff_base * 2**attempt
+                logger.warning(
+                    "Ошибка отправки в чат %s: %s, повтор через %s с",
+                    msg.chat_id,
+                    e,
+                    delay,
+                )
+            else:
+                return
+
+            await asyncio.sleep(delay)
+            await self._acquire_global()
+
+        logger.error(
+            "Сообщение в чат %s отброшено после %s попыток",
+            msg.chat_id,
+            self.max_retries + 1,
+        )
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10):
+        # Дожидаемся отправки того, что уже поставлено в очередь
+        deadline = time.monotonic() + timeout
+        while (self._size or self._inflight) and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        inflight = list(self._inflight)
+        for task in inflight:
+            task.cancel()
+        await asyncio.gather(*inflight, return_exceptions=True)
@@ -0,0 +1,48 @@
+import argparse
+import asyncio
+import logging
+from pathlib import Path
+
+from app.store.bot.accessor import QuizAccessor
+from app.store.bot.importer import FORMATS, MAX_BATCH_SIZE, QuestionImporter
+from app.store.database import Database
+from app.web.app import Application
+from app.web.config import setup_config
+from app.web.logger import setup_logging
+
+
+async def read_lines(path: Path, chunk_size: int = 1 << 16):
+    with path.open(encoding="utf-8-sig", newline="") as file:
+        # Читаем кусками по ~64 КБ, не блокируя event loop
+        while lines := await asyncio.to_thread(file.readlines, chunk_size):
+            for line in lines:
+                yield line
+
+
+async def main(args: argparse.Namespace) -> None:
+    app = Application()
+    setup_logging(app)
+    setup_config(app)
+    app.database = Database(app)
+    await app.database.connect()
+
+    fmt = args.format or ("csv" if args.path.suffix == ".csv" else "jsonl")
+    importer = QuestionImporter(QuizAccessor(app), batch_size=args.batch_size)
+    try:
+        report = await importer.import_lines(read_lines(args.path), fmt)
+    finally:
+        await app.database.disconnect()
+    logging.info("Итог импорта: %s", report.as_dict())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Импорт вопросов из JSONL/CSV файла"
+    )
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=FORMATS)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    if not 1 <= args.batch_size <= MAX_BATCH_SIZE:
+        parser.error(f"--batch-size должен быть от 1 до {MAX_BATCH_SIZE}")
+    asyncio.run(main(args))
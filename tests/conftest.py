@@ -1 +1,50 @@
+import pytest
+from sqlalchemy import URL, text
+from sqlalchemy.ext.asyncio import create_async_engine
 
+from app.store.database.models import BaseModel
+from app.web.app import Application
+from app.web.config import setup_config
+
+# Схема создаётся внутри транзакции и откатывается вместе с ней
+TEST_SCHEMA = "pytest_schema"
+
+
+@pytest.fixture
+async def pg_connection():
+    """Соединение с Postgres из DB_* со свежей схемой по моделям.
+
+    Всё делается в одной транзакции, которая в конце откатывается, так
+    что база не меняется. Без доступного Postgres тест пропускается.
+    """
+    app = Application()
+    setup_config(app)
+    config = app.config.database
+    engine = create_async_engine(
+        URL.create(
+            drivername="postgresql+asyncpg",
+            username=config.user,
+            password=config.password,
+            host=config.host,
+            port=config.port,
+            database=config.database,
+        )
+    )
+    try:
+        connection = await engine.connect()
+    except Exception as e:
+        await engine.dispose()
+        pytest.skip(f"Postgres недоступен: {e}")
+
+    transaction = await connection.begin()
+    try:
+        await connection.execute(text(f"CREATE SCHEMA {TEST_SCHEMA}"))
+        await connection.execute(
+            text(f"SET LOCAL search_path TO {TEST_SCHEMA}")
+        )
+        await connection.run_sync(BaseModel.metadata.create_all)
+        yield connection
+    finally:
+        await transaction.rollback()
+        await connection.close()
+        await engine.dispose()
@@ -0,0 +1,72 @@
+import pytest
+
+from app.store.bot.answers import (
+    allowed_typos,
+    answer_variants,
+    matches_answer,
+    normalize_answer,
+    within_distance,
+)
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("Ёлка", "елка"),
+        ("ЁЖИК", "ежик"),
+        ("«Ёлка», the!", "елка"),
+        ("  Санкт-Петербург \t", "санкт петербург"),
+        ("Война   и\nмир...", "война и мир"),
+        ("The Beatles", "beatles"),
+        ("the", "the"),
+        ("!?", ""),
+    ],
+)
+def test_normalize_answer(text, expected):
+    assert normalize_answer(text) == expected
+
+
+@pytest.mark.parametrize(
+    ("a", "b", "limit", "expected"),
+    [
+        ("кошка", "кошка", 0, True),
+        ("кошка", "кошки", 0, False),
+        ("кошка", "кошки", 1, True),
+        ("кошка", "кашки", 1, False),
+        ("кошка", "кашки", 2, True),
+        ("кот", "котик", 1, False),
+        ("кот", "котик", 2, True),
+        ("котик", "кот", 2, True),
+        ("", "ab", 2, True),
+        ("", "abc", 2, False),
+        ("абвгде", "абвxyz", 2, False),
+        ("абвгде", "абвxyz", 3, True),
+    ],
+)
+def test_within_distance_boundaries(a, b, limit, expected):
+    assert within_distance(a, b, limit) is expected
+
+
+@pytest.mark.parametrize(
+    ("normalized", "typos"),
+    [
+        ("кот", 0),
+        ("1812 год", 0),
+        ("кошка", 1),
+        ("мандарин", 1),
+        ("апельсины", 2),
+    ],
+)
+def test_allowed_typos(normalized, typos):
+    assert allowed_typos(normalized) == typos
+
+
+def test_matches_answer_with_typo_and_alternatives():
+    variants = [
+        normalized for _, normalized in answer_variants("Ёлка", ["ель"])
+    ]
+    assert variants == ["елка", "ель"]
+    assert matches_answer("ЁЛКА!", variants)
+    assert matches_answer("Ель", variants)
+    assert not matches_answer("елочка", variants)
+    assert not matches_answer("...", variants)
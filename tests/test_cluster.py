@@ -0,0 +1,151 @@
+import asyncio
+import socket
+import time
+
+from aiohttp import ClientSession
+
+from app.base.metrics import REGISTRY
+from app.store.bot.cluster import Supervisor, serve_worker_metrics, shard_of
+from app.web.app import Application
+from app.web.config import AdminConfig, BotConfig, Config, GameConfig
+
+WORKER_METRIC = REGISTRY.counter(
+    "test_worker_metric_total", "Счётчик, видимый только в воркере"
+)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def make_app(port: int) -> Application:
+    app = Application()
+    app.config = Config(
+        admin=AdminConfig(email="", password=""),
+        bot=BotConfig(
+            token="t",
+            worker_metrics_host="127.0.0.1",
+            worker_metrics_port=port,
+        ),
+        game=GameConfig(),
+    )
+    return app
+
+
+def test_chat_always_maps_to_one_shard():
+    assert {shard_of(12345, 4) for _ in range(10)} == {1}
+
+
+async def test_worker_serves_metrics_on_offset_port():
+    base = free_port() - 2
+    WORKER_METRIC.inc()
+    runner = await serve_worker_metrics(make_app(base), 2)
+    try:
+        async with ClientSession() as session:
+            url = f"http://127.0.0.1:{base + 2}/metrics"
+            async with session.get(url) as response:
+                assert response.status == 200
+                text = await response.text()
+    finally:
+        await runner.cleanup()
+    assert "test_worker_metric_total" in text
+
+
+async def test_worker_metrics_disabled_by_zero_port():
+    assert await serve_worker_metrics(make_app(0), 0) is None
+
+
+class FakeProcess:
+    """Процесс-воркер, который не выходит сам, пока его не завершат."""
+
+    def __init__(self, *, alive: bool = True, **kwargs):
+        self.alive = alive
+        self.exitcode = None if alive else 1
+        self.pid = 0
+        self.terminated = False
+
+    def start(self) -> None:
+        return None
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+    def join(self, timeout: float | None = None) -> None:
+        return None
+
+    def terminate(self) -> None:
+        self.terminated = True
+        self.alive = False
+
+
+class FakeContext:
+    """Контекст с настоящими очередями, но без запуска воркеров."""
+
+    def __init__(self, ctx):
+        self.ctx = ctx
+        self.started: list[FakeProcess] = []
+
+    def Queue(self, maxsize: int = 0):  # noqa: N802
+        return self.ctx.Queue(maxsize=maxsize)
+
+    def Process(self, **kwargs) -> FakeProcess:  # noqa: N802
+        process = FakeProcess(**kwargs)
+        self.started.append(process)
+        return process
+
+
+def make_supervisor(processes: int, **kwargs) -> Supervisor:
+    supervisor = Supervisor(processes, **kwargs)
+    supervisor._ctx = FakeContext(supervisor._ctx)
+    return supervisor
+
+
+def wait_until_readable(inbox) -> None:
+    # Очередь пишет в канал фоновым потоком
+    deadline = time.monotonic() + 1
+    while inbox.empty() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    time.sleep(0.05)
+
+
+async def test_stop_terminates_worker_with_full_inbox():
+    supervisor = make_supervisor(2, queue_size=1)
+    await supervisor.start()
+    assert supervisor.route(0, {"update_id": 1})
+
+    started = time.monotonic()
+    await supervisor.stop(timeout=0.1)
+    assert time.monotonic() - started < 1
+    assert all(process.terminated for process in supervisor._ctx.started)
+
+
+async def test_stop_cancels_pending_restart():
+    supervisor = make_supervisor(1, restart_delay=0.01)
+    await supervisor.start()
+    supervisor._ctx.started[0].alive = False
+    # Монитор заметил падение и отложил перезапуск
+    while not supervisor._restarts:
+        await asyncio.sleep(0.005)
+
+    await supervisor.stop(timeout=0.1)
+    await asyncio.sleep(0.05)
+    assert len(supervisor._ctx.started) == 1
+
+
+def test_crashed_worker_updates_move_to_new_inbox():
+    supervisor = make_supervisor(1)
+    for update_id in (1, 2):
+        supervisor.route(0, {"update_id": update_id})
+    wait_until_readable(supervisor._inboxes[0])
+
+    supervisor._replace_inbox(0)
+    inbox = supervisor._inboxes[0]
+    wait_until_readable(inbox)
+    assert [inbox.get_nowait(), inbox.get_nowait()] == [
+        {"update_id": 1},
+        {"update_id": 2},
+    ]
+    assert supervisor.requeued_updates == 2
+    assert supervisor.lost_updates == 0
@@ -0,0 +1,143 @@
+import pytest
+
+from app.store.bot.commands import CommandContext, CommandRouter, parse_command
+from clients.tg.dcs import decode_update
+
+
+def update(text: str, entity_length: int | None = None, username="vasya"):
+    message = {
+        "message_id": 1,
+        "from": {"id": 7, "first_name": "Вася", "username": username},
+        "chat": {"id": -100, "type": "group"},
+        "text": text,
+    }
+    if entity_length is not None:
+        message["entities"] = [
+            {"type": "bot_command", "offset": 0, "length": entity_length}
+        ]
+    return decode_update({"update_id": 1, "message": message})
+
+
+@pytest.mark.parametrize(
+    ("text", "entity_length", "expected"),
+    [
+        ("/choose @vasya", None, ("/choose", None, "@vasya")),
+        ("/START", None, ("/start", None, "")),
+        ("/start@This_Bot", 15, ("/start", "This_Bot", "")),
+        ("/answer\tЁлка  ", None, ("/answer", None, "Ёлка")),
+        # Команда по entity, хотя пробела после неё нет
+        ("/answer🎉 да", 7, ("/answer", None, "🎉 да")),
+        # Длина entity в UTF-16: 😀 занимает две единицы, а не одну
+        ("/😀 x", 3, ("/😀", None, "x")),
+    ],
+)
+def test_parse_command(text, entity_length, expected):
+    assert parse_command(update(text, entity_length).message) == expected
+
+
+@pytest.mark.parametrize("text", ["привет", "", "ответ /start"])
+def test_parse_command_ignores_plain_text(text):
+    assert parse_command(update(text).message) is None
+
+
+class Recorder:
+    """Обработчики и middleware, которые пишут порядок вызовов."""
+
+    def __init__(self):
+        self.calls: list[str] = []
+
+    async def handler(self, ctx: CommandContext) -> None:
+        self.calls.append(f"handler {ctx.command} {ctx.args}".strip())
+
+    async def drop(self, ctx: CommandContext, call_next) -> None:
+        # Middleware, которое не зовёт call_next
+        self.calls.append("drop")
+
+    def middleware(self, name: str):
+        async def middleware(ctx, call_next) -> None:
+            self.calls.append(name)
+            await call_next(ctx)
+
+        return middleware
+
+
+@pytest.fixture
+def recorder() -> Recorder:
+    return Recorder()
+
+
+@pytest.fixture
+def router(recorder: Recorder) -> CommandRouter:
+    router = CommandRouter(bot_username="this_bot")
+    router.add("/start", recorder.handler)
+    router.add("answer", recorder.handler, requires_args=True)
+    return router
+
+
+@pytest.mark.parametrize(
+    ("text", "dispatched"),
+    [
+        ("/start", True),
+        ("/start@this_bot", True),
+        ("/start@THIS_BOT", True),
+        ("/start@other_bot", False),
+    ],
+)
+async def test_mentioned_bot(router, recorder, text, dispatched):
+    assert await router.dispatch(update(text)) is dispatched
+    assert recorder.calls == (["handler /start"] if dispatched else [])
+
+
+@pytest.mark.parametrize("text", ["/answer", "/answer   ", "/answer@this_bot"])
+async def test_requires_args(router, recorder, text):
+    assert not await router.dispatch(update(text))
+    assert recorder.calls == []
+
+
+async def test_args_passed_to_handler(router, recorder):
+    assert await router.dispatch(update("/answer  Ёлка "))
+    assert recorder.calls == ["handler /answer Ёлка"]
+
+
+async def test_unknown_command_is_not_dispatched(router, recorder):
+    router.use(recorder.middleware("global"))
+    assert not await router.dispatch(update("/unknown"))
+    assert not await router.dispatch(update("просто текст"))
+    assert recorder.calls == []
+
+
+async def test_sender_without_username_is_ignored(router, recorder):
+    assert not await router.dispatch(update("/start", username=None))
+    assert recorder.calls == []
+
+
+async def test_middleware_order(recorder):
+    router = CommandRouter()
+    router.add(
+        "/stat",
+        recorder.handler,
+        middlewares=[recorder.middleware("route")],
+    )
+    # use() после add() пересобирает цепочки уже добавленных команд
+    router.use(recorder.middleware("first"))
+    router.use(recorder.middleware("second"))
+    assert await router.dispatch(update("/stat"))
+    assert recorder.calls == ["first", "second", "route", "handler /stat"]
+
+
+async def test_middleware_can_drop_command(recorder):
+    router = CommandRouter()
+    router.add("/stat", recorder.handler)
+    router.use(recorder.drop)
+    assert await router.dispatch(update("/stat"))
+    assert recorder.calls == ["drop"]
+
+
+async def test_include_copies_routes(recorder):
+    other = CommandRouter()
+    other.add("/help", recorder.handler)
+    router = CommandRouter()
+    router.use(recorder.middleware("global"))
+    router.include(other)
+    assert await router.dispatch(update("/help"))
+    assert recorder.calls == ["global", "handler /help"]
@@ -0,0 +1,22 @@
+from app.store.database import TimedQueuePool
+
+
+class FakeConnection:
+    def rollback(self) -> None:
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+def test_only_checkouts_beyond_pool_size_count_as_waits():
+    pool = TimedQueuePool(FakeConnection, pool_size=1, max_overflow=1)
+    first = pool.connect()
+    assert (pool.checkouts, pool.waits) == (1, 0)
+
+    # Свободных соединений нет: выдача идёт через overflow
+    second = pool.connect()
+    assert (pool.checkouts, pool.waits) == (2, 1)
+    assert pool.wait_time_max >= 0
+    second.close()
+    first.close()
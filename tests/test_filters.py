@@ -0,0 +1,93 @@
+import pytest
+
+from app.store.bot.filters import UpdateFilter, extract_command
+
+
+def message(text, chat_type="group", **extra) -> dict:
+    return {
+        "update_id": 1,
+        "message": {
+            "message_id": 1,
+            "from": {"id": 7, "username": "vasya"},
+            "chat": {"id": -100, "type": chat_type},
+            "text": text,
+        },
+        **extra,
+    }
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("/start", ("/start", None)),
+        ("/choose@bot @vasya", ("/choose", "bot")),
+        ("/answer\tЁлка", ("/answer", None)),
+    ],
+)
+def test_extract_command(text, expected):
+    assert extract_command(text) == expected
+
+
+@pytest.mark.parametrize(
+    ("raw", "reason"),
+    [
+        (message("/start", chat_type="private"), "not_group"),
+        (message("/start", chat_type="channel"), "not_group"),
+        (message("привет"), "not_command"),
+        (message(None), "not_command"),
+        (message("/unknown"), "unknown_command"),
+        (message("/start@other_bot"), "other_bot"),
+        (
+            {
+                "update_id": 1,
+                "edited_message": message("/start")["message"],
+            },
+            "not_message",
+        ),
+        ({"update_id": 1, "my_chat_member": {}}, "not_message"),
+        ({"update_id": 1, "message": {"text": "/start"}}, "not_message"),
+        ([1], "not_message"),
+    ],
+)
+def test_rejects_with_reason(raw, reason):
+    update_filter = UpdateFilter(bot_username="this_bot")
+    assert not update_filter.accepts(raw)
+    assert update_filter.dropped == {reason: 1}
+    assert update_filter.passed == 0
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["/start", "/START", "/start@this_bot", "/start@This_Bot", "/join now"],
+)
+def test_accepts_group_commands(text):
+    update_filter = UpdateFilter(bot_username="this_bot")
+    assert update_filter.accepts(message(text, chat_type="supergroup"))
+    assert update_filter.passed == 1
+    assert not update_filter.dropped
+
+
+def test_mention_is_not_checked_until_username_is_known():
+    assert UpdateFilter().accepts(message("/start@other_bot"))
+
+
+def test_command_set_is_live():
+    commands = {"/start"}
+    update_filter = UpdateFilter(commands)
+    assert not update_filter.accepts(message("/stat"))
+    commands.add("/stat")
+    assert update_filter.accepts(message("/stat"))
+
+
+def test_stats_accumulate():
+    update_filter = UpdateFilter()
+    for raw in (
+        message("/start"),
+        message("/join"),
+        message("привет"),
+        message("пока"),
+        message("/start", chat_type="private"),
+    ):
+        update_filter.accepts(raw)
+    assert update_filter.passed == 2
+    assert update_filter.dropped == {"not_command": 2, "not_group": 1}
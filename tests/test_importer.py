@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from app.store.bot.importer import MAX_BATCH_SIZE, QuestionImporter
+
+
+class RecordingQuiz:
+    """QuizAccessor, который запоминает пачки вместо записи в базу."""
+
+    def __init__(self):
+        self.batches: list[list[dict]] = []
+
+    async def bulk_create_questions(self, rows: list[dict]) -> int:
+        self.batches.append(rows)
+        return len(rows)
+
+
+class Lines:
+    """Асинхронный источник строк JSONL."""
+
+    def __init__(self, count: int):
+        self._rows = iter(range(count))
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        i = next(self._rows, None)
+        if i is None:
+            raise StopAsyncIteration
+        return json.dumps({"question": f"Вопрос {i}", "answer": "Ответ"})
+
+
+@pytest.mark.parametrize("batch_size", [0, -1, MAX_BATCH_SIZE + 1])
+def test_batch_size_out_of_range(batch_size):
+    with pytest.raises(ValueError, match="batch_size"):
+        QuestionImporter(RecordingQuiz(), batch_size=batch_size)
+
+
+async def test_rows_are_flushed_in_batches():
+    quiz = RecordingQuiz()
+    report = await QuestionImporter(quiz, batch_size=2).import_lines(Lines(5))
+    assert [len(batch) for batch in quiz.batches] == [2, 2, 1]
+    assert report.inserted == 5
@@ -0,0 +1,69 @@
+import asyncio
+
+import aiohttp
+
+from app.store.bot.poller import Poller
+
+
+class ScriptedClient:
+    """Отдаёт ответы getUpdates по списку, затем висит как long polling."""
+
+    def __init__(self, replies, repeat_last=False):
+        self.replies = list(replies)
+        self.repeat_last = repeat_last
+        self.offsets: list[int] = []
+
+    async def get_updates(self, offset=None, **kwargs):
+        self.offsets.append(offset)
+        if not self.replies:
+            await asyncio.Event().wait()
+        if self.repeat_last and len(self.replies) == 1:
+            reply = self.replies[0]
+        else:
+            reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+
+class Collector:
+    def __init__(self):
+        self.received: list[dict] = []
+
+    async def __call__(self, raw: dict) -> None:
+        self.received.append(raw)
+
+
+async def run_poller(client, seconds=0.2) -> list[dict]:
+    collector = Collector()
+    poller = Poller(client, collector, backoff_base=0.01, backoff_max=0.05)
+    await poller.start()
+    await asyncio.sleep(seconds)
+    await poller.stop()
+    return collector.received
+
+
+async def test_error_reply_backs_off_instead_of_spinning():
+    conflict = {"ok": False, "error_code": 409, "description": "Conflict"}
+    client = ScriptedClient([conflict], repeat_last=True)
+
+    await run_poller(client, seconds=0.1)
+
+    # Паузы 0.01, 0.02, 0.04, 0.05...: без них были бы тысячи запросов
+    assert 2 <= len(client.offsets) <= 5
+
+
+async def test_poller_survives_network_errors():
+    update = {"update_id": 7, "message": {"text": "/start"}}
+    client = ScriptedClient(
+        [
+            aiohttp.ClientConnectionError("reset"),
+            TimeoutError(),
+            {"ok": True, "result": [update]},
+        ]
+    )
+
+    received = await run_poller(client)
+
+    assert received == [update]
+    assert client.offsets[-1] == 8
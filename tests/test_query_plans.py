@@ -0,0 +1,101 @@
+"""Поиск по чату в asked_questions и users идёт по индексам.
+
+Запросы те же, что строят аксессоры. Seq scan запрещён через
+enable_seqscan = off: на маленькой тестовой таблице планировщик иначе
+честно выбрал бы его, а проверяем мы, что подходящий индекс есть.
+"""
+
+import json
+
+import pytest
+from sqlalchemy import delete, insert, select, text
+from sqlalchemy.dialects import postgresql
+
+from app.store.database.models import AskedQuestions, Game, Questions, Users
+
+CHAT_ID = -100
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+async def explain(connection, statement) -> list[dict]:
+    sql = statement.compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    result = await connection.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+    document = result.scalar_one()
+    if isinstance(document, str):
+        document = json.loads(document)
+    return list(plan_nodes(document[0]["Plan"]))
+
+
+@pytest.fixture
+async def populated(pg_connection):
+    await pg_connection.execute(
+        insert(Questions).values(
+            [{"question": f"q{i}", "answer": f"a{i}"} for i in range(200)]
+        )
+    )
+    chats = [CHAT_ID - i for i in range(50)]
+    await pg_connection.execute(
+        insert(Game).values([{"code_of_chat": chat} for chat in chats])
+    )
+    question_ids = (
+        (await pg_connection.execute(select(Questions.id))).scalars().all()
+    )
+    await pg_connection.execute(
+        insert(AskedQuestions).values(
+            [
+                {"chat_id": chat, "question": question_id}
+                for chat in chats
+                for question_id in question_ids[:20]
+            ]
+        )
+    )
+    await pg_connection.execute(
+        insert(Users).values(
+            [
+                {"chat_id": chat, "int_user_id": user, "user_id": f"p{user}"}
+                for chat in chats
+                for user in range(5)
+            ]
+        )
+    )
+    await pg_connection.execute(text("ANALYZE"))
+    await pg_connection.execute(text("SET LOCAL enable_seqscan = off"))
+    return pg_connection
+
+
+@pytest.mark.parametrize(
+    ("statement", "table", "index"),
+    [
+        (
+            select(AskedQuestions.question).where(
+                AskedQuestions.chat_id == CHAT_ID
+            ),
+            "asked_questions",
+            "uq_asked_questions_chat_id_question",
+        ),
+        (
+            delete(AskedQuestions).where(AskedQuestions.chat_id == CHAT_ID),
+            "asked_questions",
+            "uq_asked_questions_chat_id_question",
+        ),
+        (
+            select(Users.user_id).where(Users.chat_id == CHAT_ID),
+            "users",
+            "uq_users_chat_id_int_user_id",
+        ),
+    ],
+)
+async def test_chat_lookup_uses_index(populated, statement, table, index):
+    nodes = await explain(populated, statement)
+
+    scans = [node for node in nodes if node.get("Relation Name") == table]
+    assert scans
+    assert all(node["Node Type"] != "Seq Scan" for node in scans)
+    assert index in {node.get("Index Name") for node in nodes}
@@ -0,0 +1,137 @@
+"""Выборка колоды без ORDER BY random() на настоящем Postgres."""
+
+import random
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.store.bot.accessor import QuizAccessor
+from app.store.database.models import AskedQuestions, Game, Questions
+from app.web.app import Application
+from app.web.config import (
+    AdminConfig,
+    BotConfig,
+    Config,
+    DatabaseConfig,
+    GameConfig,
+)
+
+CHAT_ID = -100
+OTHER_CHAT_ID = -200
+
+
+class ConnectionDatabase:
+    """Database поверх тестового соединения.
+
+    commit аксессора закрывает savepoint, а не внешнюю транзакцию.
+    """
+
+    def __init__(self, connection):
+        self.session = async_sessionmaker(
+            bind=connection,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        )
+
+
+@pytest.fixture
+async def quiz(pg_connection):
+    app = Application()
+    app.config = Config(
+        admin=AdminConfig(email="", password=""),
+        bot=BotConfig(token="t"),
+        database=DatabaseConfig(),
+        game=GameConfig(),
+    )
+    app.database = ConnectionDatabase(pg_connection)
+    await pg_connection.execute(
+        insert(Game).values(
+            [{"code_of_chat": CHAT_ID}, {"code_of_chat": OTHER_CHAT_ID}]
+        )
+    )
+    return QuizAccessor(app)
+
+
+async def add_questions(quiz: QuizAccessor, ids) -> list[int]:
+    async with quiz.app.database.session() as session:
+        await session.execute(
+            insert(Questions).values(
+                [
+                    {"id": i, "question": f"Вопрос {i}", "answer": f"{i}"}
+                    for i in ids
+                ]
+            )
+        )
+        await session.commit()
+    return list(ids)
+
+
+async def mark_asked(quiz: QuizAccessor, chat_id: int, ids) -> None:
+    async with quiz.app.database.session() as session:
+        await session.execute(
+            insert(AskedQuestions).values(
+                [{"chat_id": chat_id, "question": i} for i in ids]
+            )
+        )
+        await session.commit()
+
+
+async def test_empty_bank(quiz):
+    assert await quiz.draw_question_deck(CHAT_ID, 3) == []
+
+
+async def test_sparse_ids(quiz):
+    # Почти все случайные id из [min, max] попадают в дыры
+    bank = await add_questions(quiz, [1, 7, 1_000, 50_000, 99_999])
+    random.seed(1)
+    deck = await quiz.draw_question_deck(CHAT_ID, 3)
+    ids = [question.id for question in deck]
+    assert len(ids) == 3
+    assert len(set(ids)) == 3
+    assert set(ids) <= set(bank)
+    assert all(question.variants for question in deck)
+
+
+async def test_mostly_asked_bank_falls_back_to_unasked(quiz):
+    bank = await add_questions(quiz, range(1, 101))
+    await mark_asked(quiz, CHAT_ID, bank[3:])
+    # Отметки другого чата на выборку не влияют
+    await mark_asked(quiz, OTHER_CHAT_ID, bank[:3])
+    random.seed(2)
+    deck = await quiz.draw_question_deck(CHAT_ID, 5)
+    assert sorted(question.id for question in deck) == bank[:3]
+
+
+async def test_fallback_alone_skips_asked_and_excluded(quiz):
+    bank = await add_questions(quiz, range(1, 11))
+    await mark_asked(quiz, CHAT_ID, bank[:4])
+    # attempts=0: сразу ORDER BY random()
+    deck = await quiz.draw_question_deck(
+        CHAT_ID, 10, attempts=0, exclude=[bank[4]]
+    )
+    assert sorted(question.id for question in deck) == bank[5:]
+
+
+async def test_pending_asked_rows_are_excluded(quiz):
+    bank = await add_questions(quiz, range(1, 6))
+    await quiz.asked.start()
+    try:
+        # Отметка ещё в буфере отложенной вставки, а не в базе
+        await quiz.mark_question_as_asked(CHAT_ID, bank[0])
+        deck = await quiz.draw_question_deck(CHAT_ID, 5)
+    finally:
+        await quiz.asked.stop()
+    assert sorted(question.id for question in deck) == bank[1:]
+
+
+@pytest.mark.parametrize("seed", range(10))
+async def test_no_duplicates_in_deck(quiz, seed):
+    await add_questions(quiz, range(1, 61))
+    await mark_asked(quiz, CHAT_ID, range(1, 61, 3))
+    random.seed(seed)
+    deck = await quiz.draw_question_deck(CHAT_ID, 30)
+    ids = [question.id for question in deck]
+    assert len(ids) == 30
+    assert len(set(ids)) == 30
+    assert not {i for i in ids if i % 3 == 1}
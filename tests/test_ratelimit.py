@@ -0,0 +1,92 @@
+from app.store.bot.commands import CommandContext
+from app.store.bot.ratelimit import (
+    CommandLimit,
+    FloodGuard,
+    SlidingWindowLimiter,
+)
+
+
+class Handler:
+    """Обработчик команды, который считает вызовы."""
+
+    def __init__(self):
+        self.calls: list[tuple[int, int]] = []
+
+    async def __call__(self, ctx: CommandContext) -> None:
+        self.calls.append((ctx.chat_id, ctx.user_id))
+
+
+def join(chat_id: int, user_id: int) -> CommandContext:
+    return CommandContext(
+        update=None,
+        command="/join",
+        args="",
+        chat_id=chat_id,
+        user_id=user_id,
+        username=f"user{user_id}",
+    )
+
+
+def test_window_boundary():
+    limiter = SlidingWindowLimiter()
+    assert all(limiter.allow("k", 3, 10, now=t) for t in (0, 1, 2))
+    assert not limiter.allow("k", 3, 10, now=9.99)
+    # Отметка из t=0 выходит из окна ровно через window
+    assert limiter.allow("k", 3, 10, now=10)
+    assert not limiter.allow("k", 3, 10, now=10.5)
+    assert limiter.allow("k", 3, 10, now=11)
+
+
+def test_rejected_events_do_not_extend_block():
+    limiter = SlidingWindowLimiter()
+    assert limiter.allow("k", 1, 10, now=0)
+    for t in range(1, 10):
+        assert not limiter.allow("k", 1, 10, now=t)
+    assert limiter.allow("k", 1, 10, now=10)
+
+
+def test_reset_after_window():
+    limiter = SlidingWindowLimiter()
+    for t in (0, 1):
+        limiter.allow("k", 2, 10, now=t)
+    assert not limiter.allow("k", 2, 10, now=5)
+    assert limiter.allow("other", 2, 10, now=30)
+    # Истёкший ключ вычищен и начинает окно заново
+    assert "k" not in limiter._keys
+    assert limiter.allow("k", 2, 10, now=30)
+    assert limiter.allow("k", 2, 10, now=30)
+    assert not limiter.allow("k", 2, 10, now=30)
+
+
+def test_keys_are_independent_and_bounded():
+    limiter = SlidingWindowLimiter(max_keys=2)
+    assert limiter.allow("a", 1, 10, now=0)
+    assert limiter.allow("b", 1, 10, now=0)
+    assert not limiter.allow("a", 1, 10, now=1)
+    # Третий ключ вытесняет самый давний по обращению
+    assert limiter.allow("c", 1, 10, now=2)
+    assert len(limiter) == 2
+    assert not limiter.allow("a", 1, 10, now=3)
+    assert limiter.allow("b", 1, 10, now=3)
+
+
+def test_allow_all_records_nothing_when_one_window_is_full():
+    limiter = SlidingWindowLimiter()
+    assert limiter.allow("chat", 1, 10, now=0)
+    assert not limiter.allow_all([("user", 1, 10), ("chat", 1, 10)], now=1)
+    assert limiter.allow("user", 1, 10, now=2)
+
+
+async def test_chat_limited_command_keeps_user_quota():
+    guard = FloodGuard(
+        sender=None, limits={"/join": CommandLimit(user=2, chat=1, window=60)}
+    )
+    handler = Handler()
+    await guard(join(-100, 1), handler)
+    # Чат исчерпал лимит: отказы не списываются с лимита пользователя 2
+    for _ in range(3):
+        await guard(join(-100, 2), handler)
+    await guard(join(-200, 2), handler)
+    await guard(join(-300, 2), handler)
+    assert handler.calls == [(-100, 1), (-200, 2), (-300, 2)]
+    assert guard.dropped["/join"] == 3
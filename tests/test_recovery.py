@@ -0,0 +1,234 @@
+import asyncio
+import time
+from datetime import UTC, datetime, timedelta
+
+from app.store.bot.dataclasses import GamePhase, GameState, Question
+from app.store.bot.messages import GAME_ABORTED_TEXT, GAME_RESUMED_TEXT
+from app.store.bot.registration import GameRegistration
+from app.store.bot.worker import Worker
+from app.web.app import Application
+from app.web.config import AdminConfig, BotConfig, Config, GameConfig
+
+
+class RecordingSender:
+    def __init__(self):
+        self.sent: list[tuple[int, str]] = []
+
+    async def send_message(self, chat_id: int, text: str, *args) -> None:
+        self.sent.append((chat_id, text))
+
+
+class FakeQuiz:
+    """QuizAccessor без базы: колода из заранее заданных вопросов."""
+
+    def __init__(self):
+        self.asked: list[tuple[int, int]] = []
+        self.excluded: list[int] = []
+
+    async def mark_question_as_asked(
+        self, chat_id: int, question_id: int
+    ) -> None:
+        self.asked.append((chat_id, question_id))
+
+    async def draw_question_deck(
+        self, chat_id: int, size: int, attempts: int = 5, exclude=()
+    ) -> list[Question]:
+        self.excluded = list(exclude)
+        return [
+            Question(text=f"Вопрос {i}", answer="Ответ", id=i)
+            for i in range(100, 100 + size)
+        ]
+
+
+class FakeGames:
+    """GameAccessor без базы: сохранённые состояния игр по чатам."""
+
+    def __init__(self, states: dict[int, GameState | None]):
+        self.states = states
+        self.updates: list[dict] = []
+        # (фаза, дедлайн) каждого сохранения состояния
+        self.saved: list[tuple[GamePhase, datetime | None]] = []
+
+    async def list_working_chats(self) -> list[int]:
+        return list(self.states)
+
+    async def load_game_state(self, chat_id: int) -> GameState | None:
+        return self.states[chat_id]
+
+    async def create_or_update_game(self, **values) -> None:
+        self.updates.append(values)
+
+    async def save_game_state(self, state: GameState, **kwargs) -> "GameRow":
+        self.saved.append((state.phase, state.phase_deadline))
+        return GameRow(points_awarded=state.points)
+
+
+class GameRow:
+    def __init__(self, points_awarded: int):
+        self.points_awarded = points_awarded
+
+
+class FakeStore:
+    def __init__(self, states: dict[int, GameState | None]):
+        self.quiz = FakeQuiz()
+        self.creategame = FakeGames(states)
+
+
+QUESTION = Question(text="Вопрос", answer="Ответ", id=7)
+
+
+def make_worker(states: dict[int, GameState | None]) -> Worker:
+    app = Application()
+    app.config = Config(
+        admin=AdminConfig(email="", password=""),
+        bot=BotConfig(token="t"),
+        game=GameConfig(rounds=3),
+    )
+    app.store = FakeStore(states)
+    return Worker(RecordingSender(), asyncio.Queue(), app)
+
+
+def game_state(phase: GamePhase, deadline_in: float, **kwargs) -> GameState:
+    return GameState(
+        chat_id=-100,
+        phase=phase,
+        phase_deadline=datetime.now(UTC) + timedelta(seconds=deadline_in),
+        captain="captain",
+        players=["captain", "player"],
+        **kwargs,
+    )
+
+
+async def test_resume_excludes_current_question_from_new_deck():
+    question = Question(text="Вопрос", answer="Ответ", id=7)
+    state = game_state(
+        GamePhase.DISCUSSION, 30, round_number=1, question=question
+    )
+    worker = make_worker({-100: state})
+    await worker.recover_games()
+
+    quiz = worker.app.store.quiz
+    # Отметка могла остаться в буфере отложенной вставки
+    assert quiz.asked == [(-100, 7)]
+    assert quiz.excluded == [7]
+    assert [q.id for q in worker.games[-100].state.deck] == [100, 101]
+
+
+def remaining(worker: Worker, chat_id: int) -> list[float]:
+    now = time.monotonic()
+    return sorted(
+        round(handle.when - now) for handle in worker.games[chat_id]._timers
+    )
+
+
+def assert_aborted(worker: Worker) -> None:
+    assert -100 not in worker.games
+    assert worker.app.store.creategame.updates == [
+        {
+            "code_of_chat": -100,
+            "is_working": 0,
+            "phase": GamePhase.FINISHED,
+            "phase_deadline": None,
+        }
+    ]
+    assert worker.sender.sent == [(-100, GAME_ABORTED_TEXT)]
+
+
+async def test_resume_choosing_keeps_remaining_deadline():
+    state = game_state(
+        GamePhase.CHOOSING, 20, round_number=2, question=QUESTION
+    )
+    worker = make_worker({-100: state})
+    await worker.recover_games()
+
+    game = worker.games[-100]
+    assert game.can_choose
+    assert remaining(worker, -100) == [20]
+    assert len(game.state.deck) == 1
+    assert worker.sender.sent == [(-100, GAME_RESUMED_TEXT)]
+
+
+async def test_resume_answering_keeps_respondent_and_deadline():
+    state = game_state(
+        GamePhase.ANSWERING,
+        15,
+        round_number=1,
+        question=QUESTION,
+        respondent="player",
+    )
+    worker = make_worker({-100: state})
+    await worker.recover_games()
+
+    game = worker.games[-100]
+    assert game.can_answer
+    assert game.state.respondent == "player"
+    assert remaining(worker, -100) == [15]
+
+
+async def test_resume_discussion_rearms_warning_and_choosing():
+    state = game_state(
+        GamePhase.DISCUSSION, 30, round_number=1, question=QUESTION
+    )
+    worker = make_worker({-100: state})
+    await worker.recover_games()
+    # Предупреждение за warning_before (10 с) до конца обсуждения
+    assert remaining(worker, -100) == [20, 30]
+
+
+async def test_resume_registration_schedules_timeout():
+    state = game_state(GamePhase.REGISTRATION, 120)
+    worker = make_worker({-100: state})
+    await worker.recover_games()
+
+    assert isinstance(worker.games[-100], GameRegistration)
+    handles = list(worker.timers._by_key[-100])
+    assert [round(h.when - time.monotonic()) for h in handles] == [120]
+
+
+async def test_recently_expired_deadline_fires_immediately():
+    state = game_state(
+        GamePhase.CHOOSING, -10, round_number=1, question=QUESTION
+    )
+    worker = make_worker({-100: state})
+    await worker.recover_games()
+    assert remaining(worker, -100) == [0]
+
+
+async def test_game_long_past_its_deadline_is_aborted():
+    # resume_grace по умолчанию 300 с
+    state = game_state(
+        GamePhase.CHOOSING, -600, round_number=1, question=QUESTION
+    )
+    worker = make_worker({-100: state})
+    await worker.recover_games()
+    assert_aborted(worker)
+
+
+async def test_game_without_question_is_aborted():
+    state = game_state(GamePhase.ANSWERING, 30, round_number=1)
+    worker = make_worker({-100: state})
+    await worker.recover_games()
+    assert_aborted(worker)
+
+
+async def test_game_without_phase_is_aborted():
+    worker = make_worker({-100: GameState(chat_id=-100, phase=None)})
+    await worker.recover_games()
+    assert_aborted(worker)
+
+
+async def test_phase_change_persists_new_deadline():
+    state = game_state(
+        GamePhase.CHOOSING, 20, round_number=1, question=QUESTION
+    )
+    worker = make_worker({-100: state})
+    await worker.recover_games()
+
+    game = worker.games[-100]
+    await game._choose_timeout(1)
+    phase, deadline = worker.app.store.creategame.saved[-1]
+    assert phase == GamePhase.STARTING
+    # round_pause по умолчанию 2 с
+    left = (deadline - datetime.now(UTC)).total_seconds()
+    assert 1 < left <= 2
+    assert remaining(worker, -100) == [2]
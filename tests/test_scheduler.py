@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from clients.tg import scheduler as scheduler_module
+from clients.tg.scheduler import MessageScheduler, Priority, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingClient:
+    def __init__(self):
+        self.sent: list[tuple[int, str]] = []
+
+    async def send_message(self, chat_id: int, text: str) -> None:
+        self.sent.append((chat_id, text))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(scheduler_module.time, "monotonic", fake)
+    return fake
+
+
+def test_bucket_allows_burst_then_waits(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        assert bucket.delay() == 0
+        bucket.consume()
+
+    assert bucket.delay() == pytest.approx(0.5)
+
+
+def test_bucket_refills_with_time_up_to_capacity(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        bucket.consume()
+
+    clock.now += 0.5
+    assert bucket.delay() == 0
+    bucket.consume()
+    assert bucket.delay() == pytest.approx(0.5)
+
+    clock.now += 100
+    assert bucket.is_full
+    assert bucket.tokens == 3
+
+
+async def test_chat_order_survives_rate_limit_and_priority():
+    client = RecordingClient()
+    sender = MessageScheduler(
+        client, global_rate=1000, chat_rate_per_minute=600, chat_burst=2
+    )
+    for text in ("reg_start", "join1", "join2", "join3", "finish"):
+        await sender.send_message(1, text)
+    await sender.send_message(1, "round1", Priority.HIGH)
+
+    await sender.start()
+    await sender.stop()
+
+    assert [text for _, text in client.sent] == [
+        "reg_start",
+        "join1",
+        "join2",
+        "join3",
+        "finish",
+        "round1",
+    ]
+
+
+async def test_priority_picks_next_chat():
+    client = RecordingClient()
+    sender = MessageScheduler(client, global_rate=1000)
+    await sender.send_message(1, "normal")
+    await sender.send_message(2, "low", Priority.LOW)
+    await sender.send_message(3, "high", Priority.HIGH)
+
+    await sender.start()
+    await sender.stop()
+
+    assert client.sent == [(3, "high"), (1, "normal"), (2, "low")]
+
+
+async def test_pending_counts_deferred_messages():
+    client = RecordingClient()
+    sender = MessageScheduler(
+        client, global_rate=1000, chat_rate_per_minute=60, chat_burst=1
+    )
+    await sender.start()
+    await sender.send_message(1, "first")
+    await sender.send_message(1, "second")
+    await asyncio.sleep(0.05)
+
+    # Второе ждёт токена чата целую секунду
+    assert client.sent == [(1, "first")]
+    assert sender.pending == 1
+    await sender.stop(timeout=0)
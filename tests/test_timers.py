@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+from app.store.bot.timers import DeadlineScheduler
+
+
+class Recorder:
+    """Колбэки таймеров, которые записывают порядок срабатывания."""
+
+    def __init__(self):
+        self.fired: list[str] = []
+        self.done = asyncio.Event()
+
+    def callback(self, name: str, last: bool = False):
+        def fire():
+            self.fired.append(name)
+            if last:
+                self.done.set()
+
+        return fire
+
+
+async def run(timers: DeadlineScheduler, recorder: Recorder) -> None:
+    await timers.start()
+    try:
+        await asyncio.wait_for(recorder.done.wait(), 1)
+    finally:
+        await timers.stop()
+
+
+async def test_cancelled_timers_do_not_fire():
+    timers = DeadlineScheduler()
+    recorder = Recorder()
+    dropped = timers.call_later(0.01, recorder.callback("dropped"))
+    timers.call_later(0.01, recorder.callback("chat"), key=1)
+    timers.call_later(0.02, recorder.callback("chat"), key=1)
+    timers.call_later(0.03, recorder.callback("kept", last=True), key=2)
+    timers.cancel(dropped)
+    timers.cancel_key(1)
+    assert len(timers) == 1
+
+    await run(timers, recorder)
+    assert recorder.fired == ["kept"]
+
+
+async def test_rescheduled_timer_fires_at_new_deadline():
+    timers = DeadlineScheduler()
+    recorder = Recorder()
+    now = time.monotonic()
+    moved = timers.call_at(now + 0.01, recorder.callback("moved"))
+    timers.call_at(now + 0.02, recorder.callback("second"))
+    timers.call_at(now + 0.02, recorder.callback("third"))
+    timers.cancel(moved)
+    timers.call_at(now + 0.03, recorder.callback("moved", last=True))
+
+    await run(timers, recorder)
+    # Равные дедлайны срабатывают в порядке постановки
+    assert recorder.fired == ["second", "third", "moved"]
+
+
+async def test_earlier_deadline_wakes_sleeping_loop():
+    timers = DeadlineScheduler()
+    recorder = Recorder()
+    timers.call_later(60, recorder.callback("later"))
+    await timers.start()
+    try:
+        await asyncio.sleep(0)
+        timers.call_later(0.01, recorder.callback("sooner", last=True))
+        await asyncio.wait_for(recorder.done.wait(), 1)
+    finally:
+        await timers.stop()
+    assert recorder.fired == ["sooner"]
@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from app.store import Store
+from app.store.bot.base import Bot
+from app.web.app import Application
+from app.web.config import AdminConfig, BotConfig, Config, GameConfig
+from app.web.routes import setup_routes
+from clients.tg.api import TgApiError
+
+SECRET = "s3cret"
+
+
+def make_app(**bot) -> Application:
+    app = Application()
+    app.config = Config(
+        admin=AdminConfig(email="", password=""),
+        bot=BotConfig(token="t", mode="webhook", **bot),
+        game=GameConfig(),
+    )
+    return app
+
+
+@pytest.mark.parametrize(
+    "bot",
+    [
+        {"webhook_url": "https://example.org/webhook"},
+        {"webhook_secret": "s3cret"},
+        {},
+    ],
+)
+def test_webhook_mode_requires_url_and_secret(bot):
+    with pytest.raises(ValueError, match="BOT_WEBHOOK"):
+        Bot("t", make_app(**bot))
+
+
+class RejectingTelegram:
+    """Bot API, который отвергает setWebhook."""
+
+    async def connect(self) -> None:
+        return None
+
+    async def get_bot_username(self) -> str:
+        return "bot"
+
+    async def set_webhook(self, *args, **kwargs) -> dict:
+        return {"ok": False, "error_code": 400, "description": "bad url"}
+
+
+async def test_start_fails_when_set_webhook_is_rejected(monkeypatch):
+    bot = Bot(
+        "t",
+        make_app(
+            webhook_url="https://example.org/webhook", webhook_secret="s3cret"
+        ),
+    )
+    telegram = RejectingTelegram()
+    bot.tg_client = telegram
+    monkeypatch.setattr(bot.worker, "start", telegram.connect)
+    monkeypatch.setattr(bot.sender, "start", telegram.connect)
+
+    with pytest.raises(TgApiError, match="bad url"):
+        await bot.start()
+
+
+@pytest.fixture
+async def webhook(aiohttp_client):
+    app = make_app(
+        webhook_url="https://example.org/webhook", webhook_secret=SECRET
+    )
+    setup_routes(app)
+    app.store = Store(app)
+    client = await aiohttp_client(app)
+    return client, app.store.bots_manager
+
+
+def group_command(text: str) -> dict:
+    return {
+        "update_id": 1,
+        "message": {
+            "message_id": 1,
+            "from": {"id": 7, "first_name": "Вася"},
+            "chat": {"id": -100, "type": "group"},
+            "text": text,
+        },
+    }
+
+
+async def post(client, body: str, secret: str = SECRET):
+    return await client.post(
+        "/webhook",
+        data=body,
+        headers={
+            "Content-Type": "application/json",
+            "X-Telegram-Bot-Api-Secret-Token": secret,
+        },
+    )
+
+
+@pytest.mark.parametrize("body", ["[1]", '"x"', "null", "{not json"])
+async def test_webhook_rejects_body_that_is_not_an_update(webhook, body):
+    client, bot = webhook
+    response = await post(client, body)
+    assert response.status == 400
+    assert bot.queue.empty()
+
+
+async def test_webhook_queues_command_and_drops_other_updates(webhook):
+    client, bot = webhook
+    response = await post(client, json.dumps(group_command("/start")))
+    assert response.status == 200
+    response = await post(client, json.dumps(group_command("привет")))
+    assert response.status == 200
+    assert bot.queue.qsize() == 1
+
+
+async def test_webhook_checks_secret(webhook):
+    client, bot = webhook
+    response = await post(client, json.dumps(group_command("/start")), "bad")
+    assert response.status == 401
+    assert bot.queue.empty()
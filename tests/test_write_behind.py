@@ -0,0 +1,159 @@
+import asyncio
+
+import pytest
+
+from app.store.database.models import AskedQuestions
+from app.store.database.write_behind import WriteBehindBuffer
+
+
+class FakeSession:
+    def __init__(self, database: "FakeDatabase"):
+        self.database = database
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return None
+
+    async def execute(self, query):
+        if self.database.fail:
+            raise OSError("база недоступна")
+        params = query.compile().params
+        rows = [
+            (params[f"chat_id_m{i}"], params[f"question_m{i}"])
+            for i in range(len(params) // 2)
+        ]
+        self.database.batches.append(rows)
+
+    async def commit(self):
+        return None
+
+
+class FakeDatabase:
+    """Database, который запоминает многострочные INSERT."""
+
+    def __init__(self):
+        self.fail = False
+        self.batches: list[list[tuple[int, int]]] = []
+
+    def session(self) -> FakeSession:
+        return FakeSession(self)
+
+    @property
+    def rows(self) -> list[tuple[int, int]]:
+        return [row for batch in self.batches for row in batch]
+
+
+def make_buffer(database: FakeDatabase, **kwargs) -> WriteBehindBuffer:
+    return WriteBehindBuffer(
+        database, AskedQuestions.__table__, ("chat_id", "question"), **kwargs
+    )
+
+
+async def wait_for_rows(database: FakeDatabase, count: int) -> None:
+    async with asyncio.timeout(1):
+        while len(database.rows) < count:
+            await asyncio.sleep(0.005)
+
+
+async def test_not_started_buffer_writes_immediately():
+    database = FakeDatabase()
+    buffer = make_buffer(database)
+    await buffer.add({"chat_id": 1, "question": 1})
+    assert database.batches == [[(1, 1)]]
+
+
+async def test_flush_on_size():
+    database = FakeDatabase()
+    buffer = make_buffer(database, max_rows=3, max_delay=60)
+    await buffer.start()
+    try:
+        for question in range(3):
+            await buffer.add({"chat_id": 1, "question": question})
+        # Пачка набралась: сброс не ждёт max_delay
+        await wait_for_rows(database, 3)
+    finally:
+        await buffer.stop()
+    assert database.batches == [[(1, 0), (1, 1), (1, 2)]]
+
+
+async def test_flush_on_interval():
+    database = FakeDatabase()
+    buffer = make_buffer(database, max_rows=100, max_delay=0.02)
+    await buffer.start()
+    try:
+        await buffer.add({"chat_id": 1, "question": 1})
+        await buffer.add({"chat_id": 2, "question": 1})
+        # Повтор ещё не записанной строки не дублируется
+        await buffer.add({"chat_id": 1, "question": 1})
+        assert buffer.pending(1) == [{"chat_id": 1, "question": 1}]
+        await wait_for_rows(database, 2)
+    finally:
+        await buffer.stop()
+    assert database.batches == [[(1, 1), (2, 1)]]
+    assert len(buffer) == 0
+
+
+async def test_stop_drains_buffer():
+    database = FakeDatabase()
+    buffer = make_buffer(database, max_rows=100, max_delay=60)
+    await buffer.start()
+    await buffer.add({"chat_id": 1, "question": 1})
+    await buffer.add({"chat_id": 1, "question": 2})
+    assert database.rows == []
+
+    await buffer.stop()
+    assert not buffer.running
+    assert database.rows == [(1, 1), (1, 2)]
+
+
+async def test_failed_flush_requeues_rows():
+    database = FakeDatabase()
+    buffer = make_buffer(database, max_rows=100, max_delay=60)
+    await buffer.start()
+    try:
+        await buffer.add({"chat_id": 1, "question": 1})
+        database.fail = True
+        with pytest.raises(OSError, match="недоступна"):
+            await buffer.flush()
+        # Строки вернулись в буфер и по-прежнему видны чтениям чата
+        assert buffer.pending(1) == [{"chat_id": 1, "question": 1}]
+        assert len(buffer) == 1
+
+        await buffer.add({"chat_id": 1, "question": 2})
+        database.fail = False
+        await buffer.flush()
+    finally:
+        await buffer.stop()
+    assert database.rows == [(1, 1), (1, 2)]
+    assert buffer.pending(1) == []
+
+
+async def test_background_flush_retries_after_failure():
+    database = FakeDatabase()
+    database.fail = True
+    buffer = make_buffer(
+        database, max_rows=100, max_delay=0.01, retry_delay=0.02
+    )
+    await buffer.start()
+    try:
+        await buffer.add({"chat_id": 1, "question": 1})
+        await asyncio.sleep(0.03)
+        assert database.rows == []
+        database.fail = False
+        await wait_for_rows(database, 1)
+    finally:
+        await buffer.stop()
+    assert database.rows == [(1, 1)]
+
+
+async def test_discard_drops_pending_rows():
+    database = FakeDatabase()
+    buffer = make_buffer(database, max_rows=100, max_delay=60)
+    await buffer.start()
+    await buffer.add({"chat_id": 1, "question": 1})
+    await buffer.add({"chat_id": 2, "question": 1})
+    await buffer.discard(1)
+    await buffer.stop()
+    assert database.rows == [(2, 1)]